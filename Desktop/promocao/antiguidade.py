@@ -0,0 +1,271 @@
+"""
+Lista de antiguidade por graduação, com atualização incremental.
+
+Dentro de cada graduação, é mais antigo quem tem a data da última promoção
+mais antiga; empates são decididos pela data de ingresso, depois pela data de
+nascimento (o mais velho primeiro) e, por fim, pelo identificador. Cada
+graduação guarda as chaves em blocos ordenados de até 2 × CARGA_BLOCO
+elementos (lista ordenada em blocos): inserir ou remover custa O(√n) e as
+consultas de posição, "k mais antigos" e "posições a até b" buscam o bloco
+por `bisect` e somam tamanhos de blocos, sem reordenar o efetivo inteiro.
+Uso:
+
+    python antiguidade.py efetivo.csv --graduacao CB [--primeiros 20 | --linha 123 | --entre 10 50] [--saida lista.csv]
+"""
+import argparse
+import bisect
+import csv
+import sys
+import time
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from nucleo import ORDEM_GRADUACOES, normalizar_graduacao
+
+# Elementos por bloco: o bloco é dividido ao passar do dobro disso
+CARGA_BLOCO = 512
+
+# Ordinal para datas ausentes (vão para o fim nos desempates)
+_SEM_DATA = date.max.toordinal() + 1
+_NOMES = frozenset(ORDEM_GRADUACOES)
+
+# --- 1. Lista Ordenada em Blocos ---
+
+class ListaOrdenada:
+    """
+    Lista ordenada com posição (ordem estatística) em O(√n): blocos ordenados,
+    o maior elemento de cada bloco para localizar o bloco por `bisect` e o
+    início acumulado dos blocos, recalculado só depois de uma alteração.
+    """
+
+    def __init__(self, valores: Iterable = (), carga: int = CARGA_BLOCO):
+        self._carga = carga
+        ordenados = sorted(valores)
+        self._blocos: List[list] = [ordenados[i:i + carga] for i in range(0, len(ordenados), carga)]
+        self._maximos = [bloco[-1] for bloco in self._blocos]
+        self._inicios: Optional[List[int]] = None
+        self._tamanho = len(ordenados)
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self):
+        for bloco in self._blocos:
+            yield from bloco
+
+    def _inicio(self, indice_bloco: int) -> int:
+        if self._inicios is None:
+            self._inicios = [0, *accumulate(len(bloco) for bloco in self._blocos)]
+        return self._inicios[indice_bloco]
+
+    def inserir(self, valor) -> None:
+        self._inicios = None
+        self._tamanho += 1
+        if not self._blocos:
+            self._blocos.append([valor])
+            self._maximos.append(valor)
+            return
+        i = min(bisect.bisect_left(self._maximos, valor), len(self._blocos) - 1)
+        bloco = self._blocos[i]
+        bisect.insort(bloco, valor)
+        self._maximos[i] = bloco[-1]
+        if len(bloco) > 2 * self._carga:
+            self._blocos[i:i + 1] = [bloco[:self._carga], bloco[self._carga:]]
+            self._maximos[i:i + 1] = [bloco[self._carga - 1], bloco[-1]]
+
+    def remover(self, valor) -> None:
+        """Remove `valor`; ValueError se não estiver na lista."""
+        i = bisect.bisect_left(self._maximos, valor)
+        bloco = self._blocos[i] if i < len(self._blocos) else []
+        j = bisect.bisect_left(bloco, valor)
+        if j == len(bloco) or bloco[j] != valor:
+            raise ValueError(f"{valor!r} não está na lista.")
+        del bloco[j]
+        self._inicios = None
+        self._tamanho -= 1
+        if bloco:
+            self._maximos[i] = bloco[-1]
+        else:
+            del self._blocos[i], self._maximos[i]
+
+    def posicao(self, valor) -> int:
+        """Índice (0 = primeiro) de `valor`; ValueError se não estiver na lista."""
+        i = bisect.bisect_left(self._maximos, valor)
+        if i < len(self._blocos):
+            j = bisect.bisect_left(self._blocos[i], valor)
+            if j < len(self._blocos[i]) and self._blocos[i][j] == valor:
+                return self._inicio(i) + j
+        raise ValueError(f"{valor!r} não está na lista.")
+
+    def fatia(self, inicio: int, fim: int) -> list:
+        """Elementos nos índices [inicio, fim)."""
+        inicio, fim = max(inicio, 0), min(fim, self._tamanho)
+        if inicio >= fim:
+            return []
+        self._inicio(0)
+        i = bisect.bisect_right(self._inicios, inicio) - 1
+        resultado = []
+        deslocamento = inicio - self._inicios[i]
+        while len(resultado) < fim - inicio:
+            resultado += self._blocos[i][deslocamento:deslocamento + (fim - inicio - len(resultado))]
+            i, deslocamento = i + 1, 0
+        return resultado
+
+# --- 2. Índice de Antiguidade ---
+
+def chave_antiguidade(data_base: date, ingresso: Optional[date], nascimento: Optional[date], ident: Hashable) -> tuple:
+    """Chave de ordenação dentro da graduação (menor = mais antigo)."""
+    return (data_base.toordinal(), ingresso.toordinal() if ingresso else _SEM_DATA,
+            nascimento.toordinal() if nascimento else _SEM_DATA, ident)
+
+
+def _graduacao(texto: str) -> str:
+    if texto in _NOMES:
+        return texto
+    graduacao = normalizar_graduacao(texto)
+    if graduacao is None:
+        raise ValueError(f"Graduação '{texto}' não encontrada.")
+    return graduacao
+
+
+class IndiceAntiguidade:
+    """
+    Uma ListaOrdenada de chaves por graduação, mais o registro de cada
+    militar. Identificadores devem ser únicos (ValueError na carga inicial
+    se repetidos) e comparáveis entre si (ex.: todos int ou todos str), pois
+    são o último desempate.
+    """
+
+    def __init__(self, registros: Iterable[Tuple[Hashable, str, date, Optional[date], Optional[date]]] = ()):
+        self._registros: Dict[Hashable, Tuple[str, tuple]] = {}
+        chaves: Dict[str, list] = {g: [] for g in ORDEM_GRADUACOES}
+        # Carga inicial: uma ordenação por graduação, sem inserções uma a uma
+        for ident, graduacao, data_base, ingresso, nascimento in registros:
+            if ident in self._registros:
+                raise ValueError(f"Identificador {ident!r} repetido.")
+            graduacao = _graduacao(graduacao)
+            chave = chave_antiguidade(data_base, ingresso, nascimento, ident)
+            self._registros[ident] = (graduacao, chave)
+            chaves[graduacao].append(chave)
+        self._listas = {g: ListaOrdenada(c) for g, c in chaves.items()}
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def __contains__(self, ident: Hashable) -> bool:
+        return ident in self._registros
+
+    def registro(self, ident: Hashable) -> Tuple[str, date, Optional[date], Optional[date]]:
+        """(graduação, data da última promoção, ingresso, nascimento); KeyError se não estiver no índice."""
+        graduacao, (base, ingresso, nascimento, _) = self._registros[ident]
+        datas = (None if ordinal == _SEM_DATA else date.fromordinal(ordinal) for ordinal in (ingresso, nascimento))
+        return (graduacao, date.fromordinal(base), *datas)
+
+    def remover(self, ident: Hashable) -> None:
+        """Retira o militar do índice (sem efeito se não estiver nele)."""
+        anterior = self._registros.pop(ident, None)
+        if anterior is not None:
+            graduacao, chave = anterior
+            self._listas[graduacao].remover(chave)
+
+    def atualizar(self, ident: Hashable, graduacao: str, data_base: date,
+                  ingresso: Optional[date] = None, nascimento: Optional[date] = None) -> None:
+        """Inclui ou altera o registro do militar: só as suas entradas são reposicionadas."""
+        graduacao = _graduacao(graduacao)
+        self.remover(ident)
+        chave = chave_antiguidade(data_base, ingresso, nascimento, ident)
+        self._registros[ident] = (graduacao, chave)
+        self._listas[graduacao].inserir(chave)
+
+    def promover(self, idents: Iterable[Hashable], data_promocao: date) -> None:
+        """Passa os militares à graduação seguinte com a nova data base (ex.: após uma data de promoção)."""
+        for ident in idents:
+            graduacao, _, ingresso, nascimento = self.registro(ident)
+            indice = ORDEM_GRADUACOES.index(graduacao)
+            if indice + 1 >= len(ORDEM_GRADUACOES):
+                raise ValueError(f"{ident!r} já está na última graduação ({graduacao}).")
+            self.atualizar(ident, ORDEM_GRADUACOES[indice + 1], data_promocao, ingresso, nascimento)
+
+    def total(self, graduacao: str) -> int:
+        return len(self._listas[_graduacao(graduacao)])
+
+    def posicao(self, ident: Hashable) -> Tuple[str, int]:
+        """(graduação, posição na lista de antiguidade; 1 = mais antigo)."""
+        graduacao, chave = self._registros[ident]
+        return graduacao, self._listas[graduacao].posicao(chave) + 1
+
+    def entre(self, graduacao: str, inicio: int, fim: int) -> List[Hashable]:
+        """Militares da graduação nas posições `inicio` a `fim` (inclusive, a partir de 1), em ordem."""
+        return [chave[-1] for chave in self._listas[_graduacao(graduacao)].fatia(inicio - 1, fim)]
+
+    def primeiros(self, graduacao: str, k: int) -> List[Hashable]:
+        """Os `k` mais antigos da graduação."""
+        return self.entre(graduacao, 1, k)
+
+# --- 3. Linha de Comando ---
+
+def _ler_efetivo(caminho: str) -> List[Tuple[int, str, date, Optional[date], Optional[date]]]:
+    """(linha, graduação, data base, ingresso, nascimento) das linhas válidas, lidas com ingestao.py."""
+    from ingestao import ler_em_blocos
+
+    registros = []
+    rejeitadas = 0
+    for bloco in ler_em_blocos(caminho):
+        rejeitadas += bloco.quarentena.num_rows
+        registros += zip(bloco.linhas.tolist(), (ORDEM_GRADUACOES[g] for g in bloco.graduacoes.tolist()),
+                         bloco.datas_base.tolist(), bloco.ingressos.tolist(), bloco.nascimentos.tolist())
+    if rejeitadas:
+        print(f"{rejeitadas} linhas em quarentena ignoradas (ver `ingestao.py --quarentena`).", file=sys.stderr)
+    return registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lista de antiguidade por graduação.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (formato de `main.py --lote`, com `data_ingresso` opcional).")
+    parser.add_argument("--graduacao", help="Graduação (nome ou sigla); obrigatória exceto com --linha.")
+    consulta = parser.add_mutually_exclusive_group()
+    consulta.add_argument("--primeiros", type=int, metavar="K", help="Os K mais antigos da graduação.")
+    consulta.add_argument("--linha", type=int, help="Posição do militar desta linha do arquivo.")
+    consulta.add_argument("--entre", type=int, nargs=2, metavar=("A", "B"), help="Posições A a B (inclusive).")
+    parser.add_argument("--saida", default="-", help="CSV de saída ('-' para stdout).")
+    args = parser.parse_args(argv)
+    if args.linha is None and not args.graduacao:
+        parser.error("informe --graduacao (ou --linha).")
+
+    try:
+        graduacao = _graduacao(args.graduacao) if args.graduacao else None
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    inicio = time.perf_counter()
+    indice = IndiceAntiguidade(_ler_efetivo(args.efetivo))
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if args.linha is not None:
+        if args.linha not in indice:
+            parser.error(f"linha {args.linha} não está no índice (inexistente ou em quarentena).")
+        graduacao, posicao = indice.posicao(args.linha)
+        primeira, linhas = posicao, [args.linha]
+    elif args.entre:
+        primeira, linhas = args.entre[0], indice.entre(graduacao, *args.entre)
+    else:
+        primeira, linhas = 1, indice.primeiros(graduacao, args.primeiros or indice.total(graduacao))
+    tempo_consulta = time.perf_counter() - inicio
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(["posicao", "linha", "graduacao", "data_ultima_promocao", "data_ingresso", "data_nascimento"])
+    for posicao, linha in enumerate(linhas, start=primeira):
+        _, data_base, ingresso, nascimento = indice.registro(linha)
+        escritor.writerow([posicao, linha, graduacao] + [f"{d:%d/%m/%Y}" if d else "" for d in (data_base, ingresso, nascimento)])
+    if saida is not sys.stdout:
+        saida.close()
+
+    print(f"{len(indice)} militares indexados em {carga:.2f} s | consulta {tempo_consulta * 1000:.2f} ms | "
+          f"{graduacao}: {indice.total(graduacao)} militares", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
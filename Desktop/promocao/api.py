@@ -0,0 +1,362 @@
+"""
+API HTTP/JSON local para outros sistemas consultarem as projeções de carreira.
+
+Endpoints (datas de entrada em DD/MM/AAAA ou AAAA-MM-DD; de saída em AAAA-MM-DD):
+
+    GET  /proxima?graduacao=CB&data=22/04/2024&cenario=reduzido&nascimento=01/01/1995
+    GET  /plano?graduacao=CB&data=22/04/2024&cenario=completo
+    GET  /intersticios
+    GET  /conjuntos                   (conjuntos de regras.json; os demais endpoints aceitam ?conjunto=CHAVE)
+    GET  /insignias/CB[?v=ETAG]       (PNG otimizado com ETag; cache longo só com ?v= igual ao ETag atual)
+    POST /lote      {"cenario": "completo", "efetivo": [{"graduacao": "CB", "data_ultima_promocao": "22/04/2024"}, ...]}
+    GET  /saude
+    GET  /metricas                    (formato Prometheus; coleta ligada com --metricas ou PROMOCAO_METRICAS=1)
+
+Pedidos de um militar (/proxima e /plano) que chegam juntos são agrupados por
+alguns milissegundos e projetados numa única chamada de `projetar_promocoes_lote`
+(micro-batching no loop asyncio do tornado). As regras vêm de `obter_regras()`,
+lidas a cada pedido e uma vez por lote agrupado: uma alteração em regras.json
+vale a partir dos próximos pedidos, sem reiniciar o serviço. Uso:
+
+    python api.py --porta 8000 --janela-ms 2
+"""
+import argparse
+import asyncio
+import json
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import tornado.web
+
+import metricas
+from nucleo import ORDEM_GRADUACOES
+from projecao_vetorizada import IDADE_INDEFINIDA, N_PASSOS, projetar_promocoes_lote
+from regras import ConjuntoRegras, ErroRegras, listar_conjuntos, obter_regras
+
+JANELA_PADRAO_MS = 2.0
+LIMITE_LOTE_PADRAO = 4096
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+# --- 1. Pedidos e Projeção ---
+
+class ErroPedido(ValueError):
+    """Parâmetro inválido no pedido (resposta 400)."""
+
+
+class Pedido(NamedTuple):
+    graduacao: int                 # Índice em ORDEM_GRADUACOES
+    data_base: date
+    cenario: str                   # Chave de CENARIOS
+    nascimento: Optional[date]
+    conjunto: str                  # Chave do conjunto de regras (regras.json)
+
+
+def _ler_data(texto: Optional[str], campo: str, obrigatoria: bool = True) -> Optional[date]:
+    if not texto:
+        if obrigatoria:
+            raise ErroPedido(f"Campo '{campo}' é obrigatório.")
+        return None
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto.strip(), formato).date()
+        except ValueError:
+            continue
+    raise ErroPedido(f"Data inválida em '{campo}': '{texto}' (use DD/MM/AAAA ou AAAA-MM-DD).")
+
+
+def ler_regras(conjunto: Optional[str]) -> ConjuntoRegras:
+    """Versão atual do conjunto de regras pedido (o padrão de regras.json se vazio)."""
+    try:
+        return obter_regras(conjunto or None)
+    except ErroRegras as erro:
+        raise ErroPedido(str(erro)) from None
+
+
+def ler_pedido(graduacao: Optional[str], data_base: Optional[str], cenario: Optional[str],
+               nascimento: Optional[str], regras: ConjuntoRegras) -> Pedido:
+    """Valida os campos de um militar (vindos da query string ou do JSON) pelas graduações de `regras`."""
+    if list(regras.ordem_graduacoes) != ORDEM_GRADUACOES:
+        raise ErroPedido(f"Conjunto '{regras.chave}' não tem as mesmas graduações do sistema "
+                         f"({', '.join(ORDEM_GRADUACOES)}).")
+    indice = regras.indice(graduacao or "")
+    if indice is None:
+        raise ErroPedido(f"Graduação inválida: '{graduacao}'.")
+    cenario = (cenario or "completo").strip().lower()
+    if cenario not in CENARIOS:
+        raise ErroPedido(f"Cenário inválido: '{cenario}' (use {' ou '.join(CENARIOS)}).")
+    return Pedido(indice, _ler_data(data_base, "data"), cenario,
+                  _ler_data(nascimento, "nascimento", obrigatoria=False), regras.chave)
+
+
+def projetar_pedidos(pedidos: List[Pedido], regras: ConjuntoRegras) -> List[dict]:
+    """Projeta todos os pedidos (do mesmo conjunto `regras`) numa única chamada vetorizada e monta o plano de cada um."""
+    n = len(pedidos)
+    ordem = regras.ordem_graduacoes
+    nascimentos = np.array([p.nascimento or np.datetime64("NaT") for p in pedidos], dtype="datetime64[D]")
+    resultado = projetar_promocoes_lote(
+        np.array([p.data_base for p in pedidos], dtype="datetime64[D]"),
+        np.array([p.graduacao for p in pedidos], dtype=np.int64),
+        np.array([CENARIOS[p.cenario] for p in pedidos], dtype=np.int64),
+        nascimentos,
+        regras=regras,
+    )
+    sem_nascimento = np.isnat(nascimentos)
+    resultado["idades"][sem_nascimento] = IDADE_INDEFINIDA
+    resultado["idade_final"][sem_nascimento] = IDADE_INDEFINIDA
+
+    # Conversões em bloco: só a montagem dos dicionários é feita por militar
+    datas = np.datetime_as_string(resultado["datas"]).tolist()
+    meses = resultado["meses"].tolist()
+    idades = np.where(resultado["idades"] == IDADE_INDEFINIDA, -1, resultado["idades"]).tolist()
+
+    planos = []
+    for i in range(n):
+        inicio = pedidos[i].graduacao
+        promocoes = [
+            {"de": ordem[j], "para": ordem[j + 1], "data": datas[i][j],
+             "meses": meses[i][j], "idade": idades[i][j] if idades[i][j] >= 0 else None}
+            for j in range(inicio, N_PASSOS)
+        ]
+        planos.append({
+            "graduacao": ordem[inicio],
+            "cenario": pedidos[i].cenario,
+            "data_base": pedidos[i].data_base.isoformat(),
+            "promocoes": promocoes,
+            "data_final": promocoes[-1]["data"] if promocoes else None,
+            "idade_final": promocoes[-1]["idade"] if promocoes else None,
+        })
+    return planos
+
+
+class AgrupadorProjecoes:
+    """
+    Junta os pedidos que chegam dentro de `janela_ms` (ou até `limite` pedidos)
+    e resolve todos com uma só chamada de `projetar_pedidos` por conjunto de
+    regras, lido uma vez por lote.
+    """
+
+    def __init__(self, janela_ms: float = JANELA_PADRAO_MS, limite: int = LIMITE_LOTE_PADRAO):
+        self.janela = janela_ms / 1000
+        self.limite = limite
+        self.pedidos = 0
+        self.lotes = 0
+        self._pendentes = []
+        self._agendado = None
+
+    def projetar(self, pedido: Pedido) -> "asyncio.Future[dict]":
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendentes.append((pedido, futuro))
+        if len(self._pendentes) >= self.limite:
+            self._despachar()
+        elif self._agendado is None:
+            self._agendado = loop.call_later(self.janela, self._despachar)
+        return futuro
+
+    def _despachar(self):
+        if self._agendado is not None:
+            self._agendado.cancel()
+            self._agendado = None
+        pendentes, self._pendentes = self._pendentes, []
+        if not pendentes:
+            return
+        self.pedidos += len(pendentes)
+        self.lotes += 1
+        metricas.contar("api_pedidos_agrupados", len(pendentes))
+        metricas.contar("api_lotes_agrupados")
+        grupos: Dict[str, list] = {}
+        for pedido, futuro in pendentes:
+            grupos.setdefault(pedido.conjunto, []).append((pedido, futuro))
+        for conjunto, grupo in grupos.items():
+            try:
+                planos = projetar_pedidos([pedido for pedido, _ in grupo], obter_regras(conjunto))
+            except Exception as erro:
+                for _, futuro in grupo:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+                continue
+            for (_, futuro), plano in zip(grupo, planos):
+                if not futuro.done():  # Cliente pode ter desistido
+                    futuro.set_result(plano)
+
+# --- 2. Endpoints ---
+
+class ManipuladorJSON(tornado.web.RequestHandler):
+    def initialize(self, agrupador: AgrupadorProjecoes):
+        self.agrupador = agrupador
+
+    def escrever_json(self, dados, status: int = 200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps(dados, ensure_ascii=False))
+
+    def write_error(self, status_code: int, **kwargs):
+        self.escrever_json({"erro": self._reason}, status_code)
+
+    def on_finish(self):
+        rota = self.request.path.strip("/") or "raiz"
+        metricas.contar("api_respostas", rota=rota, status=str(self.get_status()))
+        metricas.observar(f"api_{rota}", self.request.request_time())
+
+    def regras_da_query(self) -> ConjuntoRegras:
+        return ler_regras(self.get_query_argument("conjunto", None))
+
+    def pedido_da_query(self) -> Pedido:
+        return ler_pedido(self.get_query_argument("graduacao", None), self.get_query_argument("data", None),
+                          self.get_query_argument("cenario", None), self.get_query_argument("nascimento", None),
+                          self.regras_da_query())
+
+
+class ProximaHandler(ManipuladorJSON):
+    async def get(self):
+        try:
+            pedido = self.pedido_da_query()
+        except ErroPedido as erro:
+            return self.escrever_json({"erro": str(erro)}, 400)
+        if pedido.graduacao == N_PASSOS:
+            return self.escrever_json({"erro": "Subtenente é o topo da carreira de praças."}, 400)
+        plano = await self.agrupador.projetar(pedido)
+        proxima = plano["promocoes"][0]
+        self.escrever_json({"graduacao": plano["graduacao"], "cenario": plano["cenario"],
+                            "proxima_graduacao": proxima["para"], "meses": proxima["meses"],
+                            "data": proxima["data"], "idade": proxima["idade"]})
+
+
+class PlanoHandler(ManipuladorJSON):
+    async def get(self):
+        try:
+            pedido = self.pedido_da_query()
+        except ErroPedido as erro:
+            return self.escrever_json({"erro": str(erro)}, 400)
+        self.escrever_json(await self.agrupador.projetar(pedido))
+
+
+class IntersticiosHandler(ManipuladorJSON):
+    def get(self):
+        try:
+            regras = self.regras_da_query()
+        except ErroPedido as erro:
+            return self.escrever_json({"erro": str(erro)}, 400)
+        ordem = regras.ordem_graduacoes
+        self.escrever_json([
+            {"de": g, "para": ordem[i + 1], "completo": completo, "reduzido": reduzido}
+            for i, (g, (completo, reduzido)) in enumerate(zip(ordem, regras.meses_por_passo))
+        ])
+
+
+class ConjuntosHandler(ManipuladorJSON):
+    def get(self):
+        self.escrever_json([{"conjunto": chave, "descricao": descricao} for chave, descricao in listar_conjuntos()])
+
+
+class LoteHandler(ManipuladorJSON):
+    def post(self):
+        """Já chega em lote: projeta direto, sem passar pelo agrupador. Itens inválidos recebem "erro"."""
+        try:
+            corpo = json.loads(self.request.body or b"{}")
+            efetivo = corpo["efetivo"]
+            if not isinstance(efetivo, list):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return self.escrever_json({"erro": 'Corpo deve ser JSON com a lista "efetivo".'}, 400)
+        try:
+            regras = ler_regras(corpo.get("conjunto") or self.get_query_argument("conjunto", None))
+        except ErroPedido as erro:
+            return self.escrever_json({"erro": str(erro)}, 400)
+
+        resultados, validos = [], []
+        for militar in efetivo:
+            try:
+                if not isinstance(militar, dict):
+                    raise ErroPedido("Cada item de 'efetivo' deve ser um objeto.")
+                pedido = ler_pedido(militar.get("graduacao"), militar.get("data_ultima_promocao"),
+                                    militar.get("cenario", corpo.get("cenario")), militar.get("data_nascimento"),
+                                    regras)
+            except ErroPedido as erro:
+                resultados.append({"erro": str(erro)})
+                continue
+            validos.append((len(resultados), pedido))
+            resultados.append(None)
+
+        if validos:
+            for (posicao, _), plano in zip(validos, projetar_pedidos([pedido for _, pedido in validos], regras)):
+                resultados[posicao] = plano
+        self.escrever_json({"resultados": resultados})
+
+
+class InsigniaHandler(tornado.web.RequestHandler):
+    """Insígnia otimizada em memória; o ETag (calculado pelo tornado) responde 304 a quem já tem a imagem."""
+
+    def get(self, graduacao: str):
+        from insignias import cache_control, insignia
+        try:
+            imagem = insignia(graduacao)
+        except KeyError:
+            raise tornado.web.HTTPError(404)
+        self.set_header("Content-Type", imagem.mime)
+        self.set_header("Cache-Control", cache_control(graduacao, self.get_query_argument("v", None)))
+        self.finish(imagem.dados)
+
+    def compute_etag(self):
+        from insignias import insignia
+        return f'"{insignia(self.path_args[0]).etag}"'
+
+
+class SaudeHandler(ManipuladorJSON):
+    def get(self):
+        lotes = self.agrupador.lotes
+        self.escrever_json({"status": "ok", "pedidos_agrupados": self.agrupador.pedidos, "lotes": lotes,
+                            "media_por_lote": round(self.agrupador.pedidos / lotes, 2) if lotes else None})
+
+
+class MetricasHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(metricas.texto_prometheus())
+
+
+def criar_aplicacao(agrupador: Optional[AgrupadorProjecoes] = None) -> tornado.web.Application:
+    argumentos = {"agrupador": agrupador or AgrupadorProjecoes()}
+    return tornado.web.Application([
+        (r"/proxima", ProximaHandler, argumentos),
+        (r"/plano", PlanoHandler, argumentos),
+        (r"/intersticios", IntersticiosHandler, argumentos),
+        (r"/conjuntos", ConjuntosHandler, argumentos),
+        (r"/lote", LoteHandler, argumentos),
+        (r"/insignias/([^/]+)", InsigniaHandler),
+        (r"/saude", SaudeHandler, argumentos),
+        (r"/metricas", MetricasHandler),
+    ])
+
+# --- 3. Execução ---
+
+async def servir(endereco: str, porta: int, janela_ms: float, limite: int):
+    from insignias import carregar_insignias
+    carregar_insignias()  # Pré-processa as insígnias antes de aceitar conexões
+    aplicacao = criar_aplicacao(AgrupadorProjecoes(janela_ms, limite))
+    aplicacao.listen(porta, address=endereco)
+    print(f"API de projeções em http://{endereco}:{porta} (janela de agrupamento: {janela_ms} ms)")
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de projeção de carreira.")
+    parser.add_argument("--endereco", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1).")
+    parser.add_argument("--porta", type=int, default=8000, help="Porta (padrão: 8000).")
+    parser.add_argument("--janela-ms", type=float, default=JANELA_PADRAO_MS,
+                        help=f"Tempo de espera para agrupar pedidos (padrão: {JANELA_PADRAO_MS} ms).")
+    parser.add_argument("--limite-lote", type=int, default=LIMITE_LOTE_PADRAO,
+                        help=f"Máximo de pedidos por projeção agrupada (padrão: {LIMITE_LOTE_PADRAO}).")
+    parser.add_argument("--metricas", action="store_true", help="Liga a coleta de métricas (GET /metricas).")
+    args = parser.parse_args(argv)
+    if args.metricas:
+        metricas.ativar()
+    try:
+        asyncio.run(servir(args.endereco, args.porta, args.janela_ms, args.limite_lote))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
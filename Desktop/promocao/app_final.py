@@ -1,7 +1,11 @@
 import streamlit as st
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta 
-import pandas as pd 
+
+from nucleo import calcular_proxima_promocao
+from nucleo import calcular_idade as calc_idade
+from regras import falha_regras, obter_regras
+import cache_persistente
+import metricas
 
 # --- 1. CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -62,42 +66,168 @@ st.markdown(f"""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 3. DADOS ---
-ORDEM_GRADUACOES = ["Soldado", "Cabo", "3º Sargento", "2º Sargento", "1º Sargento", "Subtenente"]
-INTERSTICIOS_MILITARES = {
-    "Soldado": [120, 60], "Cabo": [60, 30], "3º Sargento": [60, 30], 
-    "2º Sargento": [60, 30], "1º Sargento": [36, 18],
+# --- 3. DADOS E LÓGICA ---
+# Cálculo de datas vem de nucleo.py; pandas é importado só ao montar tabelas.
+# As regras (graduações, interstícios, calendário) são lidas de regras.json a cada execução
+# por `obter_regras()`, que só recompila quando o arquivo muda. A assinatura do conjunto entra
+# nas chaves de cache: editar o arquivo invalida os resultados antigos sem reiniciar o app.
+
+# --- 4. CACHE DE RESULTADOS ---
+# Resultados por (graduação, data base, cenário, nascimento). O cache do Streamlit
+# é compartilhado entre sessões, limitado a CACHE_MAX_ENTRADAS (descarte LRU) e expira em CACHE_TTL segundos.
+CACHE_MAX_ENTRADAS = 2048
+CACHE_TTL = 6 * 60 * 60
+
+# Formatos colunares do download (chave -> (MIME, extensão)), espelhando exportacao.FORMATOS
+FORMATOS_EXPORTACAO = {
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow"),
 }
-DATAS_PROMOCAO_FIXAS = [(4, 22), (8, 21), (12, 26)]
 
-# --- 4. LÓGICA ---
-def calcular_proxima_promocao(data_base: date, meses_intersticio: int) -> date:
-    data_minima = data_base + relativedelta(months=+meses_intersticio)
-    ano_cand = data_minima.year
-    for mes, dia in DATAS_PROMOCAO_FIXAS:
-        try:
-            cand = date(ano_cand, mes, dia)
-        except: continue
-        if cand >= data_minima: return cand
-    mes_abril, dia_abril = DATAS_PROMOCAO_FIXAS[0]
-    try: return date(ano_cand + 1, mes_abril, dia_abril)
-    except: return date(ano_cand + 1, mes_abril, 20)
+def cache_dados(funcao):
+    """st.cache_data com os limites acima; com métricas ligadas, conta chamadas e falhas (metricas.com_cache)."""
+    return metricas.com_cache(funcao.__name__, st.cache_data(max_entries=CACHE_MAX_ENTRADAS, ttl=CACHE_TTL, show_spinner=False))(funcao)
 
-def calc_idade(nasc: date, ref: date) -> int:
-    return relativedelta(ref, nasc).years
+def cache_compartilhado(funcao):
+    """cache_dados sobre o cache persistente (cache_persistente.py, ligado por PROMOCAO_CACHE): reaproveita o que outros workers e lotes já calcularam."""
+    return cache_dados(cache_persistente.persistente()(funcao))
 
-# --- 5. INTERFACE ---
+def cache_recurso(funcao):
+    """st.cache_resource (um objeto por processo), com a mesma contagem de cache_dados."""
+    return metricas.com_cache(funcao.__name__, st.cache_resource)(funcao)
 
-def render_proxima_promocao(grad_atual, data_ult, data_nasc, com_reducao):
+@cache_compartilhado
+def calcular_proxima(grad_atual, data_ult, com_reducao, assinatura):
+    regras = obter_regras()
     idx = 1 if com_reducao else 0
+    i_atual = regras.ordem_graduacoes.index(grad_atual)
+    prox = regras.ordem_graduacoes[i_atual + 1]
+    meses = regras.intersticios.get(grad_atual, [0,0])[idx]
+    return prox, meses, calcular_proxima_promocao(data_ult, meses, regras.datas_promocao)
+
+@cache_compartilhado
+def calcular_datas_plano(grad_ini, data_base, cenario_idx, assinatura):
+    """Cadeia de promoções: não depende da data de nascimento."""
+    regras = obter_regras()
+    ordem = regras.ordem_graduacoes
+    idx_start = ordem.index(grad_ini)
+    data_cursor = data_base
+    dados_tabela = []
+    for i in range(idx_start, len(ordem) - 1):
+        atual = ordem[i]
+        prox = ordem[i+1]
+        meses = regras.intersticios.get(atual, [0,0])[cenario_idx]
+        data_promo = calcular_proxima_promocao(data_cursor, meses, regras.datas_promocao)
+        dados_tabela.append({"Graduação": atual, "Para": prox, "Data Promoção": data_promo, "Meses": meses})
+        data_cursor = data_promo
+    return dados_tabela
+
+@cache_dados
+def calcular_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc):
+    """Cadeia de promoções com a idade em cada uma."""
+    return [
+        {**linha, "Idade": f"{calc_idade(data_nasc, linha['Data Promoção'])} anos" if data_nasc else "-"}
+        for linha in calcular_datas_plano(grad_ini, data_base, cenario_idx, assinatura)
+    ]
+
+@cache_dados
+def tabela_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc):
+    import pandas as pd
+    dados = calcular_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc)
+    with metricas.cronometro("dataframe"):
+        df_show = pd.DataFrame(dados)
+        df_show["Data Promoção"] = pd.to_datetime(df_show["Data Promoção"]).dt.strftime("%d/%m/%Y")
+    return df_show
+
+@cache_dados
+def csv_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc) -> bytes:
+    import pandas as pd
+    dados = calcular_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc)
+    with metricas.cronometro("dataframe"):
+        df = pd.DataFrame(dados)
+    with metricas.cronometro("csv"):
+        return df.to_csv(index=False).encode('utf-8')
+
+@cache_dados
+def arquivo_plano(grad_ini, data_base, cenario_idx, assinatura, data_nasc, formato) -> bytes:
+    """Plano em Parquet ou Arrow IPC (pyarrow só é carregado quando o formato é escolhido)."""
+    from exportacao import plano_em_bytes
+    return plano_em_bytes(grad_ini, data_base, cenario_idx, data_nasc, formato, regras=obter_regras())
+
+@cache_compartilhado
+def calcular_monte_carlo(grad_ini, data_base, probabilidade, amostras, semente, data_nasc, assinatura):
+    """Percentis por passo e histogramas da última promoção (NumPy só é carregado aqui)."""
+    from monte_carlo import histograma_datas, histograma_idades, resumir, simular_carreiras
+    resultado = simular_carreiras(grad_ini, data_base, probabilidade, amostras, semente, data_nasc, regras=obter_regras())
+    return resumir(resultado), histograma_datas(resultado), histograma_idades(resultado)
+
+@cache_compartilhado
+def calcular_ondas(conteudo, inicio, anos, assinatura):
+    """Promoções por cenário, graduação e data do calendário (ondas_promocao.py); só as contagens agregadas vão ao gráfico."""
+    import pandas as pd
+    from ondas_promocao import prever_ondas, tabela_ondas
+    ondas = prever_ondas(conteudo, inicio, anos, regras=obter_regras())
+    df = pd.DataFrame(tabela_ondas(ondas))
+    df["data"] = pd.to_datetime(df["data"])
+    return df, ondas.militares, ondas.invalidas
+
+@cache_recurso
+def imagem_insignia(graduacao) -> bytes:
+    """Insígnia reduzida e recomprimida uma vez por processo (insignias.py), sem leitura de disco depois."""
+    from insignias import insignia
+    return insignia(graduacao).dados
+
+@cache_recurso
+def tabela_legislacao(assinatura):
+    """Quadro da aba LEGISLAÇÃO: montado uma vez por versão das regras."""
+    import pandas as pd
+    regras = obter_regras()
+    dados = []
+    for g in regras.ordem_graduacoes[:-1]:
+        ints = regras.intersticios.get(g, [0,0])
+        dados.append({"De": g, "Completo": f"{ints[0]} m", "Reduzido": f"{ints[1]} m"})
+    return pd.DataFrame(dados)
+
+# --- 5. RECÁLCULO INCREMENTAL ---
+# Cada valor derivado fica em st.session_state junto com as entradas de que depende e
+# só é recalculado quando alguma delas muda (ex.: trocar a data de nascimento refaz as
+# idades, mas não a cadeia de datas). Com ?debug=1 na URL, a barra lateral mostra o que
+# foi recalculado na última execução e o total por valor na sessão.
+
+def derivado(nome, dependencias, calcular):
+    """Valor `nome` da sessão; chama `calcular()` só se `dependencias` mudaram desde o último uso."""
+    valores = st.session_state.setdefault("_derivados", {})
+    if nome in valores and valores[nome][0] == dependencias:
+        metricas.contar("derivados_reaproveitados", valor=nome)
+        return valores[nome][1]
+    metricas.contar("derivados_recalculados", valor=nome)
+    valor = calcular()
+    valores[nome] = (dependencias, valor)
+    st.session_state.setdefault("_recalculados", []).append(nome)
+    contagem = st.session_state.setdefault("_contagem_recalculos", {})
+    contagem[nome] = contagem.get(nome, 0) + 1
+    return valor
+
+def render_debug_recalculos():
+    with st.sidebar.expander("🔧 DEBUG: RECÁLCULOS", expanded=True):
+        recalculados = st.session_state.get("_recalculados", [])
+        st.write(f"**Nesta execução ({len(recalculados)}):** {', '.join(recalculados) or 'nenhum'}")
+        st.json(st.session_state.get("_contagem_recalculos", {}))
+
+# --- 6. INTERFACE ---
+
+def calcular_progresso(data_ult, data_promo, hoje):
+    dias_total = (data_promo - data_ult).days
+    dias_corridos = (hoje - data_ult).days
+    return max(0.0, min(1.0, dias_corridos / dias_total)) if dias_total > 0 else 1.0
+
+@metricas.medido()
+def render_proxima_promocao(grad_atual, data_ult, data_nasc, com_reducao, assinatura):
+    entradas = (grad_atual, data_ult, com_reducao, assinatura)
     try:
-        i_atual = ORDEM_GRADUACOES.index(grad_atual)
-        prox = ORDEM_GRADUACOES[i_atual + 1]
+        prox, meses, data_promo = derivado("proxima", entradas, lambda: calcular_proxima(*entradas))
     except:
         st.error("Erro de sequência."); return
-
-    meses = INTERSTICIOS_MILITARES.get(grad_atual, [0,0])[idx]
-    data_promo = calcular_proxima_promocao(data_ult, meses)
     
     st.markdown(f"### 🎯 Próximo Degrau: **{prox}**")
     
@@ -106,14 +236,12 @@ def render_proxima_promocao(grad_atual, data_ult, data_nasc, com_reducao):
     c2.metric("INTERSTÍCIO", f"{meses} meses", delta="Reduzido" if com_reducao else "Completo", delta_color="off")
     
     hoje = date.today()
-    dias_total = (data_promo - data_ult).days
-    dias_corridos = (hoje - data_ult).days
-    progresso = max(0.0, min(1.0, dias_corridos / dias_total)) if dias_total > 0 else 1.0
+    progresso = derivado("progresso", (data_ult, data_promo, hoje), lambda: calcular_progresso(data_ult, data_promo, hoje))
     
     c3.metric("CUMPRIDO", f"{int(progresso*100)}%")
     
     if data_nasc:
-        idade = calc_idade(data_nasc, data_promo)
+        idade = derivado("idade_proxima", (data_promo, data_nasc), lambda: calc_idade(data_nasc, data_promo))
         c4.metric("IDADE ESTIMADA", f"{idade} anos")
     else:
         c4.metric("IDADE", "--")
@@ -124,52 +252,120 @@ def render_proxima_promocao(grad_atual, data_ult, data_nasc, com_reducao):
     if progresso >= 1.0:
         st.success("✅ Requisito de tempo cumprido.")
 
-def render_plano_carreira(grad_ini, data_base, cenario_idx, data_nasc):
+@metricas.medido()
+def render_plano_carreira(grad_ini, data_base, cenario_idx, data_nasc, regras):
     try:
-        idx_start = ORDEM_GRADUACOES.index(grad_ini)
+        idx_start = regras.ordem_graduacoes.index(grad_ini)
     except: return
 
     tipo = "CENÁRIO OTIMISTA (Com Reduções)" if cenario_idx == 1 else "CENÁRIO CONSERVADOR (Sem Reduções)"
     st.markdown(f"### 📈 {tipo}")
     
-    data_cursor = data_base
-    dados_tabela = []
+    chave_datas = (grad_ini, data_base, cenario_idx, regras.assinatura)
+    chave_tabela = chave_datas + (data_nasc,)
+    datas_plano = derivado("datas_plano", chave_datas, lambda: calcular_datas_plano(*chave_datas))
+    dados_tabela = derivado("idades_plano", chave_tabela, lambda: calcular_plano(*chave_tabela))
+    data_cursor = datas_plano[-1]["Data Promoção"] if datas_plano else data_base
 
     col_timeline, col_tabela = st.columns([2, 3])
 
     with col_timeline:
         st.write("**LINHA DO TEMPO**")
-        for i in range(idx_start, len(ORDEM_GRADUACOES) - 1):
-            atual = ORDEM_GRADUACOES[i]
-            prox = ORDEM_GRADUACOES[i+1]
-            meses = INTERSTICIOS_MILITARES.get(atual, [0,0])[cenario_idx]
-            data_promo = calcular_proxima_promocao(data_cursor, meses)
-            idade_str = f"{calc_idade(data_nasc, data_promo)} anos" if data_nasc else "-"
-            
-            with st.expander(f"{atual} ➝ {prox}", expanded=(i == idx_start)):
-                st.markdown(f"**Data:** {data_promo.strftime('%d/%m/%Y')} | **Duração:** {meses} meses")
-            
-            dados_tabela.append({"Graduação": atual, "Para": prox, "Data Promoção": data_promo, "Meses": meses, "Idade": idade_str})
-            data_cursor = data_promo
+        for i, linha in enumerate(datas_plano, start=idx_start):
+            with st.expander(f"{linha['Graduação']} ➝ {linha['Para']}", expanded=(i == idx_start)):
+                st.markdown(f"**Data:** {linha['Data Promoção'].strftime('%d/%m/%Y')} | **Duração:** {linha['Meses']} meses")
 
     with col_tabela:
         st.write("**RESUMO**")
         if dados_tabela:
             m1, m2 = st.columns(2)
             m1.metric("DATA FINAL", data_cursor.strftime("%d/%m/%Y"))
-            m2.metric("IDADE FINAL", f"{calc_idade(data_nasc, data_cursor)} anos" if data_nasc else "--")
+            m2.metric("IDADE FINAL", dados_tabela[-1]["Idade"] if data_nasc else "--")
             
-            df = pd.DataFrame(dados_tabela)
-            df_show = df.copy()
-            df_show["Data Promoção"] = df_show["Data Promoção"].apply(lambda x: x.strftime("%d/%m/%Y"))
-            st.dataframe(df_show, use_container_width=True, hide_index=True)
+            st.dataframe(derivado("tabela_plano", chave_tabela, lambda: tabela_plano(*chave_tabela)), use_container_width=True, hide_index=True)
             
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 DOWNLOAD PLANEJAMENTO", data=csv, file_name="plano_carreira_simulado.csv", mime="text/csv", use_container_width=True, type="primary")
+            formato = st.radio("FORMATO:", ["CSV", "Parquet", "Arrow IPC"], horizontal=True)
+            if formato == "CSV":
+                csv = derivado("csv_plano", chave_tabela, lambda: csv_plano(*chave_tabela))
+                st.download_button("📥 DOWNLOAD PLANEJAMENTO", data=csv, file_name="plano_carreira_simulado.csv", mime="text/csv", use_container_width=True, type="primary")
+            else:
+                chave = "parquet" if formato == "Parquet" else "arrow"
+                dados = derivado(f"{chave}_plano", chave_tabela, lambda: arquivo_plano(*chave_tabela, chave))
+                mime, extensao = FORMATOS_EXPORTACAO[chave]
+                st.download_button("📥 DOWNLOAD PLANEJAMENTO", data=dados, file_name=f"plano_carreira_simulado{extensao}", mime=mime, use_container_width=True, type="primary")
+
+@metricas.medido()
+def render_monte_carlo(grad_ini, data_base, probabilidade, amostras, semente, data_nasc, assinatura):
+    import pandas as pd
+
+    st.markdown(f"### 🎲 CENÁRIO MONTE CARLO ({int(probabilidade*100)}% de chance de redução por passo)")
+    resumo, hist_datas, hist_idades = calcular_monte_carlo(grad_ini, data_base, probabilidade, amostras, semente, data_nasc, assinatura)
+    final = resumo[-1]
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("DATA FINAL (MEDIANA)", final["Data P50"].strftime("%d/%m/%Y"))
+    m2.metric("FAIXA P5 – P95", f"{final['Data P5']:%m/%Y} – {final['Data P95']:%m/%Y}")
+    m3.metric("IDADE FINAL (MEDIANA)", f"{final['Idade P50']} anos" if data_nasc else "--")
+
+    df = pd.DataFrame(resumo)
+    for coluna in df.columns:
+        if coluna.startswith("Data"):
+            df[coluna] = df[coluna].apply(lambda x: x.strftime("%d/%m/%Y"))
+    df["Com Redução"] = df["Com Redução"].apply(lambda x: f"{x:.0%}")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    col_datas, col_idades = st.columns(2)
+    with col_datas:
+        st.write(f"**DATA DE PROMOÇÃO A {final['Para'].upper()}** ({amostras:,} amostras)".replace(",", "."))
+        st.bar_chart(pd.DataFrame({"Data": pd.to_datetime(list(hist_datas)), "Frequência": list(hist_datas.values())}),
+                     x="Data", y="Frequência")
+    if hist_idades:
+        with col_idades:
+            st.write(f"**IDADE NA PROMOÇÃO A {final['Para'].upper()}**")
+            st.bar_chart(pd.DataFrame({"Idade": list(hist_idades), "Frequência": list(hist_idades.values())}),
+                         x="Idade", y="Frequência")
+
+@metricas.medido()
+def render_ondas(conteudo, cenario, anos, regras):
+    import altair as alt
+
+    df, militares, invalidas = calcular_ondas(conteudo, date.today(), anos, regras.assinatura)
+    dados = df[df["cenario"] == cenario]
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("MILITARES", f"{militares:,}".replace(",", "."))
+    m2.metric("PROMOÇÕES PREVISTAS", f"{int(dados['promocoes'].sum()):,}".replace(",", "."))
+    m3.metric("LINHAS IGNORADAS", invalidas)
+    if dados.empty:
+        st.info("Nenhuma promoção prevista no período.")
+        return
+
+    graduacoes = list(regras.ordem_graduacoes[1:])
+    grafico = alt.Chart(dados).mark_bar().encode(
+        x=alt.X("data:O", timeUnit="yearmonthdate", title="Data de promoção", axis=alt.Axis(format="%d/%m/%Y", labelAngle=-45)),
+        y=alt.Y("sum(promocoes):Q", title="Promoções"),
+        color=alt.Color("para:N", title="Para", sort=graduacoes, scale=alt.Scale(domain=graduacoes)),
+        order=alt.Order("indice:Q"),
+        tooltip=[alt.Tooltip("data:T", title="Data", format="%d/%m/%Y"), alt.Tooltip("para:N", title="Para"),
+                 alt.Tooltip("promocoes:Q", title="Promoções")],
+    ).transform_calculate(indice=f"indexof({graduacoes!r}, datum.para)")
+    st.altair_chart(grafico, use_container_width=True)
 
-# --- 6. MAIN APP ---
+    with st.expander("QUADRO POR DATA"):
+        quadro = dados.pivot_table(index="data", columns="para", values="promocoes", aggfunc="sum", fill_value=0)
+        quadro = quadro.reindex(columns=[g for g in graduacoes if g in quadro.columns])
+        quadro.index = quadro.index.strftime("%d/%m/%Y")
+        st.dataframe(quadro, use_container_width=True)
+
+# --- 7. MAIN APP ---
 
 def main():
+    st.session_state["_recalculados"] = []
+    regras = obter_regras()
+    falha = falha_regras()
+    if falha:
+        st.warning(f"⚠️ regras.json não pôde ser lido; seguem valendo as regras da última versão válida. {falha}")
+
     with st.sidebar:
         # LOGO EM EMOJI
         st.markdown("<div style='text-align: center; font-size: 80px;'>🚔</div>", unsafe_allow_html=True)
@@ -177,7 +373,11 @@ def main():
         st.markdown("<h2 style='text-align: center;'>Simulador de Carreira</h2>", unsafe_allow_html=True)
         st.markdown("---")
         
-        grad_input = st.selectbox("GRADUAÇÃO ATUAL", ORDEM_GRADUACOES, index=1)
+        grad_input = st.selectbox("GRADUAÇÃO ATUAL", regras.ordem_graduacoes, index=1)
+        try:
+            st.image(imagem_insignia(grad_input), width=80)
+        except KeyError:
+            pass  # Graduação nova em regras.json ainda sem insígnia
         data_ult = st.date_input("DATA DA ÚLTIMA PROMOÇÃO", value=date.today(), format="DD/MM/YYYY")
         
         st.markdown("#### DADOS PESSOAIS")
@@ -196,32 +396,85 @@ def main():
     st.title("Planejamento de Carreira Militar")
     st.markdown("**Baseado na Legislação do Distrito Federal**")
 
-    tab1, tab2, tab3 = st.tabs(["PRÓXIMA PROMOÇÃO", "PLANO DE CARREIRA", "LEGISLAÇÃO"])
+    tab1, tab2, tab3, tab4 = st.tabs(["PRÓXIMA PROMOÇÃO", "PLANO DE CARREIRA", "LEGISLAÇÃO", "ONDAS DE PROMOÇÃO"])
 
-    with tab1:
+    with tab1, metricas.cronometro("aba_proxima_promocao"):
         st.markdown("<br>", unsafe_allow_html=True)
         modo_reducao = st.radio("CONDIÇÃO:", ["Com Redução (50%)", "Interstício Completo"], horizontal=True)
-        if grad_input == "Subtenente":
+        if grad_input == regras.ordem_graduacoes[-1]:
             st.success("Topo da carreira alcançado.")
         else:
-            render_proxima_promocao(grad_input, data_ult, data_nasc, "Com Redução" in modo_reducao)
+            render_proxima_promocao(grad_input, data_ult, data_nasc, "Com Redução" in modo_reducao, regras.assinatura)
 
-    with tab2:
+    with tab2, metricas.cronometro("aba_plano_carreira"):
         st.markdown("<br>", unsafe_allow_html=True)
-        cenario_global = st.selectbox("CENÁRIO:", ["Otimista (Sempre reduzido)", "Pessimista (Sempre cheio)"])
-        if grad_input == "Subtenente":
+        cenario_global = st.selectbox("CENÁRIO:", ["Otimista (Sempre reduzido)", "Pessimista (Sempre cheio)", "Monte Carlo (Redução provável)"])
+        if grad_input == regras.ordem_graduacoes[-1]:
             st.warning("Sem projeções.")
+        elif "Monte Carlo" in cenario_global:
+            c1, c2, c3 = st.columns(3)
+            probabilidade = c1.slider("CHANCE DE REDUÇÃO POR PASSO (%)", 0, 100, 50, step=5) / 100
+            amostras = c2.number_input("AMOSTRAS", min_value=1_000, max_value=200_000, value=100_000, step=10_000)
+            semente = c3.number_input("SEMENTE", min_value=0, value=0, step=1)
+            render_monte_carlo(grad_input, data_ult, probabilidade, int(amostras), int(semente), data_nasc, regras.assinatura)
         else:
-            render_plano_carreira(grad_input, data_ult, 1 if "Otimista" in cenario_global else 0, data_nasc)
+            render_plano_carreira(grad_input, data_ult, 1 if "Otimista" in cenario_global else 0, data_nasc, regras)
 
-    with tab3:
+    with tab3, metricas.cronometro("aba_legislacao"):
         st.markdown("### Quadro de Praças (Referência)")
-        dados = []
-        for g in ORDEM_GRADUACOES[:-1]:
-            ints = INTERSTICIOS_MILITARES.get(g, [0,0])
-            dados.append({"De": g, "Completo": f"{ints[0]} m", "Reduzido": f"{ints[1]} m"})
-        
-        st.dataframe(pd.DataFrame(dados), hide_index=True, use_container_width=True)
+        st.dataframe(tabela_legislacao(regras.assinatura), hide_index=True, use_container_width=True)
+
+    with tab4, metricas.cronometro("aba_ondas"):
+        st.markdown("### Promoções previstas por data")
+        c1, c2 = st.columns([3, 2])
+        arquivo = c1.file_uploader("EFETIVO (CSV/TSV no formato do lote)", type=["csv", "tsv", "txt"])
+        cenario_ondas = c2.radio("CENÁRIO:", ["Interstício Completo", "Com Redução"], horizontal=True, key="cenario_ondas")
+        anos_ondas = c2.slider("HORIZONTE (ANOS)", 1, 20, 10)
+        if arquivo is None:
+            st.info("Envie o efetivo com as colunas graduacao e data_ultima_promocao.")
+        else:
+            render_ondas(arquivo.getvalue(), "reduzido" if "Redução" in cenario_ondas else "completo", anos_ondas, regras)
+
+    if st.query_params.get("debug"):
+        render_debug_recalculos()
+
+# --- 8. MÉTRICAS E PERFIL ---
+# Com PROMOCAO_METRICAS=1, cada execução do script é medida (ver metricas.py); as métricas
+# ficam em /metrics na porta PROMOCAO_METRICAS_PORTA e/ou no arquivo PROMOCAO_METRICAS_ARQUIVO.
+# Com ?perfil=1 na URL, a execução é perfilada com cProfile e o relatório aparece na barra lateral.
+
+@st.cache_resource
+def servidor_metricas(porta):
+    """Endpoint de métricas: um por processo, compartilhado por todas as sessões."""
+    return metricas.servir(porta)
+
+def exportar_metricas():
+    import os
+    porta = os.environ.get("PROMOCAO_METRICAS_PORTA")
+    if porta:
+        servidor_metricas(int(porta))
+    arquivo = os.environ.get("PROMOCAO_METRICAS_ARQUIVO")
+    if arquivo:
+        metricas.gravar(arquivo)
+
+def render_perfil(captura):
+    with st.sidebar.expander("⏱️ PERFIL DA EXECUÇÃO", expanded=True):
+        st.code(captura.texto(limite=25), language=None)
+        st.download_button("📥 BAIXAR .prof", data=captura.dados(), file_name="app_final.prof",
+                           mime="application/octet-stream", use_container_width=True)
+
+def executar():
+    """Uma execução do script (rerun): main() cronometrada e, com ?perfil=1, perfilada."""
+    metricas.contar("execucoes")
+    if st.query_params.get("perfil"):
+        with metricas.perfil() as captura, metricas.cronometro("execucao"):
+            main()
+        render_perfil(captura)
+    else:
+        with metricas.cronometro("execucao"):
+            main()
+    if metricas.ativo():
+        exportar_metricas()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    executar()
\ No newline at end of file
@@ -1,73 +1,42 @@
 import streamlit as st
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta 
 from typing import Optional 
-import pandas as pd # Necessário para Streamlit exibir tabelas bem
-
-# --- 1. Constantes e Dados Base ---
-ABREVIATURAS_MAP = {
-    "SD": "Soldado", "CB": "Cabo", "3SGT": "3º Sargento", "2SGT": "2º Sargento", 
-    "1SGT": "1º Sargento", "ST": "Subtenente",
-}
-INTERSTICIOS_MILITARES = {
-    "Soldado": [120, 60], "Cabo": [60, 30], "3º Sargento": [60, 30], 
-    "2º Sargento": [60, 30], "1º Sargento": [36, 18],
-}
-DATAS_PROMOCAO_FIXAS = [(4, 22), (8, 21), (12, 26)]
-ORDEM_GRADUACOES = ["Soldado", "Cabo", "3º Sargento", "2º Sargento", "1º Sargento", "Subtenente"]
-
-
-# --- 2. Funções de Lógica (Mantidas) ---
-
-def calcular_proxima_promocao(data_base: date, meses_intersticio: int) -> date:
-    """Calcula a próxima data de promoção APÓS o interstício ser completado."""
-    data_minima_elegivel = data_base + relativedelta(months=+meses_intersticio)
-    ano_candidato = data_minima_elegivel.year
-
-    for mes, dia in DATAS_PROMOCAO_FIXAS:
-        try:
-            data_promocao_candidata = date(ano_candidato, mes, dia)
-        except ValueError:
-            continue
-        
-        if data_promocao_candidata >= data_minima_elegivel:
-            return data_promocao_candidata
-
-    ano_candidato += 1
-    mes_abril, dia_abril = DATAS_PROMOCAO_FIXAS[0] 
-    
-    try:
-        proxima_abril = date(ano_candidato, mes_abril, dia_abril)
-    except ValueError:
-        proxima_abril = date(ano_candidato, mes_abril, 20) 
-        
-    return proxima_abril
 
-def calcular_idade(data_nascimento: date, data_referencia: date) -> int:
-    """Calcula a idade em anos na data de referência."""
-    return relativedelta(data_referencia, data_nascimento).years
+# --- 1. Constantes e Funções de Lógica ---
+# Compartilhadas com main.py e app_final.py em nucleo.py. O pandas (necessário para
+# o Streamlit exibir tabelas bem) é importado apenas nas funções que montam tabelas.
+# Graduações, interstícios e datas vêm do conjunto de regras.json escolhido, relido a
+# cada execução por `obter_regras()` (só recompila quando o arquivo muda).
+
+from nucleo import (
+    calcular_idade,
+    calcular_proxima_promocao,
+    somar_meses,
+)
+from regras import falha_regras, listar_conjuntos, obter_regras
 
 
-# --- 3. Funções de CÁLCULO (Adaptadas para Streamlit) ---
+# --- 2. Funções de CÁLCULO (Adaptadas para Streamlit) ---
 
-def calcular_proxima_imediata_streamlit(graduacao_atual: str, data_ultima_promocao: date, data_nascimento: Optional[date], houve_reducao: bool):
+def calcular_proxima_imediata_streamlit(graduacao_atual: str, data_ultima_promocao: date, data_nascimento: Optional[date], houve_reducao: bool, regras):
     """Opção 1: Calcula apenas a próxima promoção (versão Streamlit)."""
+    import pandas as pd
     
     # 1. Determinar o interstício
     indice_intersticio = 1 if houve_reducao else 0
-    intersticio_em_meses = INTERSTICIOS_MILITARES.get(graduacao_atual, [0,0])[indice_intersticio]
+    intersticio_em_meses = regras.intersticios.get(graduacao_atual, [0,0])[indice_intersticio]
     tipo_intersticio = "Reduzido" if houve_reducao else "Completo"
     
     # 2. Mapeamento da próxima graduação
     try:
-        indice_atual = ORDEM_GRADUACOES.index(graduacao_atual)
-        proxima_graduacao = ORDEM_GRADUACOES[indice_atual + 1]
+        indice_atual = regras.ordem_graduacoes.index(graduacao_atual)
+        proxima_graduacao = regras.ordem_graduacoes[indice_atual + 1]
     except (ValueError, IndexError):
         proxima_graduacao = "FIM DE CARREIRA (Praças)" 
 
     # 3. Cálculo
-    data_minima_elegivel = data_ultima_promocao + relativedelta(months=+intersticio_em_meses)
-    data_proxima_promocao = calcular_proxima_promocao(data_ultima_promocao, intersticio_em_meses)
+    data_minima_elegivel = somar_meses(data_ultima_promocao, intersticio_em_meses)
+    data_proxima_promocao = calcular_proxima_promocao(data_ultima_promocao, intersticio_em_meses, regras.datas_promocao)
     
     idade_na_promocao = calcular_idade(data_nascimento, data_proxima_promocao) if data_nascimento else None
 
@@ -92,8 +61,9 @@ def calcular_proxima_imediata_streamlit(graduacao_atual: str, data_ultima_promoc
         st.success(f"🎂 Idade na Promoção: **{idade_na_promocao} anos**")
         
 
-def projetar_promocoes_streamlit(graduacao_inicial: str, data_base_promocao: date, indice_intersticio: int, data_nascimento: Optional[date]):
+def projetar_promocoes_streamlit(graduacao_inicial: str, data_base_promocao: date, indice_intersticio: int, data_nascimento: Optional[date], regras):
     """Opção 2 e 3: Projeta a carreira completa (versão Streamlit)."""
+    import pandas as pd
     
     tipo_intersticio = "MELHOR CENÁRIO (Com Redução)" if indice_intersticio == 1 else "PIOR CENÁRIO (Sem Redução)"
     st.subheader(f"📈 Projeção de Carreira - {tipo_intersticio}")
@@ -102,19 +72,19 @@ def projetar_promocoes_streamlit(graduacao_inicial: str, data_base_promocao: dat
     plano_de_carreira = []
     
     try:
-        indice_atual = ORDEM_GRADUACOES.index(graduacao_inicial)
+        indice_atual = regras.ordem_graduacoes.index(graduacao_inicial)
     except ValueError:
         st.error(f"Erro interno: Graduação inicial '{graduacao_inicial}' não encontrada.")
         return
 
     data_base_para_calculo = data_base_promocao
     
-    for i in range(indice_atual, len(ORDEM_GRADUACOES) - 1):
-        graduacao_atual = ORDEM_GRADUACOES[i]
-        proxima_graduacao = ORDEM_GRADUACOES[i + 1]
+    for i in range(indice_atual, len(regras.ordem_graduacoes) - 1):
+        graduacao_atual = regras.ordem_graduacoes[i]
+        proxima_graduacao = regras.ordem_graduacoes[i + 1]
         
-        intersticio = INTERSTICIOS_MILITARES.get(graduacao_atual, [0, 0])[indice_intersticio]
-        data_promocao = calcular_proxima_promocao(data_base_para_calculo, intersticio)
+        intersticio = regras.intersticios.get(graduacao_atual, [0, 0])[indice_intersticio]
+        data_promocao = calcular_proxima_promocao(data_base_para_calculo, intersticio, regras.datas_promocao)
         idade_na_promocao = calcular_idade(data_nascimento, data_promocao) if data_nascimento else None
         
         plano_de_carreira.append({
@@ -130,24 +100,25 @@ def projetar_promocoes_streamlit(graduacao_inicial: str, data_base_promocao: dat
     df = pd.DataFrame(plano_de_carreira)
     st.dataframe(df, hide_index=True)
     
-    st.success(f"**Previsão de Promoção a Subtenente:** {data_base_para_calculo.strftime('%d/%m/%Y')}")
+    st.success(f"**Previsão de Promoção a {regras.ordem_graduacoes[-1]}:** {data_base_para_calculo.strftime('%d/%m/%Y')}")
     
     if data_nascimento:
         idade_final = calcular_idade(data_nascimento, data_base_para_calculo)
         st.info(f"**Idade na Promoção Final:** {idade_final} anos")
 
 
-def exibir_intersticios_streamlit():
+def exibir_intersticios_streamlit(regras):
     """Opção 4: Exibe todos os interstícios definidos em formato Streamlit."""
+    import pandas as pd
     st.subheader("Tabela de Interstícios (Meses)")
 
     data = []
-    for i in range(len(ORDEM_GRADUACOES) - 1):
-        graduacao_atual = ORDEM_GRADUACOES[i]
-        proxima_graduacao = ORDEM_GRADUACOES[i + 1]
+    for i in range(len(regras.ordem_graduacoes) - 1):
+        graduacao_atual = regras.ordem_graduacoes[i]
+        proxima_graduacao = regras.ordem_graduacoes[i + 1]
         
-        if graduacao_atual in INTERSTICIOS_MILITARES:
-            intersticios = INTERSTICIOS_MILITARES[graduacao_atual]
+        if graduacao_atual in regras.intersticios:
+            intersticios = regras.intersticios[graduacao_atual]
             
             data.append({
                 "Promoção": f"De {graduacao_atual} para {proxima_graduacao}",
@@ -159,12 +130,21 @@ def exibir_intersticios_streamlit():
     st.dataframe(df, hide_index=True)
 
 
-# --- 4. Função Principal Streamlit (Aplica a GUI) ---
+# --- 3. Função Principal Streamlit (Aplica a GUI) ---
 
 def app_principal():
     st.set_page_config(page_title="Projetor de Carreira Militar", layout="wide")
     st.title("🛡️ Calculadora de Promoção Militar")
     st.markdown("---")
+
+    # Conjunto de regras (carreira / versão da lei) de regras.json
+    conjuntos = dict(listar_conjuntos())
+    conjunto = st.sidebar.selectbox("Regras de promoção", list(conjuntos))
+    st.sidebar.caption(conjuntos[conjunto])
+    regras = obter_regras(conjunto)
+    falha = falha_regras()
+    if falha:
+        st.warning(f"⚠️ regras.json não pôde ser lido; seguem valendo as regras da última versão válida. {falha}")
     
     # ----------------------------------------------------
     # COLUNAS DE INPUT
@@ -175,12 +155,12 @@ def app_principal():
         st.subheader("Dados de Início")
         
         # Graduação (Com opções completas e abreviadas)
-        opcoes_graduacao = ORDEM_GRADUACOES.copy()
+        opcoes_graduacao = list(regras.ordem_graduacoes)
         
         # Mapeamos a entrada abreviada para a entrada completa internamente
         graduacao_input = st.selectbox("1. Qual sua graduação atual?", opcoes_graduacao)
         
-        if graduacao_input == "Subtenente":
+        if graduacao_input == regras.ordem_graduacoes[-1]:
             st.warning("✅ Já alcançou o posto final da carreira de Praças.")
             return
 
@@ -220,21 +200,21 @@ def app_principal():
     if 'run_calculation' in st.session_state and st.session_state.run_calculation:
         
         # ⚠️ Nota: A abreviatura foi removida do selectbox, simplificando o input.
-        # A lógica de abreviaturas está agora apenas no mapeamento de nomes (INTERSTICIOS_MILITARES).
+        # A lógica de abreviaturas está agora apenas no mapeamento de nomes (regras.abreviaturas).
         
         if funcionalidade == 'Próxima Promoção Imediata':
-            calcular_proxima_imediata_streamlit(graduacao_input, data_ultima_promocao, data_nascimento, houve_reducao)
+            calcular_proxima_imediata_streamlit(graduacao_input, data_ultima_promocao, data_nascimento, houve_reducao, regras)
         
         elif funcionalidade == 'Plano de Carreira (Melhor Cenário)':
             # Índice 1 = Reduzido (Melhor)
-            projetar_promocoes_streamlit(graduacao_input, data_ultima_promocao, 1, data_nascimento)
+            projetar_promocoes_streamlit(graduacao_input, data_ultima_promocao, 1, data_nascimento, regras)
             
         elif funcionalidade == 'Plano de Carreira (Pior Cenário)':
             # Índice 0 = Completo (Pior)
-            projetar_promocoes_streamlit(graduacao_input, data_ultima_promocao, 0, data_nascimento)
+            projetar_promocoes_streamlit(graduacao_input, data_ultima_promocao, 0, data_nascimento, regras)
             
         elif funcionalidade == 'Exibir Tabela de Interstícios':
-            exibir_intersticios_streamlit()
+            exibir_intersticios_streamlit(regras)
 
 # Comando para rodar a aplicação Streamlit
 if __name__ == '__main__':
@@ -0,0 +1,223 @@
+"""
+Benchmarks das funções de projeção sobre efetivos sintéticos.
+
+Mede vazão (militares/s), latência por chamada (percentis) e pico de memória
+das funções escalares (`calcular_proxima_promocao`, `calcular_idade`,
+`projetar_promocoes`), da cadeia completa vetorizada e por tabela e,
+opcionalmente, das funções de renderização do app Streamlit. Uso:
+
+    python benchmark.py --tamanhos 1000 100000 1000000 --json resultado.json
+
+O JSON gravado pode ser comparado entre execuções para detectar regressões.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from typing import Callable, List, Optional
+
+import numpy as np
+
+import main as console
+import nucleo
+from efetivo_sintetico import gerar_efetivo
+from nucleo import INTERSTICIOS_MILITARES, ORDEM_GRADUACOES
+
+PERCENTIS = (50, 90, 99, 99.9)
+
+# --- 1. Medição ---
+
+def _resumo(caso: str, tamanho: int, itens: int, latencias_ns: List[int], segundos: float, pico_bytes: int) -> dict:
+    latencias = np.array(latencias_ns, dtype=np.float64) / 1000
+    return {
+        "caso": caso,
+        "tamanho_efetivo": tamanho,
+        "itens": itens,
+        "segundos": round(segundos, 6),
+        "itens_por_segundo": round(itens / segundos, 1) if segundos > 0 else None,
+        "latencia_us": {
+            **{f"p{p:g}": round(float(np.percentile(latencias, p)), 3) for p in PERCENTIS},
+            "max": round(float(latencias.max()), 3),
+        },
+        "pico_memoria_mb": round(pico_bytes / 2**20, 3),
+    }
+
+
+def medir_por_item(caso: str, tamanho: int, funcao: Callable, argumentos: list) -> dict:
+    """Chama `funcao(*args)` para cada item, medindo a latência individual de cada chamada."""
+    relogio = time.perf_counter_ns
+    latencias = []
+    inicio = time.perf_counter()
+    for args in argumentos:
+        t0 = relogio()
+        funcao(*args)
+        latencias.append(relogio() - t0)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    for args in argumentos[:10_000]:
+        funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _resumo(caso, tamanho, len(argumentos), latencias, segundos, pico)
+
+
+def medir_em_lote(caso: str, tamanho: int, funcao: Callable, repeticoes: int) -> dict:
+    """Chama `funcao()` (que processa o efetivo inteiro) `repeticoes` vezes."""
+    latencias = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter_ns()
+        funcao()
+        latencias.append(time.perf_counter_ns() - t0)
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _resumo(caso, tamanho, tamanho, latencias, min(latencias) / 1e9, pico)
+
+# --- 2. Casos ---
+
+def _cadeia_escalar(graduacao: str, data_base: date, indice: int, nascimento: date):
+    """Mesmo laço de `projetar_promocoes`, sem a impressão no console."""
+    data_cursor = data_base
+    resultado = []
+    for i in range(ORDEM_GRADUACOES.index(graduacao), len(ORDEM_GRADUACOES) - 1):
+        intersticio = INTERSTICIOS_MILITARES.get(ORDEM_GRADUACOES[i], [0, 0])[indice]
+        data_cursor = nucleo.calcular_proxima_promocao(data_cursor, intersticio)
+        resultado.append((data_cursor, nucleo.calcular_idade(nascimento, data_cursor)))
+    return resultado
+
+
+def _projetar_promocoes_silencioso(graduacao: str, data_base: date, indice: int, nascimento: date):
+    with contextlib.redirect_stdout(io.StringIO()):
+        console.projetar_promocoes(graduacao, data_base, indice, nascimento)
+
+
+def casos_escalares(efetivo: dict, tamanho: int, amostra: Optional[int]) -> List[dict]:
+    limite = tamanho if amostra is None else min(tamanho, amostra)
+    graduacoes = [ORDEM_GRADUACOES[g] for g in efetivo["graduacoes"][:limite]]
+    datas_base = efetivo["datas_base"][:limite].astype(object)
+    nascimentos = efetivo["nascimentos"][:limite].astype(object)
+    cenarios = [i % 2 for i in range(limite)]
+    em_carreira = [(g, b, c, n) for g, b, c, n in zip(graduacoes, datas_base, cenarios, nascimentos) if g != "Subtenente"]
+
+    return [
+        medir_por_item("calcular_proxima_promocao", tamanho, nucleo.calcular_proxima_promocao,
+                       [(b, INTERSTICIOS_MILITARES[g][c]) for g, b, c, _ in em_carreira]),
+        medir_por_item("calcular_idade", tamanho, nucleo.calcular_idade,
+                       [(n, b) for _, b, _, n in em_carreira]),
+        medir_por_item("cadeia_escalar", tamanho, _cadeia_escalar, em_carreira),
+        medir_por_item("projetar_promocoes (console)", tamanho, _projetar_promocoes_silencioso,
+                       em_carreira[:min(len(em_carreira), 20_000)]),
+    ]
+
+
+def casos_vetorizados(efetivo: dict, tamanho: int, repeticoes: int) -> List[dict]:
+    from projecao_vetorizada import projetar_promocoes_lote
+    from tabela_promocao import obter_tabela, projetar_lote_tabela
+    from ondas_promocao import calendario, contar_promocoes
+    from triagem_idade import triar_efetivo
+
+    cenarios = np.arange(tamanho) % 2
+    horizonte = calendario(date.today())
+    args = (efetivo["datas_base"], efetivo["graduacoes"], cenarios, efetivo["nascimentos"])
+    obter_tabela()  # Construção/carga da tabela fora da medição
+
+    return [
+        medir_em_lote("projetar_promocoes_lote", tamanho, lambda: projetar_promocoes_lote(*args), repeticoes),
+        medir_em_lote("projetar_lote_tabela", tamanho, lambda: projetar_lote_tabela(*args), repeticoes),
+        medir_em_lote("triar_efetivo (2 cenários)", tamanho, lambda: triar_efetivo(
+            efetivo["datas_base"], efetivo["graduacoes"], efetivo["nascimentos"], efetivo["ingressos"]), repeticoes),
+        medir_em_lote("ondas de promoção (2 cenários)", tamanho, lambda: [contar_promocoes(
+            projetar_promocoes_lote(efetivo["datas_base"], efetivo["graduacoes"], c)["datas"], horizonte) for c in (0, 1)],
+            repeticoes),
+    ]
+
+
+def casos_app(efetivo: dict, tamanho: int) -> List[dict]:
+    """Funções de renderização do app_final em modo bare (sem servidor), com cache limpo a cada chamada."""
+    import streamlit as st
+    # Modo bare: silencia os avisos de "missing ScriptRunContext" repetidos a cada chamada
+    for nome in list(logging.root.manager.loggerDict):
+        if nome.startswith("streamlit"):
+            logging.getLogger(nome).setLevel(logging.ERROR)
+    with contextlib.redirect_stderr(io.StringIO()):
+        import app_final
+
+    regras = app_final.obter_regras()
+    limite = min(tamanho, 500)
+    itens = [(ORDEM_GRADUACOES[g], b, n, i % 2)
+             for i, (g, b, n) in enumerate(zip(efetivo["graduacoes"][:limite],
+                                               efetivo["datas_base"][:limite].astype(object),
+                                               efetivo["nascimentos"][:limite].astype(object)))
+             if g < len(ORDEM_GRADUACOES) - 1]
+
+    def _frio(render):
+        def _chamar(*args):
+            st.cache_data.clear()
+            render(*args)
+        return _chamar
+
+    return [
+        medir_por_item("render_proxima_promocao", tamanho, _frio(app_final.render_proxima_promocao),
+                       [(g, b, n, bool(c), regras.assinatura) for g, b, n, c in itens]),
+        medir_por_item("render_plano_carreira", tamanho, _frio(app_final.render_plano_carreira),
+                       [(g, b, c, n, regras) for g, b, n, c in itens]),
+        medir_por_item("render_plano_carreira (cache)", tamanho, app_final.render_plano_carreira,
+                       [(g, b, c, n, regras) for g, b, n, c in itens]),
+    ]
+
+# --- 3. Execução ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks das funções de projeção de carreira.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="Tamanhos de efetivo sintético (padrão: 1000 100000 1000000).")
+    parser.add_argument("--amostra", type=int, default=None,
+                        help="Limita o nº de militares nos casos escalares (padrão: efetivo inteiro).")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições dos casos vetorizados (padrão: 3).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do efetivo sintético.")
+    parser.add_argument("--app", action="store_true", help="Inclui as funções de renderização do app_final.")
+    parser.add_argument("--sem-escalar", action="store_true", help="Pula os casos escalares.")
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava os resultados em JSON.")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    print(f"{'CASO':<30} | {'EFETIVO':>9} | {'ITENS/S':>12} | {'P50 µs':>9} | {'P99 µs':>10} | {'PICO MB':>8}")
+    print("-" * 92)
+    for tamanho in args.tamanhos:
+        efetivo = gerar_efetivo(tamanho, args.semente)
+        casos = []
+        if not args.sem_escalar:
+            casos += casos_escalares(efetivo, tamanho, args.amostra)
+        casos += casos_vetorizados(efetivo, tamanho, args.repeticoes)
+        if args.app:
+            casos += casos_app(efetivo, tamanho)
+
+        for r in casos:
+            print(f"{r['caso']:<30} | {r['tamanho_efetivo']:>9} | {r['itens_por_segundo']:>12,.0f} | "
+                  f"{r['latencia_us']['p50']:>9.2f} | {r['latencia_us']['p99']:>10.2f} | {r['pico_memoria_mb']:>8.2f}")
+        resultados += casos
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "plataforma": platform.platform(),
+                "processador": platform.processor() or platform.machine(),
+                "semente": args.semente,
+                "resultados": resultados,
+            }, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
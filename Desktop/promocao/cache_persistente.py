@@ -0,0 +1,381 @@
+"""
+Cache persistente de projeções, compartilhado entre processos (workers do app,
+api.py e lotes noturnos) num arquivo SQLite em modo WAL.
+
+A chave é o hash de (assinatura das regras, nome da função, argumentos): um
+resultado calculado uma vez é reaproveitado por todos os processos e pelas
+execuções seguintes. A assinatura é lida a cada chamada (`obter_regras()`, ou
+a função dada a `persistente`), então uma mudança em regras.json gera chaves
+novas mesmo em processos que já estavam rodando. Leituras
+não bloqueiam umas às outras; gravações, atualização de uso (LRU) e contadores
+são acumulados em memória e descarregados numa só transação a cada
+DESCARGA_MAXIMA operações ou INTERVALO_DESCARGA segundos. Acima do limite de
+tamanho ou de entradas, as menos usadas recentemente são descartadas.
+
+Desligado por padrão. Liga com a variável de ambiente PROMOCAO_CACHE (caminho
+do arquivo) ou `configurar(caminho)` (`main.py --cache`):
+
+    PROMOCAO_CACHE=/var/cache/promocao.db      arquivo compartilhado
+    PROMOCAO_CACHE_MB=256                      limite de tamanho (padrão: 128)
+
+    python cache_persistente.py estatisticas [--cache ARQUIVO]
+    python cache_persistente.py limpar [--cache ARQUIVO]
+
+Os valores são gravados com pickle: use um arquivo acessível só aos processos
+do próprio sistema. Usa apenas a biblioteca padrão (sqlite3 só é importado
+quando o cache está ligado).
+"""
+import argparse
+import atexit
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import metricas
+from regras import obter_regras
+
+# Versão do esquema (PRAGMA user_version); arquivos de outra versão são recriados
+VERSAO = 1
+
+LIMITE_MB_PADRAO = 128
+LIMITE_ENTRADAS_PADRAO = 1_000_000
+
+# Descarte LRU: ao passar do limite, reduz até esta fração dele
+FRACAO_APOS_DESCARTE = 0.9
+
+# Operações pendentes / segundos até a próxima descarga
+DESCARGA_MAXIMA = 256
+INTERVALO_DESCARGA = 2.0
+
+# Segundos entre atualizações do último uso de uma entrada (LRU aproximado, sem gravação a cada acerto)
+RESOLUCAO_USO = 60 * 60
+
+# Espera máxima por uma trava de gravação de outro processo (ms)
+ESPERA_TRAVA_MS = 5000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    chave BLOB PRIMARY KEY,
+    valor BLOB NOT NULL,
+    tamanho INTEGER NOT NULL,
+    usado_em REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entradas_usado_em ON entradas (usado_em);
+CREATE TABLE IF NOT EXISTS contadores (
+    nome TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# --- 1. Cache em SQLite ---
+
+class Estatisticas(NamedTuple):
+    acertos: int
+    falhas: int
+    gravacoes: int
+    descartes: int
+    entradas: int
+    tamanho: int        # Bytes dos valores gravados
+
+    @property
+    def taxa_acerto(self) -> float:
+        consultas = self.acertos + self.falhas
+        return self.acertos / consultas if consultas else 0.0
+
+
+class CachePersistente:
+    """
+    Cache chave -> valor (pickle) num arquivo SQLite. Seguro entre threads
+    (uma conexão por thread) e processos (WAL + trava de gravação do SQLite,
+    conexões reabertas após fork).
+    """
+
+    def __init__(self, caminho: str, limite_bytes: int = LIMITE_MB_PADRAO << 20,
+                 limite_entradas: int = LIMITE_ENTRADAS_PADRAO):
+        self.caminho = caminho
+        self.limite_bytes = limite_bytes
+        self.limite_entradas = limite_entradas
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._pid = os.getpid()
+        self._novas: Dict[bytes, bytes] = {}     # chave -> valor serializado ainda não gravado
+        self._usadas: Dict[bytes, float] = {}    # chave -> instante do último acerto
+        self._contagens = {"acertos": 0, "falhas": 0}
+        self._ultima_descarga = time.monotonic()
+        self._conexao().close()                  # Cria o arquivo e o esquema já na abertura
+        self._local.conexao = None
+
+    def _conexao(self):
+        if os.getpid() != self._pid:
+            # Processo filho (fork): conexões e pendências são do processo pai
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._trava = threading.Lock()
+            self._novas, self._usadas = {}, {}
+            self._contagens = {"acertos": 0, "falhas": 0}
+
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            import sqlite3
+            conexao = sqlite3.connect(self.caminho, timeout=ESPERA_TRAVA_MS / 1000, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            if conexao.execute("PRAGMA user_version").fetchone()[0] != VERSAO:
+                conexao.execute("BEGIN IMMEDIATE")
+                # Confere de novo com a trava: outro processo pode ter criado o esquema antes
+                if conexao.execute("PRAGMA user_version").fetchone()[0] != VERSAO:
+                    conexao.execute("DROP TABLE IF EXISTS entradas")
+                    conexao.execute("DROP TABLE IF EXISTS contadores")
+                    for comando in _ESQUEMA.split(";"):
+                        if comando.strip():
+                            conexao.execute(comando)
+                    conexao.execute(f"PRAGMA user_version={VERSAO}")
+                conexao.execute("COMMIT")
+            self._local.conexao = conexao
+        return conexao
+
+    @staticmethod
+    def chave(nome: str, args: tuple, kwargs: dict, assinatura: str) -> bytes:
+        """
+        Hash de (assinatura das regras usadas no cálculo, função, argumentos).
+        Usa o repr dos argumentos, estável entre processos para str, números,
+        datas, bytes e tuplas (o pickle varia com a identidade dos objetos).
+        """
+        dados = repr((assinatura, nome, args, sorted(kwargs.items()))).encode("utf-8")
+        return hashlib.blake2b(dados, digest_size=16).digest()
+
+    def obter(self, chave: bytes) -> Tuple[bool, Any]:
+        """(True, valor) em caso de acerto; (False, None) se a chave não estiver no cache."""
+        conexao = self._conexao()
+        agora = time.time()
+        with self._trava:
+            serializado = self._novas.get(chave)
+        if serializado is None:
+            linha = conexao.execute("SELECT valor, usado_em FROM entradas WHERE chave = ?", (chave,)).fetchone()
+            serializado, usado_em = linha if linha else (None, agora)
+        else:
+            usado_em = agora
+
+        with self._trava:
+            if serializado is None:
+                self._contagens["falhas"] += 1
+            else:
+                self._contagens["acertos"] += 1
+                if agora - usado_em >= RESOLUCAO_USO:
+                    self._usadas[chave] = agora
+        metricas.contar("cache_persistente", resultado="falha" if serializado is None else "acerto")
+        self._talvez_descarregar()
+        return (False, None) if serializado is None else (True, pickle.loads(serializado))
+
+    def gravar(self, chave: bytes, valor: Any) -> None:
+        """Agenda a gravação de `valor` (vai ao arquivo na próxima descarga)."""
+        self._conexao()
+        with self._trava:
+            self._novas[chave] = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        self._talvez_descarregar()
+
+    def _talvez_descarregar(self) -> None:
+        if (len(self._novas) + len(self._usadas) >= DESCARGA_MAXIMA
+                or time.monotonic() - self._ultima_descarga >= INTERVALO_DESCARGA):
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        """Grava as entradas novas, o uso (LRU) e os contadores pendentes numa transação e aplica os limites."""
+        conexao = self._conexao()
+        with self._trava:
+            novas, self._novas = self._novas, {}
+            usadas, self._usadas = self._usadas, {}
+            contagens, self._contagens = self._contagens, {"acertos": 0, "falhas": 0}
+            self._ultima_descarga = time.monotonic()
+        if not (novas or usadas or any(contagens.values())):
+            return
+
+        agora = time.time()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            incluidas = tamanho = 0
+            for chave, serializado in novas.items():
+                cursor = conexao.execute("INSERT OR IGNORE INTO entradas VALUES (?, ?, ?, ?)",
+                                         (chave, serializado, len(serializado), agora))
+                if cursor.rowcount == 1:    # Outro processo pode ter gravado a mesma chave antes
+                    incluidas += 1
+                    tamanho += len(serializado)
+            conexao.executemany("UPDATE entradas SET usado_em = ? WHERE chave = ?",
+                                [(instante, chave) for chave, instante in usadas.items()])
+            _somar(conexao, acertos=contagens["acertos"], falhas=contagens["falhas"],
+                   gravacoes=incluidas, entradas=incluidas, tamanho=tamanho)
+            self._descartar(conexao)
+            conexao.execute("COMMIT")
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+
+    def _descartar(self, conexao) -> None:
+        """Remove as entradas menos usadas recentemente até voltar a FRACAO_APOS_DESCARTE dos limites."""
+        valores = _ler_contadores(conexao)
+        if valores.get("tamanho", 0) <= self.limite_bytes and valores.get("entradas", 0) <= self.limite_entradas:
+            return
+        alvo_bytes = int(self.limite_bytes * FRACAO_APOS_DESCARTE)
+        alvo_entradas = int(self.limite_entradas * FRACAO_APOS_DESCARTE)
+        tamanho, entradas = valores.get("tamanho", 0), valores.get("entradas", 0)
+        removidas = removidos_bytes = 0
+        while tamanho - removidos_bytes > alvo_bytes or entradas - removidas > alvo_entradas:
+            antigas = conexao.execute("SELECT chave, tamanho FROM entradas ORDER BY usado_em LIMIT ?",
+                                      (DESCARGA_MAXIMA,)).fetchall()
+            if not antigas:
+                break
+            conexao.executemany("DELETE FROM entradas WHERE chave = ?", [(chave,) for chave, _ in antigas])
+            removidas += len(antigas)
+            removidos_bytes += sum(t for _, t in antigas)
+        _somar(conexao, descartes=removidas, entradas=-removidas, tamanho=-removidos_bytes)
+        metricas.contar("cache_persistente_descartes", removidas)
+
+    def estatisticas(self) -> Estatisticas:
+        """Contadores acumulados por todos os processos (após descarregar os deste)."""
+        self.descarregar()
+        valores = _ler_contadores(self._conexao())
+        return Estatisticas(*(valores.get(campo, 0) for campo in Estatisticas._fields))
+
+    def limpar(self) -> None:
+        """Apaga todas as entradas e zera os contadores."""
+        conexao = self._conexao()
+        with self._trava:
+            self._novas, self._usadas = {}, {}
+            self._contagens = {"acertos": 0, "falhas": 0}
+        conexao.execute("BEGIN IMMEDIATE")
+        conexao.execute("DELETE FROM entradas")
+        conexao.execute("DELETE FROM contadores")
+        conexao.execute("COMMIT")
+        conexao.execute("VACUUM")
+
+
+def _somar(conexao, **valores: int) -> None:
+    conexao.executemany(
+        "INSERT INTO contadores VALUES (?, ?) ON CONFLICT (nome) DO UPDATE SET valor = valor + excluded.valor",
+        [(nome, valor) for nome, valor in valores.items() if valor],
+    )
+
+
+def _ler_contadores(conexao) -> Dict[str, int]:
+    return dict(conexao.execute("SELECT nome, valor FROM contadores"))
+
+# --- 2. Cache do Processo e Decorador ---
+
+_cache: Optional[CachePersistente] = None
+_configurado = False
+_trava_configuracao = threading.Lock()
+
+
+def configurar(caminho: Optional[str], limite_mb: Optional[int] = None) -> Optional[CachePersistente]:
+    """Liga o cache do processo em `caminho` (None desliga). Processos filhos herdam pela variável de ambiente."""
+    global _cache, _configurado
+    with _trava_configuracao:
+        if _cache is not None:
+            _cache.descarregar()
+        limite_mb = limite_mb or int(os.environ.get("PROMOCAO_CACHE_MB") or LIMITE_MB_PADRAO)
+        _cache = CachePersistente(caminho, limite_mb << 20) if caminho else None
+        _configurado = True
+        if caminho:
+            os.environ["PROMOCAO_CACHE"] = caminho
+            os.environ["PROMOCAO_CACHE_MB"] = str(limite_mb)
+        else:
+            os.environ.pop("PROMOCAO_CACHE", None)
+    return _cache
+
+
+def obter_cache() -> Optional[CachePersistente]:
+    """Cache do processo (None se desligado); na primeira chamada lê PROMOCAO_CACHE."""
+    if not _configurado:
+        configurar(os.environ.get("PROMOCAO_CACHE"))
+    return _cache
+
+
+def descarregar() -> None:
+    """Descarrega as pendências do cache do processo (sem efeito se desligado; erros do SQLite são só contados)."""
+    if _cache is None:
+        return
+    import sqlite3
+    try:
+        _cache.descarregar()
+    except sqlite3.Error:
+        metricas.contar("cache_persistente_erros")
+
+
+atexit.register(descarregar)
+
+
+def _assinatura_atual() -> str:
+    return obter_regras().assinatura
+
+
+def persistente(nome: Optional[str] = None, assinatura: Optional[Callable[[], str]] = None) -> Callable:
+    """
+    Decorador: consulta o cache persistente antes de executar a função (sem
+    efeito com o cache desligado). Argumentos e resultado devem ser
+    serializáveis com pickle; erros do SQLite viram falha de cache.
+    `assinatura()` dá a assinatura das regras com que a função calcula,
+    lida a cada chamada (padrão: a versão atual de regras.json; quem calcula
+    com as constantes de nucleo.py passa `lambda: nucleo.ASSINATURA_REGRAS`).
+    """
+    assinatura = assinatura or _assinatura_atual
+
+    def decorar(funcao):
+        # Nome do arquivo, não __module__: o script principal é "__main__" só no processo que o executa
+        modulo = os.path.splitext(os.path.basename(funcao.__code__.co_filename))[0]
+        rotulo = nome or f"{modulo}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def chamar(*args, **kwargs):
+            cache = obter_cache()
+            if cache is None:
+                return funcao(*args, **kwargs)
+            import sqlite3
+            try:
+                chave = cache.chave(rotulo, args, kwargs, assinatura())
+                achou, valor = cache.obter(chave)
+            except sqlite3.Error:
+                metricas.contar("cache_persistente_erros")
+                return funcao(*args, **kwargs)
+            if achou:
+                return valor
+            valor = funcao(*args, **kwargs)
+            try:
+                cache.gravar(chave, valor)
+            except sqlite3.Error:
+                metricas.contar("cache_persistente_erros")
+            return valor
+        return chamar
+    return decorar
+
+# --- 3. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas e manutenção do cache persistente de projeções.")
+    parser.add_argument("comando", choices=["estatisticas", "limpar"])
+    parser.add_argument("--cache", default=os.environ.get("PROMOCAO_CACHE"),
+                        help="Arquivo do cache (padrão: PROMOCAO_CACHE).")
+    args = parser.parse_args(argv)
+    if not args.cache:
+        parser.error("informe --cache ou defina PROMOCAO_CACHE.")
+    if not os.path.exists(args.cache):
+        parser.error(f"{args.cache} não existe.")
+
+    cache = CachePersistente(args.cache)
+    if args.comando == "limpar":
+        cache.limpar()
+        print(f"{args.cache}: cache esvaziado.")
+        return
+
+    e = cache.estatisticas()
+    print(f"Arquivo:    {args.cache} ({os.path.getsize(args.cache) / 2**20:.1f} MB em disco)")
+    print(f"Entradas:   {e.entradas} ({e.tamanho / 2**20:.1f} MB em valores)")
+    print(f"Consultas:  {e.acertos + e.falhas} | acertos {e.acertos} | falhas {e.falhas} | taxa {e.taxa_acerto:.1%}")
+    print(f"Gravações:  {e.gravacoes} | descartes (LRU) {e.descartes}")
+
+
+if __name__ == "__main__":
+    main()
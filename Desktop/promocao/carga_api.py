@@ -0,0 +1,171 @@
+"""
+Teste de carga da API local (api.py): dispara pedidos concorrentes e mede
+requisições/s e latência (p50, p90, p99, máx.).
+
+Os pedidos usam militares de um efetivo sintético. Sem `--url`, o script sobe
+a API num subprocesso (numa porta livre, salvo `--porta`), aguarda ficar
+pronta e a encerra ao final. Uso:
+
+    python carga_api.py --requisicoes 20000 --concorrencia 200 --endpoint proxima
+    python carga_api.py --url http://127.0.0.1:8000 --endpoint lote --tamanho-lote 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+from urllib.parse import urlencode
+
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+
+from efetivo_sintetico import gerar_efetivo
+from nucleo import ABREVIATURAS_MAP, ORDEM_GRADUACOES
+
+PERCENTIS = (50, 90, 99)
+
+# --- 1. Pedidos ---
+
+def montar_pedidos(url: str, endpoint: str, quantidade: int, tamanho_lote: int, semente: int) -> List[HTTPRequest]:
+    """Pedidos de militares sintéticos (Subtenentes ficam de fora: não têm próxima promoção)."""
+    siglas = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}
+    efetivo = gerar_efetivo(max(quantidade * (tamanho_lote if endpoint == "lote" else 1), 1) * 2, semente)
+    em_carreira = efetivo["graduacoes"] < len(ORDEM_GRADUACOES) - 1
+    graduacoes = [siglas[ORDEM_GRADUACOES[g]] for g in efetivo["graduacoes"][em_carreira]]
+    datas = np.datetime_as_string(efetivo["datas_base"][em_carreira]).tolist()
+    nascimentos = np.datetime_as_string(efetivo["nascimentos"][em_carreira]).tolist()
+    militares = [{"graduacao": g, "data_ultima_promocao": d, "data_nascimento": n, "cenario": ("completo", "reduzido")[i % 2]}
+                 for i, (g, d, n) in enumerate(zip(graduacoes, datas, nascimentos))]
+
+    url = url.rstrip("/")
+    if endpoint == "lote":
+        return [HTTPRequest(f"{url}/lote", method="POST", body=json.dumps({"efetivo": militares[i * tamanho_lote:(i + 1) * tamanho_lote]}),
+                            headers={"Content-Type": "application/json"})
+                for i in range(quantidade)]
+    return [HTTPRequest(f"{url}/{endpoint}?" + urlencode({"graduacao": m["graduacao"], "data": m["data_ultima_promocao"],
+                                                     "nascimento": m["data_nascimento"], "cenario": m["cenario"]}))
+            for m in militares[:quantidade]]
+
+# --- 2. Carga ---
+
+async def disparar(url: str, pedidos: List[HTTPRequest], concorrencia: int) -> dict:
+    """Executa os pedidos com no máximo `concorrencia` em voo; retorna tempos e erros."""
+    AsyncHTTPClient.configure(None, max_clients=concorrencia)
+    cliente = AsyncHTTPClient()
+    latencias = []
+    erros = 0
+    fila = iter(pedidos)
+
+    async def trabalhador():
+        nonlocal erros
+        for pedido in fila:
+            inicio = time.perf_counter()
+            try:
+                await cliente.fetch(pedido)
+            except (HTTPClientError, OSError):
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    saude = json.loads((await cliente.fetch(url.rstrip("/") + "/saude")).body)
+    cliente.close()
+    return {"latencias": latencias, "erros": erros, "segundos": duracao, "saude": saude}
+
+
+def porta_livre() -> int:
+    """Porta TCP livre em 127.0.0.1, escolhida pelo sistema."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as soquete:
+        soquete.bind(("127.0.0.1", 0))
+        return soquete.getsockname()[1]
+
+
+async def aguardar_api(url: str, limite_s: float = 15.0, servidor: Optional[subprocess.Popen] = None):
+    """
+    Espera /saude responder. Com `servidor` (a API local), falha se o processo
+    terminar antes: sem isso, outra aplicação na mesma porta seria medida.
+    """
+    cliente = AsyncHTTPClient()
+    fim = time.monotonic() + limite_s
+    while True:
+        if servidor is not None and servidor.poll() is not None:
+            raise RuntimeError(f"API local encerrou (código {servidor.returncode}) antes de ficar pronta em {url}")
+        try:
+            await cliente.fetch(url.rstrip("/") + "/saude")
+        except (OSError, HTTPClientError):
+            if time.monotonic() > fim:
+                raise RuntimeError(f"API não respondeu em {url}")
+            await asyncio.sleep(0.1)
+            continue
+        # A resposta pode vir de outro processo se a API local falhou ao abrir a porta
+        await asyncio.sleep(0.2)
+        if servidor is not None and servidor.poll() is not None:
+            raise RuntimeError(f"API local encerrou (código {servidor.returncode}); {url} responde por outro processo")
+        return
+
+# --- 3. Execução ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API de projeções.")
+    parser.add_argument("--url", default=None, help="URL da API (padrão: sobe api.py localmente).")
+    parser.add_argument("--porta", type=int, default=None, help="Porta da API local iniciada pelo script (padrão: uma livre).")
+    parser.add_argument("--janela-ms", type=float, default=None, help="Janela de agrupamento da API local.")
+    parser.add_argument("--endpoint", choices=["proxima", "plano", "lote"], default="proxima")
+    parser.add_argument("--requisicoes", type=int, default=10_000)
+    parser.add_argument("--concorrencia", type=int, default=100)
+    parser.add_argument("--tamanho-lote", type=int, default=500, help="Militares por pedido em /lote.")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava o resumo em JSON.")
+    args = parser.parse_args(argv)
+
+    servidor = None
+    url = args.url
+    if url is None:
+        porta = args.porta or porta_livre()
+        url = f"http://127.0.0.1:{porta}"
+        pasta = os.path.dirname(os.path.abspath(__file__))
+        comando = [sys.executable, os.path.join(pasta, "api.py"), "--porta", str(porta)]
+        if args.janela_ms is not None:
+            comando += ["--janela-ms", str(args.janela_ms)]
+        servidor = subprocess.Popen(comando, cwd=pasta, stdout=subprocess.DEVNULL)
+
+    try:
+        pedidos = montar_pedidos(url, args.endpoint, args.requisicoes, args.tamanho_lote, args.semente)
+        asyncio.run(aguardar_api(url, servidor=servidor))
+        medicao = asyncio.run(disparar(url, pedidos, args.concorrencia))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias_ms = np.array(medicao["latencias"]) * 1000
+    resumo = {
+        "endpoint": args.endpoint,
+        "requisicoes": len(pedidos),
+        "concorrencia": args.concorrencia,
+        "erros": medicao["erros"],
+        "requisicoes_por_segundo": round(len(pedidos) / medicao["segundos"], 1),
+        "latencia_ms": {**{f"p{p}": round(float(np.percentile(latencias_ms, p)), 3) for p in PERCENTIS},
+                        "max": round(float(latencias_ms.max()), 3)},
+        "agrupamento": medicao["saude"],
+    }
+    if args.endpoint == "lote":
+        resumo["militares_por_segundo"] = round(resumo["requisicoes_por_segundo"] * args.tamanho_lote, 1)
+
+    print(f"Endpoint /{args.endpoint}: {resumo['requisicoes']} requisições, concorrência {args.concorrencia}, {resumo['erros']} erros")
+    print(f"Vazão: {resumo['requisicoes_por_segundo']:.1f} req/s")
+    print("Latência (ms): " + " | ".join(f"{k} {v:.2f}" for k, v in resumo["latencia_ms"].items()))
+    if medicao["saude"].get("media_por_lote"):
+        print(f"Agrupamento: {medicao['saude']['media_por_lote']} pedidos por projeção em média")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Todas as combinações de interstícios reduzidos e completos até Subtenente.
+
+Entre os extremos de `projetar_promocoes` (sempre reduzido / sempre completo)
+há 2^k combinações para os k passos restantes. Cada passo depende apenas da
+data da promoção anterior, então os resultados são memorizados por
+(passo, data): ramos que chegam à mesma data compartilham todo o restante da
+árvore, e o trabalho cresce com o número de estados distintos, não de caminhos.
+Para um efetivo, o mesmo princípio vale com `np.unique` a cada passo. Uso:
+
+    python cenarios_mistos.py efetivo.csv --saida fronteira.csv
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from nucleo import ABREVIATURAS_MAP, INTERSTICIOS_MILITARES, ORDEM_GRADUACOES, calcular_idade, calcular_proxima_promocao
+from projecao_vetorizada import idade_vetorizada, indices_graduacao, proxima_promocao_vetorizada
+
+N_PASSOS = len(ORDEM_GRADUACOES) - 1
+
+# --- 1. Combinações de um Militar ---
+
+class Combinacao(NamedTuple):
+    """Uma escolha de interstício por passo restante e o resultado até Subtenente."""
+    intersticios: Tuple[int, ...]     # 0 = Completo, 1 = Reduzido, um por passo restante
+    datas: Tuple[date, ...]           # Data de cada promoção restante
+    idade_final: Optional[int]
+
+    @property
+    def reducoes(self) -> int:
+        return sum(self.intersticios)
+
+    @property
+    def data_final(self) -> date:
+        return self.datas[-1]
+
+
+@lru_cache(maxsize=65536)
+def _proxima(passo: int, data_base: date, indice: int) -> date:
+    meses = INTERSTICIOS_MILITARES.get(ORDEM_GRADUACOES[passo], [0, 0])[indice]
+    return calcular_proxima_promocao(data_base, meses)
+
+
+@lru_cache(maxsize=65536)
+def _ramos(passo: int, data_base: date) -> Tuple[Tuple[Tuple[int, ...], Tuple[date, ...]], ...]:
+    """Todos os caminhos a partir de `passo` com a graduação obtida em `data_base`."""
+    if passo == N_PASSOS:
+        return (((), ()),)
+    caminhos = []
+    for indice in (0, 1):
+        data_promocao = _proxima(passo, data_base, indice)
+        for intersticios, datas in _ramos(passo + 1, data_promocao):
+            caminhos.append(((indice,) + intersticios, (data_promocao,) + datas))
+    return tuple(caminhos)
+
+
+def listar_combinacoes(graduacao: str, data_base: date, data_nascimento: Optional[date] = None) -> List[Combinacao]:
+    """As 2^k combinações a partir de `graduacao`, da data final mais cedo para a mais tarde."""
+    passo = ORDEM_GRADUACOES.index(graduacao)
+    if passo == N_PASSOS:
+        return []
+    combinacoes = [
+        Combinacao(intersticios, datas, calcular_idade(data_nascimento, datas[-1]) if data_nascimento else None)
+        for intersticios, datas in _ramos(passo, data_base)
+    ]
+    return sorted(combinacoes, key=lambda c: (c.data_final, c.reducoes))
+
+
+def fronteira_pareto(combinacoes: List[Combinacao]) -> List[Combinacao]:
+    """
+    Combinações não dominadas em (nº de reduções, data final): para cada
+    quantidade de reduções, a que chega mais cedo, desde que chegue antes de
+    todas as que usam menos reduções.
+    """
+    fronteira = []
+    for combinacao in sorted(combinacoes, key=lambda c: (c.reducoes, c.data_final)):
+        if not fronteira or combinacao.data_final < fronteira[-1].data_final:
+            fronteira.append(combinacao)
+    return fronteira
+
+
+def estatisticas_memoizacao() -> Dict[str, int]:
+    """Estados distintos calculados e reaproveitados (para acompanhar o ganho da memoização)."""
+    proxima, ramos = _proxima.cache_info(), _ramos.cache_info()
+    return {"estados": proxima.currsize, "reaproveitados": proxima.hits + ramos.hits}
+
+# --- 2. Combinações de um Efetivo ---
+
+# Uma linha por combinação dos N_PASSOS passos (0 = Completo, 1 = Reduzido)
+COMBINACOES = np.array(list(product((0, 1), repeat=N_PASSOS)), dtype=np.int8)
+
+
+def combinacoes_lote(datas_base, graduacoes, datas_nascimento=None) -> Dict[str, np.ndarray]:
+    """
+    Data de Subtenente de cada militar em cada uma das 2^N_PASSOS combinações.
+
+    A cada passo, só as datas distintas do efetivo inteiro passam pelo cálculo
+    de datas (`np.unique`); depois do primeiro passo elas se resumem às datas
+    fixas de promoção. O restante é linear no efetivo vezes as 2^N_PASSOS
+    (32) combinações: o `np.unique` ordena n × 2^passo estados a cada passo e
+    o resultado é uma matriz (n, 32) de datetime64 (256 bytes por militar,
+    mais as reduções e idades). Passos já cumpridos não alteram a data, então
+    combinações que só diferem neles se repetem. Retorna "datas_finais"
+    (n, 2^N_PASSOS), "reducoes" (n, 2^N_PASSOS, contando só os passos
+    restantes) e "idades_finais" quando há nascimentos.
+    """
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]").ravel()
+    n = datas_base.shape[0]
+    graduacoes = np.broadcast_to(indices_graduacao(graduacoes), (n,))
+    ativo = graduacoes[:, None] <= np.arange(N_PASSOS)            # (n, passos)
+
+    estados = datas_base[:, None]                                   # (n, 2^passo)
+    for passo in range(N_PASSOS):
+        distintas, inversa = np.unique(estados, return_inverse=True)
+        proximas = np.stack([
+            proxima_promocao_vetorizada(distintas, INTERSTICIOS_MILITARES[ORDEM_GRADUACOES[passo]][indice])
+            for indice in (0, 1)
+        ], axis=-1)[inversa.reshape(estados.shape)]                 # (n, 2^passo, 2)
+        mantidas = np.repeat(estados[:, :, None], 2, axis=2)
+        estados = np.where(ativo[:, passo, None, None], proximas, mantidas).reshape(n, -1)
+
+    resultado = {
+        "graduacoes": np.asarray(graduacoes, dtype=np.uint8),
+        "datas_finais": estados,
+        "reducoes": (COMBINACOES[None, :, :] * ativo[:, None, :]).sum(axis=2, dtype=np.int8),
+    }
+    if datas_nascimento is not None:
+        nasc = np.broadcast_to(np.asarray(datas_nascimento, dtype="datetime64[D]").ravel(), (n,))
+        resultado["idades_finais"] = idade_vetorizada(nasc[:, None], estados)
+    return resultado
+
+
+def fronteira_lote(resultado: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Data de Subtenente mais cedo para cada quantidade de reduções (0 a N_PASSOS),
+    forma (n, N_PASSOS + 1). NaT quando a quantidade não é possível (passos
+    já cumpridos), não antecipa a data em relação a menos reduções ou o
+    militar já é Subtenente.
+    """
+    datas, reducoes = resultado["datas_finais"], resultado["reducoes"]
+    maximo = np.datetime64("9999-12-31", "D")
+    melhores = np.stack([np.where(reducoes == k, datas, maximo).min(axis=1) for k in range(N_PASSOS + 1)], axis=1)
+    melhores[resultado["graduacoes"] == N_PASSOS] = maximo
+
+    # Remove as quantidades dominadas (não chegam antes do que já se alcança com menos reduções)
+    anteriores = np.minimum.accumulate(melhores, axis=1)
+    dominada = np.zeros_like(melhores, dtype=bool)
+    dominada[:, 1:] = melhores[:, 1:] >= anteriores[:, :-1]
+    return np.where(dominada | (melhores == maximo), np.datetime64("NaT", "D"), melhores)
+
+# --- 3. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fronteira de Pareto (reduções x data de Subtenente) de um efetivo.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (mesmo formato de `main.py --lote`).")
+    parser.add_argument("--saida", default="-", help="CSV de saída ('-' para stdout).")
+    args = parser.parse_args(argv)
+
+    from datetime import datetime
+    from main import detectar_delimitador, ler_efetivo, localizar_colunas
+    from nucleo import normalizar_graduacao
+
+    linhas, graduacoes, datas_base = [], [], []
+    with open(args.efetivo, encoding="utf-8", newline="") as arquivo:
+        delimitador = detectar_delimitador(arquivo.readline())
+        arquivo.seek(0)
+        registros = ler_efetivo(arquivo, delimitador)
+        posicoes = localizar_colunas(next(registros))
+        for numero, campos in enumerate(registros, start=1):
+            try:
+                graduacao = normalizar_graduacao(campos[posicoes["graduacao"]])
+                data_base = datetime.strptime(campos[posicoes["data_base"]].strip(), "%d/%m/%Y").date()
+            except (IndexError, ValueError):
+                graduacao = None
+            if graduacao is None:
+                print(f"Linha {numero}: graduação ou data inválida, ignorada.", file=sys.stderr)
+                continue
+            linhas.append(numero)
+            graduacoes.append(ORDEM_GRADUACOES.index(graduacao))
+            datas_base.append(data_base)
+
+    fronteira = fronteira_lote(combinacoes_lote(np.array(datas_base, dtype="datetime64[D]"), np.array(graduacoes)))
+    sigla_final = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}[ORDEM_GRADUACOES[-1]]
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(["linha"] + [f"promocao_{sigla_final}_{k}_reducoes" for k in range(N_PASSOS + 1)])
+    for numero, datas in zip(linhas, fronteira.astype(object)):
+        escritor.writerow([numero] + [d.strftime("%d/%m/%Y") if d else "" for d in datas])
+    if saida is not sys.stdout:
+        saida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Formato binário compacto do efetivo, mapeável em memória (memmap).
+
+Cada militar ocupa 18 bytes: graduação como índice uint8 em ORDEM_GRADUACOES,
+datas como int32 (dias desde 01/01/1970), linha de origem como uint32 e um
+byte de flags (bits FLAG_*) que marca as datas opcionais presentes. As colunas
+ficam contíguas no arquivo, alinhadas a 64 bytes, atrás de um cabeçalho fixo:
+
+    magia (8) | versão u16 | reservado (6) | n u64 | assinatura das regras (16) | reservado (24)
+
+Abrir o arquivo não copia nada: `abrir()` devolve arrays somente leitura sobre o
+mapeamento, cujas páginas o sistema compartilha entre processos. Vários
+trabalhadores podem projetar fatias do mesmo efetivo sem carregar cópias
+próprias (`projetar_paralelo`). A conversão de/para CSV preserva graduação,
+datas e linhas (a linha do CSV de origem volta na coluna "linha"); a
+graduação volta sempre pelo nome completo. Uso:
+
+    python efetivo_compacto.py de-csv efetivo.csv efetivo.bin
+    python efetivo_compacto.py para-csv efetivo.bin efetivo.csv
+    python efetivo_compacto.py info efetivo.bin
+    python efetivo_compacto.py projetar efetivo.bin --workers 4 --cenario reduzido
+"""
+import argparse
+import csv
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from nucleo import ORDEM_GRADUACOES
+from projecao_vetorizada import projetar_promocoes_lote
+from regras import obter_regras
+
+# --- 1. Formato ---
+
+MAGIA = b"PMDFEFC\x00"
+VERSAO = 1
+CABECALHO = struct.Struct("<8sH6xQ16s24x")   # 64 bytes
+ALINHAMENTO = 64
+
+# Bits do byte de flags
+FLAG_NASCIMENTO = 1
+FLAG_INGRESSO = 2
+
+# Colunas na ordem em que são gravadas (nome -> dtype)
+COLUNAS = (
+    ("linhas", np.dtype("<u4")),
+    ("graduacoes", np.dtype("u1")),
+    ("flags", np.dtype("u1")),
+    ("datas_base", np.dtype("<i4")),
+    ("nascimentos", np.dtype("<i4")),
+    ("ingressos", np.dtype("<i4")),
+)
+BYTES_POR_MILITAR = sum(dtype.itemsize for _, dtype in COLUNAS)
+
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+
+class ErroFormato(ValueError):
+    """Arquivo que não é um efetivo compacto válido para as regras atuais."""
+
+
+class EfetivoCompacto(NamedTuple):
+    linhas: np.ndarray        # uint32: linha no CSV de origem
+    graduacoes: np.ndarray    # uint8: índice em ORDEM_GRADUACOES
+    flags: np.ndarray         # uint8: FLAG_NASCIMENTO | FLAG_INGRESSO
+    datas_base: np.ndarray    # int32: dias desde 1970-01-01
+    nascimentos: np.ndarray   # int32 (0 se a flag estiver ausente)
+    ingressos: np.ndarray     # int32 (0 se a flag estiver ausente)
+
+    def __len__(self) -> int:
+        return self.graduacoes.shape[0]
+
+    def fatia(self, inicio: int, fim: int) -> "EfetivoCompacto":
+        """Visão das linhas [inicio, fim) sem cópia."""
+        return EfetivoCompacto(*(coluna[inicio:fim] for coluna in self))
+
+    def datas(self, coluna: str) -> np.ndarray:
+        """Coluna de datas como datetime64[D], com NaT onde a flag correspondente está ausente."""
+        dias = np.asarray(getattr(self, coluna)).astype("datetime64[D]")
+        bit = {"nascimentos": FLAG_NASCIMENTO, "ingressos": FLAG_INGRESSO}.get(coluna)
+        if bit is None:
+            return dias
+        return np.where(self.flags & bit, dias, np.datetime64("NaT", "D"))
+
+    def efetivo(self) -> Dict[str, np.ndarray]:
+        """Mesmo dicionário de `efetivo_sintetico.gerar_efetivo` (arrays datetime64[D])."""
+        return {"graduacoes": np.asarray(self.graduacoes), "datas_base": self.datas("datas_base"),
+                "nascimentos": self.datas("nascimentos"), "ingressos": self.datas("ingressos")}
+
+
+def _deslocamentos(n: int):
+    posicao = CABECALHO.size
+    for nome, dtype in COLUNAS:
+        yield nome, dtype, posicao
+        posicao += -(-n * dtype.itemsize // ALINHAMENTO) * ALINHAMENTO
+
+
+def compactar(graduacoes, datas_base, nascimentos=None, ingressos=None, linhas=None) -> EfetivoCompacto:
+    """Monta as colunas compactas a partir de arrays datetime64[D] (NaT nas datas opcionais = ausente)."""
+    graduacoes = np.asarray(graduacoes, dtype=np.uint8)
+    n = graduacoes.shape[0]
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]")
+    if np.isnat(datas_base).any():
+        raise ValueError("Data da última promoção ausente.")
+
+    flags = np.zeros(n, dtype=np.uint8)
+    colunas = []
+    for valores, bit in ((nascimentos, FLAG_NASCIMENTO), (ingressos, FLAG_INGRESSO)):
+        valores = np.full(n, np.datetime64("NaT", "D")) if valores is None else np.asarray(valores, dtype="datetime64[D]")
+        presente = ~np.isnat(valores)
+        flags |= np.where(presente, bit, 0).astype(np.uint8)
+        colunas.append(np.where(presente, valores.astype(np.int64), 0).astype(np.int32))
+
+    linhas = np.arange(1, n + 1) if linhas is None else linhas
+    return EfetivoCompacto(np.asarray(linhas, dtype=np.uint32), graduacoes, flags,
+                           datas_base.astype(np.int64).astype(np.int32), *colunas)
+
+
+def gravar(efetivo: EfetivoCompacto, caminho: str) -> int:
+    """Grava o arquivo compacto; retorna o tamanho em bytes."""
+    n = len(efetivo)
+    assinatura = obter_regras().assinatura.encode("ascii")
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIA, VERSAO, n, assinatura))
+        for nome, dtype, posicao in _deslocamentos(n):
+            arquivo.seek(posicao)
+            arquivo.write(np.ascontiguousarray(getattr(efetivo, nome), dtype=dtype).tobytes())
+        fim = max(posicao for _, _, posicao in _deslocamentos(n)) + n * COLUNAS[-1][1].itemsize
+        arquivo.truncate(fim)
+    return fim
+
+
+def abrir(caminho: str) -> EfetivoCompacto:
+    """Mapeia o arquivo em memória (somente leitura); nada é lido até as páginas serem acessadas."""
+    with open(caminho, "rb") as arquivo:
+        magia, versao, n, assinatura = CABECALHO.unpack(arquivo.read(CABECALHO.size).ljust(CABECALHO.size, b"\0"))
+    if magia != MAGIA or versao != VERSAO:
+        raise ErroFormato(f"{caminho} não é um efetivo compacto (versão {VERSAO}).")
+    if assinatura.decode("ascii") != obter_regras().assinatura:
+        # Índices de graduação só valem para a mesma ordem de graduações
+        raise ErroFormato(f"{caminho} foi gravado com outro conjunto de regras; converta o CSV novamente.")
+    if n == 0:
+        return EfetivoCompacto(*(np.empty(0, dtype=dtype) for _, dtype in COLUNAS))
+    return EfetivoCompacto(*(np.memmap(caminho, dtype=dtype, mode="r", offset=posicao, shape=(n,))
+                             for _, dtype, posicao in _deslocamentos(n)))
+
+# --- 2. Conversão CSV ---
+
+def de_csv(entrada: str, saida: str, tamanho_bloco: int = 16 << 20) -> Tuple[int, int]:
+    """CSV/TSV do efetivo -> arquivo compacto. Retorna (militares gravados, linhas inválidas)."""
+    from exportacao import ler_efetivo_em_blocos
+
+    blocos = []
+    invalidas = 0
+    for linhas, graduacoes, datas_base, nascimentos, ingressos, invalidas_bloco in ler_efetivo_em_blocos(entrada, tamanho_bloco):
+        blocos.append(compactar(graduacoes, datas_base, nascimentos, ingressos, linhas))
+        invalidas += invalidas_bloco
+    if not blocos:
+        blocos.append(compactar(np.empty(0), np.empty(0, dtype="datetime64[D]")))
+    efetivo = EfetivoCompacto(*(np.concatenate(colunas) for colunas in zip(*blocos)))
+    gravar(efetivo, saida)
+    return len(efetivo), invalidas
+
+
+def _texto_datas(dias: np.ndarray, presente: Optional[np.ndarray] = None) -> np.ndarray:
+    """int32 (dias) -> texto DD/MM/AAAA, vazio onde `presente` é falso (reordena os caracteres do ISO, sem laço)."""
+    iso = np.datetime_as_string(np.asarray(dias).astype("datetime64[D]")).astype("U10")
+    caracteres = iso.view("U1").reshape(-1, 10)[:, [8, 9, 4, 5, 6, 7, 0, 1, 2, 3]]
+    caracteres[:, [2, 5]] = "/"
+    texto = np.ascontiguousarray(caracteres).view("U10").ravel()
+    return texto if presente is None else np.where(presente, texto, "")
+
+
+def para_csv(entrada: str, saida: str, tamanho_bloco: int = 1 << 20) -> int:
+    """Arquivo compacto -> CSV no formato da saída de ingestao.py (linha de origem e data_ingresso). Retorna o nº de militares."""
+    efetivo = abrir(entrada)
+    nomes = np.array(ORDEM_GRADUACOES)
+    with open(saida, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo, lineterminator="\n")
+        escritor.writerow(["linha", "graduacao", "data_ultima_promocao", "data_nascimento", "data_ingresso"])
+        for inicio in range(0, len(efetivo), tamanho_bloco):
+            bloco = efetivo.fatia(inicio, inicio + tamanho_bloco)
+            escritor.writerows(zip(
+                bloco.linhas.tolist(),
+                nomes[bloco.graduacoes].tolist(),
+                _texto_datas(bloco.datas_base).tolist(),
+                _texto_datas(bloco.nascimentos, bloco.flags & FLAG_NASCIMENTO).tolist(),
+                _texto_datas(bloco.ingressos, bloco.flags & FLAG_INGRESSO).tolist(),
+            ))
+    return len(efetivo)
+
+# --- 3. Projeção Compartilhada entre Processos ---
+
+def _projetar_fatia(caminho: str, inicio: int, fim: int, cenario_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Trabalhador: mapeia o mesmo arquivo e projeta só a sua fatia."""
+    efetivo = abrir(caminho).fatia(inicio, fim)
+    resultado = projetar_promocoes_lote(efetivo.datas("datas_base"), efetivo.graduacoes, cenario_idx,
+                                        efetivo.datas("nascimentos"))
+    return resultado["data_final"], resultado["idade_final"]
+
+
+def projetar_paralelo(caminho: str, cenario_idx: int = 0, workers: Optional[int] = None,
+                      tamanho_fatia: int = 250_000) -> Dict[str, np.ndarray]:
+    """Data e idade na última promoção de todo o efetivo, com as fatias distribuídas entre processos."""
+    n = len(abrir(caminho))
+    workers = workers or os.cpu_count() or 1
+    fatias = [(inicio, min(inicio + tamanho_fatia, n)) for inicio in range(0, n, tamanho_fatia)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partes = list(executor.map(_projetar_fatia, *zip(*[(caminho, i, f, cenario_idx) for i, f in fatias])))
+    if not partes:
+        return {"data_final": np.empty(0, dtype="datetime64[D]"), "idade_final": np.empty(0, dtype=np.int16)}
+    return {"data_final": np.concatenate([p[0] for p in partes]), "idade_final": np.concatenate([p[1] for p in partes])}
+
+# --- 4. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Efetivo em formato binário compacto (memmap).")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comando = comandos.add_parser("de-csv", help="Converte o CSV/TSV do efetivo para o formato compacto.")
+    comando.add_argument("entrada")
+    comando.add_argument("saida")
+    comando = comandos.add_parser("para-csv", help="Converte o arquivo compacto de volta para CSV.")
+    comando.add_argument("entrada")
+    comando.add_argument("saida")
+    comando = comandos.add_parser("info", help="Resumo do arquivo compacto.")
+    comando.add_argument("arquivo")
+    comando = comandos.add_parser("projetar", help="Projeta o efetivo em vários processos sobre o mesmo mapeamento.")
+    comando.add_argument("arquivo")
+    comando.add_argument("--cenario", choices=list(CENARIOS), default="completo")
+    comando.add_argument("--workers", type=int, default=0, help="Nº de processos (padrão: todos os núcleos).")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.comando == "de-csv":
+        gravados, invalidas = de_csv(args.entrada, args.saida)
+        tamanho = f"{os.path.getsize(args.saida):,}".replace(",", ".")
+        print(f"{gravados} militares gravados em {args.saida} ({tamanho} bytes)", file=sys.stderr)
+        if invalidas:
+            print(f"{invalidas} linhas com graduação ou data inválida foram ignoradas.", file=sys.stderr)
+    elif args.comando == "para-csv":
+        print(f"{para_csv(args.entrada, args.saida)} militares gravados em {args.saida}", file=sys.stderr)
+    elif args.comando == "info":
+        efetivo = abrir(args.arquivo)
+        contagem = np.bincount(efetivo.graduacoes, minlength=len(ORDEM_GRADUACOES))
+        tamanho = f"{os.path.getsize(args.arquivo):,}".replace(",", ".")
+        print(f"{len(efetivo)} militares, {tamanho} bytes ({BYTES_POR_MILITAR} por militar)")
+        for graduacao, quantidade in zip(ORDEM_GRADUACOES, contagem):
+            print(f"  {graduacao:<12} {quantidade}")
+        print(f"  com nascimento: {int(np.count_nonzero(efetivo.flags & FLAG_NASCIMENTO))} | "
+              f"com ingresso: {int(np.count_nonzero(efetivo.flags & FLAG_INGRESSO))}")
+    else:
+        resultado = projetar_paralelo(args.arquivo, CENARIOS[args.cenario], args.workers or None)
+        finais = resultado["data_final"]
+        if finais.size:
+            print(f"{finais.shape[0]} militares projetados | última promoção entre {finais.min()} e {finais.max()}")
+        else:
+            print("0 militares projetados")
+    print(f"Tempo: {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
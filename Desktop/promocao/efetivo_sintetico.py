@@ -0,0 +1,62 @@
+"""
+Geração de efetivos sintéticos para benchmarks e testes de carga.
+
+A distribuição imita um quadro real de praças: pirâmide de graduações (muitos
+Soldados, poucos Subtenentes), última promoção nos últimos anos e idade de
+ingresso entre 18 e 30 anos.
+"""
+import csv
+from datetime import date
+from typing import Dict
+
+import numpy as np
+
+from nucleo import ORDEM_GRADUACOES
+
+# Proporção de cada graduação no efetivo (Soldado ... Subtenente)
+PROPORCAO_GRADUACOES = [0.42, 0.25, 0.13, 0.09, 0.07, 0.04]
+
+# Anos de serviço típicos ao chegar em cada graduação (mínimo, máximo)
+ANOS_SERVICO_NA_GRADUACAO = [(0, 1), (5, 12), (10, 17), (15, 22), (20, 27), (23, 30)]
+
+
+def gerar_efetivo(n: int, semente: int = 0, hoje: date = date(2025, 1, 1)) -> Dict[str, np.ndarray]:
+    """
+    Efetivo com `n` praças: índices de graduação (uint8), data da última
+    promoção, data de nascimento e data de ingresso (datetime64[D]).
+    """
+    rng = np.random.default_rng(semente)
+    hoje = np.datetime64(hoje, "D")
+
+    graduacoes = rng.choice(len(ORDEM_GRADUACOES), size=n, p=PROPORCAO_GRADUACOES).astype(np.uint8)
+    faixas = np.array(ANOS_SERVICO_NA_GRADUACAO)
+    anos_servico = rng.uniform(faixas[graduacoes, 0], faixas[graduacoes, 1])
+    idade_ingresso = rng.uniform(18, 30, size=n)
+
+    # Última promoção: até 6 anos atrás (até 1 ano para quem acabou de ingressar como Soldado)
+    dias_na_graduacao = rng.integers(0, 6 * 365, size=n)
+    dias_na_graduacao = np.where(graduacoes == 0, rng.integers(0, 365, size=n), dias_na_graduacao)
+
+    datas_base = hoje - dias_na_graduacao.astype("timedelta64[D]")
+    ingresso = hoje - (anos_servico * 365.25).astype("timedelta64[D]")
+    datas_base = np.maximum(datas_base, ingresso)
+    nascimentos = ingresso - (idade_ingresso * 365.25).astype("timedelta64[D]")
+
+    return {"graduacoes": graduacoes, "datas_base": datas_base, "nascimentos": nascimentos, "ingressos": ingresso}
+
+
+def escrever_csv(efetivo: Dict[str, np.ndarray], caminho: str, delimitador: str = ",") -> None:
+    """Grava o efetivo no formato aceito por `main.py --lote`."""
+    graduacoes = np.array(ORDEM_GRADUACOES)[efetivo["graduacoes"]]
+    datas_base = np.datetime_as_string(efetivo["datas_base"])
+    nascimentos = np.datetime_as_string(efetivo["nascimentos"])
+    ingressos = np.datetime_as_string(efetivo["ingressos"])
+
+    def _br(iso: str) -> str:
+        return f"{iso[8:10]}/{iso[5:7]}/{iso[0:4]}"
+
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=delimitador, lineterminator="\n")
+        escritor.writerow(["graduacao", "data_ultima_promocao", "data_nascimento", "data_ingresso"])
+        for graduacao, base, nasc, ingresso in zip(graduacoes, datas_base, nascimentos, ingressos):
+            escritor.writerow([graduacao, _br(base), _br(nasc), _br(ingresso)])
@@ -0,0 +1,60 @@
+"""
+Execução paralela do modo em lote de `main.py`.
+
+O efetivo é dividido em blocos de linhas, projetados em um ProcessPoolExecutor
+e devolvidos na ordem de entrada. Cada bloco usa a mesma `projetar_bloco_registros`
+do caminho serial, de modo que a saída é idêntica byte a byte (e, com o mesmo
+tamanho de bloco, as entradas do cache persistente também).
+"""
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+import cache_persistente
+from main import TAMANHO_BLOCO_LOTE, cabecalho_projecao, dividir_em_blocos, localizar_colunas, projetar_bloco_registros
+
+# Tamanho padrão de bloco: grande o bastante para diluir o custo de serialização entre processos
+TAMANHO_BLOCO_PADRAO = TAMANHO_BLOCO_LOTE
+
+
+def projetar_bloco(bloco: List[list], posicoes: dict, cenarios: list) -> List[list]:
+    """Projeta um bloco de linhas no processo trabalhador."""
+    projetadas = projetar_bloco_registros(bloco, posicoes, cenarios)
+    cache_persistente.descarregar()  # Trabalhadores encerram sem atexit
+    return projetadas
+
+
+def processar_efetivo_paralelo(linhas: Iterable[list], cenarios: list, tem_cabecalho: bool = True,
+                               workers: Optional[int] = None,
+                               tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Iterator[list]:
+    """
+    Mesmo resultado de `processar_efetivo`, distribuído entre `workers` processos.
+    No máximo 2 blocos por processo ficam em andamento, mantendo a memória limitada.
+    """
+    workers = workers or os.cpu_count() or 1
+    if tamanho_bloco < 1:
+        raise ValueError("tamanho_bloco deve ser positivo.")
+
+    linhas = iter(linhas)
+    posicoes = localizar_colunas([])
+    if tem_cabecalho:
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        posicoes = localizar_colunas(cabecalho)
+        yield cabecalho + cabecalho_projecao(cenarios)
+
+    blocos = dividir_em_blocos(linhas, tamanho_bloco)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+        for bloco in itertools.islice(blocos, 2 * workers):
+            pendentes.append(executor.submit(projetar_bloco, bloco, posicoes, cenarios))
+
+        while pendentes:
+            resultado = pendentes.popleft().result()
+            proximo = next(blocos, None)
+            if proximo is not None:
+                pendentes.append(executor.submit(projetar_bloco, proximo, posicoes, cenarios))
+            yield from resultado
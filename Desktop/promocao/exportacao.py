@@ -0,0 +1,158 @@
+"""
+Exportação colunar das projeções em Parquet e Arrow IPC.
+
+As tabelas são montadas direto dos arrays de `projetar_promocoes_lote`, sem
+formatar linha a linha: datas como date32, graduações e cenário como colunas
+dictionary (índices int8 sobre ORDEM_GRADUACOES) e idades como int16 com
+nulos. O formato é longo, uma linha por promoção projetada:
+
+    linha | cenario | graduacao | para | data_promocao | meses | idade
+
+Para um efetivo inteiro, o CSV de entrada é lido em blocos (ingestao.py) e
+cada bloco vira um row group (Parquet) ou record batch (Arrow). Uso:
+
+    python exportacao.py efetivo.csv --saida projecoes.parquet --cenario ambos
+"""
+import argparse
+import sys
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nucleo import ORDEM_GRADUACOES
+from projecao_vetorizada import IDADE_INDEFINIDA, N_PASSOS, projetar_promocoes_lote
+
+# --- 1. Esquema ---
+
+# Cenários na ordem do dicionário da coluna "cenario" (nome -> índice do interstício)
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+FORMATOS = {
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow"),
+}
+
+_DICIONARIO_GRADUACOES = pa.array(ORDEM_GRADUACOES, pa.string())
+_DICIONARIO_CENARIOS = pa.array(list(CENARIOS), pa.string())
+
+ESQUEMA = pa.schema([
+    ("linha", pa.int64()),
+    ("cenario", pa.dictionary(pa.int8(), pa.string())),
+    ("graduacao", pa.dictionary(pa.int8(), pa.string())),
+    ("para", pa.dictionary(pa.int8(), pa.string())),
+    ("data_promocao", pa.date32()),
+    ("meses", pa.int16()),
+    ("idade", pa.int16()),
+])
+
+# --- 2. Tabelas e Buffers ---
+
+def tabela_projecoes(resultado: Dict[str, np.ndarray], cenario: str, linhas: Optional[np.ndarray] = None) -> pa.Table:
+    """
+    Converte o resultado de `projetar_promocoes_lote` em uma tabela Arrow
+    (uma linha por promoção ainda não cumprida). `linhas` identifica cada
+    militar (padrão: 1..n).
+    """
+    graduacoes = resultado["graduacoes"]
+    n = graduacoes.shape[0]
+    linhas = np.arange(1, n + 1, dtype=np.int64) if linhas is None else np.asarray(linhas, dtype=np.int64)
+
+    # Posições (militar, passo) dos passos restantes, em ordem de militar e de passo
+    militar, passo = np.nonzero(graduacoes[:, None] <= np.arange(N_PASSOS))
+    passo = passo.astype(np.int8)
+    idades = resultado["idades"][militar, passo]
+
+    return pa.Table.from_arrays([
+        pa.array(linhas[militar]),
+        pa.DictionaryArray.from_arrays(np.full(len(passo), list(CENARIOS).index(cenario), dtype=np.int8), _DICIONARIO_CENARIOS),
+        pa.DictionaryArray.from_arrays(passo, _DICIONARIO_GRADUACOES),
+        pa.DictionaryArray.from_arrays(passo + 1, _DICIONARIO_GRADUACOES),
+        pa.array(resultado["datas"][militar, passo], pa.date32()),
+        pa.array(resultado["meses"][militar, passo]),
+        pa.array(idades, mask=idades == IDADE_INDEFINIDA),
+    ], schema=ESQUEMA)
+
+
+def abrir_escritor(destino, formato: str):
+    """Escritor incremental (`write_table` / `close`) para o formato pedido."""
+    if formato == "parquet":
+        return pq.ParquetWriter(destino, ESQUEMA, compression="zstd")
+    if formato == "arrow":
+        return pa.ipc.new_file(destino, ESQUEMA)
+    raise ValueError(f"Formato '{formato}' inválido (use {', '.join(FORMATOS)}).")
+
+
+def serializar(tabela: pa.Table, formato: str) -> bytes:
+    """Conteúdo do arquivo Parquet/Arrow em memória (para `st.download_button`)."""
+    buffer = pa.BufferOutputStream()
+    with abrir_escritor(buffer, formato) as escritor:
+        escritor.write_table(tabela)
+    return buffer.getvalue().to_pybytes()
+
+
+def plano_em_bytes(graduacao: str, data_base: date, cenario_idx: int, data_nasc: Optional[date], formato: str,
+                   regras=None) -> bytes:
+    """Plano de carreira de um militar (mesmos dados do CSV do app) em Parquet/Arrow; `regras` como em `projetar_promocoes_lote`."""
+    resultado = projetar_promocoes_lote(
+        np.array([data_base], dtype="datetime64[D]"), ORDEM_GRADUACOES.index(graduacao), cenario_idx,
+        np.array([data_nasc], dtype="datetime64[D]") if data_nasc else None, regras=regras,
+    )
+    cenario = next(nome for nome, indice in CENARIOS.items() if indice == cenario_idx)
+    return serializar(tabela_projecoes(resultado, cenario), formato)
+
+# --- 3. Efetivo em Blocos ---
+
+def ler_efetivo_em_blocos(caminho: Union[str, bytes], tamanho_bloco: int = 16 << 20) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]]:
+    """
+    Lê o CSV/TSV do efetivo em blocos de ~`tamanho_bloco` bytes, sem laço por
+    linha (ingestao.py). Gera (linhas, graduações, datas base, nascimentos,
+    ingressos, inválidas) com as linhas válidas de cada bloco; datas opcionais
+    ausentes ficam como NaT e as linhas em quarentena só entram na contagem.
+    `caminho` pode ser o conteúdo do arquivo em bytes (upload).
+    """
+    from ingestao import ler_em_blocos
+
+    for bloco in ler_em_blocos(caminho, tamanho_bloco):
+        yield (bloco.linhas, bloco.graduacoes, bloco.datas_base, bloco.nascimentos, bloco.ingressos,
+               bloco.quarentena.num_rows)
+
+
+def exportar_efetivo(entrada: str, saida: str, formato: str, cenarios: List[str], tamanho_bloco: int = 16 << 20) -> Tuple[int, int]:
+    """Projeta o efetivo bloco a bloco e grava em Parquet/Arrow. Retorna (promoções gravadas, linhas inválidas)."""
+    gravadas = invalidas = 0
+    with abrir_escritor(saida, formato) as escritor:
+        for linhas, graduacoes, datas_base, nascimentos, _, invalidas_bloco in ler_efetivo_em_blocos(entrada, tamanho_bloco):
+            invalidas += invalidas_bloco
+            sem_nascimento = np.isnat(nascimentos)
+            for cenario in cenarios:
+                resultado = projetar_promocoes_lote(datas_base, graduacoes, CENARIOS[cenario], nascimentos)
+                resultado["idades"][sem_nascimento] = IDADE_INDEFINIDA
+                tabela = tabela_projecoes(resultado, cenario, linhas)
+                escritor.write_table(tabela)
+                gravadas += tabela.num_rows
+    return gravadas, invalidas
+
+# --- 4. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta as projeções de um efetivo em Parquet ou Arrow IPC.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo com cabeçalho (mesmo formato de `main.py --lote`).")
+    parser.add_argument("--saida", required=True, help="Arquivo de saída (.parquet ou .arrow).")
+    parser.add_argument("--formato", choices=list(FORMATOS), default=None, help="Padrão: pela extensão da saída.")
+    parser.add_argument("--cenario", choices=["reduzido", "completo", "ambos"], default="ambos")
+    parser.add_argument("--bloco", type=int, default=16, help="Tamanho do bloco de leitura em MB (padrão: 16).")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ("arrow" if args.saida.endswith((".arrow", ".feather", ".ipc")) else "parquet")
+    cenarios = ["reduzido", "completo"] if args.cenario == "ambos" else [args.cenario]
+    gravadas, invalidas = exportar_efetivo(args.efetivo, args.saida, formato, cenarios, args.bloco << 20)
+    print(f"{gravadas} promoções gravadas em {args.saida} ({formato}).", file=sys.stderr)
+    if invalidas:
+        print(f"{invalidas} linhas com graduação ou data inválida foram ignoradas.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
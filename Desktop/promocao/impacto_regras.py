@@ -0,0 +1,303 @@
+"""
+Impacto de uma mudança de regras sobre o efetivo inteiro.
+
+Projeta o mesmo efetivo sob o conjunto de regras atual e sob uma ou mais
+propostas (outros interstícios e/ou outro calendário de datas de promoção,
+no formato de regras.json) e compara, militar a militar e passo a passo,
+quando cada promoção aconteceria. O ganho é positivo quando a proposta
+antecipa a promoção e negativo quando a atrasa.
+
+A projeção só depende de (graduação, data base), então, como em
+cenarios_mistos.py, cada conjunto é uma única chamada de
+`projetar_promocoes_lote` sobre os pares distintos do efetivo (`np.unique`,
+feito uma vez na leitura), expandida depois para todos os militares. A
+projeção atual é reaproveitada por todas as propostas e o resumo por
+graduação sai de agrupamentos em NumPy. Uso:
+
+    python impacto_regras.py efetivo.csv --propostas propostas.json [--proposta CHAVE ...]
+                             [--cenario completo] [--saida ganhos.parquet] [--resumo resumo.csv]
+"""
+import argparse
+import sys
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from nucleo import ORDEM_GRADUACOES
+from projecao_vetorizada import N_PASSOS, projetar_promocoes_lote
+from regras import CAMINHO_PADRAO, ConjuntoRegras, ErroRegras, carregar_regras, obter_regras
+
+# Cenário -> índice do interstício (0 = Completo, 1 = Reduzido)
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+# Percentis do resumo por graduação e passo
+PERCENTIS = (10, 50, 90)
+
+
+class Efetivo(NamedTuple):
+    linhas: np.ndarray          # Nº da linha no arquivo
+    graduacoes: np.ndarray      # uint8, índice em ORDEM_GRADUACOES
+    datas_base: np.ndarray      # datetime64[D]
+    invalidas: int              # Linhas em quarentena (ver ingestao.py)
+    distintos: np.ndarray       # Um militar de cada par (graduação, data base) distinto
+    inversa: np.ndarray         # Militar -> posição do seu par em `distintos`
+
+
+class Impacto(NamedTuple):
+    proposta: str                   # Chave do conjunto proposto
+    graduacoes: np.ndarray          # (n,) uint8
+    datas_atual: np.ndarray         # (n, N_PASSOS) datetime64[D]; passo j = promoção a ORDEM_GRADUACOES[j + 1]
+    datas_proposta: np.ndarray      # (n, N_PASSOS) datetime64[D]; NaT nos passos já cumpridos
+    ganho_meses: np.ndarray         # (n, N_PASSOS) int32; > 0 = promovido antes com a proposta
+    ganho_dias: np.ndarray          # (n, N_PASSOS) int32
+
+    def restantes(self) -> np.ndarray:
+        """Máscara (n, N_PASSOS) dos passos ainda não cumpridos por cada militar."""
+        return self.graduacoes[:, None] <= np.arange(N_PASSOS)
+
+# --- 1. Comparação Vetorizada ---
+
+def montar_efetivo(linhas, graduacoes, datas_base, invalidas: int = 0) -> Efetivo:
+    """Efetivo a partir dos arrays já convertidos, com os pares (graduação, data base) distintos."""
+    graduacoes = np.asarray(graduacoes, dtype=np.uint8)
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]")
+    codigos = datas_base.astype(np.int64) * (N_PASSOS + 1) + graduacoes
+    _, distintos, inversa = np.unique(codigos, return_index=True, return_inverse=True)
+    return Efetivo(np.asarray(linhas, dtype=np.int64), graduacoes, datas_base, invalidas, distintos, inversa.ravel())
+
+
+def ler_efetivo(origem: Union[str, bytes], tamanho_bloco: int = 16 << 20) -> Efetivo:
+    """Lê o efetivo inteiro (ingestao.py) uma vez, para ser comparado contra várias propostas."""
+    from ingestao import ler_em_blocos
+
+    blocos = list(ler_em_blocos(origem, tamanho_bloco))
+    if not blocos:
+        return montar_efetivo([], [], [])
+    return montar_efetivo(
+        np.concatenate([b.linhas for b in blocos]),
+        np.concatenate([b.graduacoes for b in blocos]),
+        np.concatenate([b.datas_base for b in blocos]),
+        sum(b.quarentena.num_rows for b in blocos),
+    )
+
+
+def verificar_graduacoes(regras: ConjuntoRegras) -> None:
+    """Só interstícios e calendário podem mudar: as graduações têm de ser as de ORDEM_GRADUACOES."""
+    if list(regras.ordem_graduacoes) != ORDEM_GRADUACOES:
+        raise ErroRegras(f"Conjunto '{regras.chave}' não tem as mesmas graduações do sistema "
+                         f"({', '.join(ORDEM_GRADUACOES)}).")
+
+
+def projetar(efetivo: Efetivo, regras: ConjuntoRegras, cenario_idx: int) -> np.ndarray:
+    """Datas (pares distintos, N_PASSOS) das promoções restantes sob `regras`, na ordem de `efetivo.distintos`."""
+    verificar_graduacoes(regras)
+    distintos = efetivo.distintos
+    return projetar_promocoes_lote(efetivo.datas_base[distintos], efetivo.graduacoes[distintos], cenario_idx,
+                                   regras=regras)["datas"]
+
+
+def comparar_datas(graduacoes: np.ndarray, datas_atual: np.ndarray, datas_proposta: np.ndarray,
+                   proposta: str = "") -> Impacto:
+    """Ganho em meses (de calendário) e em dias de cada promoção projetada."""
+    meses = (datas_atual.astype("datetime64[M]") - datas_proposta.astype("datetime64[M]")).astype(np.int64)
+    dias = (datas_atual - datas_proposta).astype(np.int64)
+    cumpridos = np.isnat(datas_atual)
+    meses[cumpridos] = 0
+    dias[cumpridos] = 0
+    return Impacto(proposta, graduacoes, datas_atual, datas_proposta, meses.astype(np.int32), dias.astype(np.int32))
+
+
+def comparar(efetivo: Efetivo, atual: ConjuntoRegras, propostas: List[ConjuntoRegras],
+             cenario_idx: int = 0) -> Iterator[Impacto]:
+    """
+    Compara cada proposta com o conjunto atual; a projeção atual é calculada
+    uma única vez. A comparação é feita nos pares distintos e expandida para
+    todos os militares.
+    """
+    graduacoes = efetivo.graduacoes[efetivo.distintos]
+    datas_atual = projetar(efetivo, atual, cenario_idx)
+    for proposta in propostas:
+        impacto = comparar_datas(graduacoes, datas_atual, projetar(efetivo, proposta, cenario_idx), proposta.chave)
+        yield Impacto(impacto.proposta, efetivo.graduacoes,
+                      *(matriz[efetivo.inversa] for matriz in impacto[2:]))
+
+# --- 2. Resumo por Graduação ---
+
+def resumir(impacto: Impacto) -> Dict[str, list]:
+    """
+    Distribuição do ganho em meses por graduação atual e passo: quantos
+    ganham, perdem ou ficam iguais, média, extremos e PERCENTIS.
+    """
+    colunas: Dict[str, list] = {nome: [] for nome in (
+        "proposta", "graduacao", "para", "militares", "ganham", "perdem", "iguais", "media_meses", "minimo",
+        *(f"p{p}" for p in PERCENTIS), "maximo")}
+    ordem = np.argsort(impacto.graduacoes, kind="stable")
+    limites = np.concatenate([[0], np.cumsum(np.bincount(impacto.graduacoes, minlength=N_PASSOS + 1))])
+    for graduacao in range(N_PASSOS):
+        grupo = ordem[limites[graduacao]:limites[graduacao + 1]]
+        if grupo.shape[0] == 0:
+            continue
+        ganhos = impacto.ganho_meses[grupo, graduacao:]       # (militares do grupo, passos restantes)
+        percentis = np.percentile(ganhos, PERCENTIS, axis=0)
+        for coluna, passo in enumerate(range(graduacao, N_PASSOS)):
+            valores = ganhos[:, coluna]
+            colunas["proposta"].append(impacto.proposta)
+            colunas["graduacao"].append(ORDEM_GRADUACOES[graduacao])
+            colunas["para"].append(ORDEM_GRADUACOES[passo + 1])
+            colunas["militares"].append(grupo.shape[0])
+            colunas["ganham"].append(int((valores > 0).sum()))
+            colunas["perdem"].append(int((valores < 0).sum()))
+            colunas["iguais"].append(int((valores == 0).sum()))
+            colunas["media_meses"].append(round(float(valores.mean()), 2))
+            colunas["minimo"].append(int(valores.min()))
+            for p, valor in zip(PERCENTIS, percentis[:, coluna]):
+                colunas[f"p{p}"].append(float(valor))
+            colunas["maximo"].append(int(valores.max()))
+    return colunas
+
+
+def distribuicao(impacto: Impacto) -> Dict[str, list]:
+    """Histograma (graduação atual, passo, ganho em meses) -> nº de militares, só com as contagens não nulas."""
+    militar, passo = np.nonzero(impacto.restantes())
+    ganhos = impacto.ganho_meses[militar, passo].astype(np.int64)
+    minimo = int(ganhos.min()) if ganhos.shape[0] else 0
+    largura = int(ganhos.max()) - minimo + 1 if ganhos.shape[0] else 1
+    codigos = (impacto.graduacoes[militar].astype(np.int64) * N_PASSOS + passo) * largura + (ganhos - minimo)
+    valores, contagens = np.unique(codigos, return_counts=True)
+    grupo, ganho = np.divmod(valores, largura)
+    graduacao, passo = np.divmod(grupo, N_PASSOS)
+    return {
+        "proposta": [impacto.proposta] * valores.shape[0],
+        "graduacao": [ORDEM_GRADUACOES[g] for g in graduacao],
+        "para": [ORDEM_GRADUACOES[p + 1] for p in passo],
+        "ganho_meses": (ganho + minimo).tolist(),
+        "militares": contagens.tolist(),
+    }
+
+# --- 3. Saída por Militar (CSV / Parquet) ---
+
+_DICIONARIO_GRADUACOES = pa.array(ORDEM_GRADUACOES, pa.string())
+
+ESQUEMA = pa.schema([
+    ("proposta", pa.string()),
+    ("linha", pa.int64()),
+    ("graduacao", pa.dictionary(pa.int8(), pa.string())),
+    ("para", pa.dictionary(pa.int8(), pa.string())),
+    ("data_atual", pa.date32()),
+    ("data_proposta", pa.date32()),
+    ("ganho_meses", pa.int32()),
+    ("ganho_dias", pa.int32()),
+])
+
+
+def tabela_impacto(impacto: Impacto, linhas: Optional[np.ndarray] = None) -> pa.Table:
+    """Uma linha por militar e passo restante, como em exportacao.tabela_projecoes."""
+    n = impacto.graduacoes.shape[0]
+    linhas = np.arange(1, n + 1, dtype=np.int64) if linhas is None else np.asarray(linhas, dtype=np.int64)
+    militar, passo = np.nonzero(impacto.restantes())
+    passo = passo.astype(np.int8)
+    return pa.Table.from_arrays([
+        pa.array(np.full(militar.shape[0], impacto.proposta, dtype=object), pa.string()),
+        pa.array(linhas[militar]),
+        pa.DictionaryArray.from_arrays(passo, _DICIONARIO_GRADUACOES),
+        pa.DictionaryArray.from_arrays(passo + 1, _DICIONARIO_GRADUACOES),
+        pa.array(impacto.datas_atual[militar, passo], pa.date32()),
+        pa.array(impacto.datas_proposta[militar, passo], pa.date32()),
+        pa.array(impacto.ganho_meses[militar, passo]),
+        pa.array(impacto.ganho_dias[militar, passo]),
+    ], schema=ESQUEMA)
+
+
+def abrir_escritor(destino: str):
+    """Escritor incremental pela extensão: Parquet (.parquet) ou CSV (demais)."""
+    if destino.endswith(".parquet"):
+        return pq.ParquetWriter(destino, ESQUEMA, compression="zstd")
+    return pa_csv.CSVWriter(destino, ESQUEMA, write_options=pa_csv.WriteOptions(quoting_style="needed"))
+
+
+def gravar_colunas(colunas: Dict[str, list], destino: str) -> None:
+    """Grava um resumo (dicionário de colunas) em CSV ou Parquet, pela extensão."""
+    tabela = pa.table(colunas)
+    if destino.endswith(".parquet"):
+        pq.write_table(tabela, destino, compression="zstd")
+    else:
+        pa_csv.write_csv(tabela, destino, pa_csv.WriteOptions(quoting_style="needed"))
+
+# --- 4. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara as promoções do efetivo sob as regras atuais e sob propostas.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (mesmo formato de `main.py --lote`).")
+    parser.add_argument("--regras", default=CAMINHO_PADRAO, help="Arquivo das regras atuais (padrão: regras.json).")
+    parser.add_argument("--atual", help="Conjunto atual (padrão: o padrão de --regras).")
+    parser.add_argument("--propostas", default=None, help="Arquivo das propostas, no formato de regras.json (padrão: --regras).")
+    parser.add_argument("--proposta", action="append", help="Conjunto proposto (repetível; padrão: todos os de --propostas).")
+    parser.add_argument("--cenario", choices=list(CENARIOS), default="completo")
+    parser.add_argument("--saida", help="Ganhos por militar e passo (.parquet ou .csv).")
+    parser.add_argument("--resumo", help="Resumo por graduação e passo (.csv ou .parquet).")
+    parser.add_argument("--distribuicao", help="Histograma do ganho em meses por graduação e passo (.csv ou .parquet).")
+    parser.add_argument("--bloco", type=int, default=16, help="Tamanho do bloco de leitura em MB (padrão: 16).")
+    args = parser.parse_args(argv)
+
+    try:
+        atual = obter_regras(args.atual, args.regras)
+        _, conjuntos = carregar_regras(args.propostas or args.regras)
+        chaves = args.proposta or [chave for chave in conjuntos if args.propostas or chave != atual.chave]
+        faltando = [chave for chave in chaves if chave not in conjuntos]
+        if faltando:
+            raise ErroRegras(f"Proposta(s) não encontrada(s): {', '.join(faltando)} (disponíveis: {', '.join(conjuntos)}).")
+        if not chaves:
+            raise ErroRegras("Nenhuma proposta para comparar (use --propostas e/ou --proposta).")
+        for regras in [atual] + [conjuntos[chave] for chave in chaves]:
+            verificar_graduacoes(regras)
+    except (OSError, ErroRegras) as erro:
+        parser.error(str(erro))
+
+    inicio = time.perf_counter()
+    efetivo = ler_efetivo(args.efetivo, args.bloco << 20)
+    leitura = time.perf_counter() - inicio
+    print(f"{efetivo.graduacoes.shape[0]} militares ({efetivo.invalidas} linhas inválidas) lidos em {leitura:.2f} s | "
+          f"atual: {atual.chave} | cenário {args.cenario}", file=sys.stderr)
+
+    escritor = None
+    resumo: Dict[str, list] = {}
+    histograma: Dict[str, list] = {}
+    try:
+        inicio = time.perf_counter()
+        for impacto in comparar(efetivo, atual, [conjuntos[chave] for chave in chaves], CENARIOS[args.cenario]):
+            # Ganho na última promoção (a Subtenente) de cada militar
+            final = impacto.ganho_meses[impacto.graduacoes < N_PASSOS, N_PASSOS - 1]
+            ganham, perdem = int((final > 0).sum()), int((final < 0).sum())
+            extremos = f" | média {final.mean():+.1f} meses (de {final.min():+d} a {final.max():+d})" if final.shape[0] else ""
+            print(f"  {impacto.proposta}: {ganham} ganham, {perdem} perdem, {final.shape[0] - ganham - perdem} iguais "
+                  f"até {ORDEM_GRADUACOES[-1]}{extremos} | {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+
+            for destino, colunas in ((resumo, resumir(impacto)), (histograma, distribuicao(impacto))):
+                for nome, valores in colunas.items():
+                    destino.setdefault(nome, []).extend(valores)
+            if args.saida:
+                if escritor is None:
+                    escritor = abrir_escritor(args.saida)
+                escritor.write_table(tabela_impacto(impacto, efetivo.linhas))
+            inicio = time.perf_counter()
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    if args.resumo:
+        gravar_colunas(resumo, args.resumo)
+    if args.distribuicao:
+        gravar_colunas(histograma, args.distribuicao)
+    if not args.resumo:
+        nomes = list(resumo)
+        print(";".join(nomes))
+        for valores in zip(*resumo.values()):
+            print(";".join(str(v) for v in valores))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Índice de elegibilidade para o quadro de acesso: quem fica elegível em cada
+data de promoção, por graduação e cenário.
+
+Para cada (graduação, cenário) o índice guarda uma lista ordenada de
+(data mínima de elegibilidade, identificador), em que a data mínima é a
+data da última promoção somada ao interstício. Como a próxima promoção é a
+primeira data do calendário a partir da data mínima, "elegíveis em 22/04/2027"
+é o intervalo de datas mínimas (data anterior do calendário, 22/04/2027]:
+duas buscas binárias (`bisect`), custo O(log n + k). Alterar o registro de
+um militar remove e reinsere só as suas entradas. Uso:
+
+    python indice_elegibilidade.py efetivo.csv --data 22/04/2027 --graduacao CB --cenario reduzido [--ate] [--saida quadro.csv]
+"""
+import argparse
+import bisect
+import csv
+import sys
+import time
+from datetime import date, datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from nucleo import DATAS_PROMOCAO_FIXAS, INTERSTICIOS_MILITARES, ORDEM_GRADUACOES, dias_no_mes, normalizar_graduacao, somar_meses
+
+# Cenário -> índice do interstício (0 = Completo, 1 = Reduzido)
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+# Graduações com próxima promoção (a última, Subtenente, não entra no índice)
+GRADUACOES_INDEXADAS = ORDEM_GRADUACOES[:-1]
+_NOMES = frozenset(ORDEM_GRADUACOES)
+
+# --- 1. Datas do Calendário ---
+
+def data_minima(graduacao: str, data_base: date, cenario_idx: int) -> date:
+    """Data em que o interstício da graduação se completa."""
+    return somar_meses(data_base, INTERSTICIOS_MILITARES[graduacao][cenario_idx])
+
+
+def data_promocao_anterior(data_promocao: date) -> date:
+    """Data de promoção do calendário imediatamente anterior; ValueError se `data_promocao` não for do calendário."""
+    if (data_promocao.month, data_promocao.day) not in DATAS_PROMOCAO_FIXAS:
+        datas = ", ".join(f"{dia:02d}/{mes:02d}" for mes, dia in DATAS_PROMOCAO_FIXAS)
+        raise ValueError(f"{data_promocao:%d/%m/%Y} não é data de promoção ({datas}).")
+    candidatas = [date(ano, mes, dia)
+                  for ano in (data_promocao.year - 1, data_promocao.year)
+                  for mes, dia in DATAS_PROMOCAO_FIXAS
+                  if dia <= dias_no_mes(ano, mes)]
+    return max(c for c in candidatas if c < data_promocao)
+
+# --- 2. Índice ---
+
+def _graduacao(texto: str) -> str:
+    if texto in _NOMES:
+        return texto
+    graduacao = normalizar_graduacao(texto)
+    if graduacao is None:
+        raise ValueError(f"Graduação '{texto}' não encontrada.")
+    return graduacao
+
+
+class IndiceElegibilidade:
+    """
+    Listas ordenadas de (ordinal da data mínima, identificador) por
+    (graduação, cenário). Identificadores devem ser únicos (ValueError na
+    carga inicial se repetidos) e comparáveis entre si (ex.: todos int ou
+    todos str), pois desempatam datas iguais.
+    """
+
+    def __init__(self, registros: Iterable[Tuple[Hashable, str, date]] = ()):
+        self._listas: Dict[Tuple[str, int], List[Tuple[int, Hashable]]] = {
+            (g, c): [] for g in GRADUACOES_INDEXADAS for c in CENARIOS.values()
+        }
+        self._registros: Dict[Hashable, Tuple[str, date]] = {}
+
+        # Carga inicial: acumula e ordena cada lista uma vez (O(n log n)), sem inserções uma a uma
+        for ident, graduacao, data_base in registros:
+            if ident in self._registros:
+                raise ValueError(f"Identificador {ident!r} repetido.")
+            graduacao = _graduacao(graduacao)
+            self._registros[ident] = (graduacao, data_base)
+            for chave, ordinal in self._entradas(graduacao, data_base):
+                self._listas[chave].append((ordinal, ident))
+        for lista in self._listas.values():
+            lista.sort()
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def __contains__(self, ident: Hashable) -> bool:
+        return ident in self._registros
+
+    @staticmethod
+    def _entradas(graduacao: str, data_base: date):
+        if graduacao not in INTERSTICIOS_MILITARES:
+            return []
+        return [((graduacao, c), data_minima(graduacao, data_base, c).toordinal()) for c in CENARIOS.values()]
+
+    def registro(self, ident: Hashable) -> Tuple[str, date]:
+        """(graduação, data da última promoção) do militar; KeyError se não estiver no índice."""
+        return self._registros[ident]
+
+    def remover(self, ident: Hashable) -> None:
+        """Retira o militar do índice (sem efeito se não estiver nele)."""
+        anterior = self._registros.pop(ident, None)
+        if anterior is None:
+            return
+        for chave, ordinal in self._entradas(*anterior):
+            lista = self._listas[chave]
+            posicao = bisect.bisect_left(lista, (ordinal, ident))
+            del lista[posicao]
+
+    def atualizar(self, ident: Hashable, graduacao: str, data_base: date) -> None:
+        """
+        Inclui ou altera o registro do militar (ex.: promoção ou correção de
+        data). A posição sai de uma busca binária, mas `insort` e `del` deslocam
+        o restante da lista: O(n) por cenário (cópia de ponteiros, sem reordenar).
+        """
+        graduacao = _graduacao(graduacao)
+        self.remover(ident)
+        self._registros[ident] = (graduacao, data_base)
+        for chave, ordinal in self._entradas(graduacao, data_base):
+            bisect.insort(self._listas[chave], (ordinal, ident))
+
+    def _intervalo(self, graduacao: str, cenario: str, inicio: Optional[date], fim: date) -> List[Hashable]:
+        """Identificadores com data mínima em (inicio, fim], em ordem de data mínima."""
+        graduacao = _graduacao(graduacao)
+        if graduacao not in INTERSTICIOS_MILITARES:
+            return []
+        lista = self._listas[(graduacao, CENARIOS[cenario])]
+        esquerda = 0 if inicio is None else bisect.bisect_left(lista, (inicio.toordinal() + 1,))
+        direita = bisect.bisect_left(lista, (fim.toordinal() + 1,))
+        return [ident for _, ident in lista[esquerda:direita]]
+
+    def elegiveis_ate(self, graduacao: str, data: date, cenario: str = "completo") -> List[Hashable]:
+        """Todos os militares da graduação com interstício cumprido até `data`."""
+        return self._intervalo(graduacao, cenario, None, data)
+
+    def elegiveis_em(self, graduacao: str, data_promocao: date, cenario: str = "completo") -> List[Hashable]:
+        """Militares da graduação cuja próxima promoção é exatamente `data_promocao` (data do calendário)."""
+        return self._intervalo(graduacao, cenario, data_promocao_anterior(data_promocao), data_promocao)
+
+    def quadro(self, data_promocao: date, cenario: str = "completo") -> Dict[str, List[Hashable]]:
+        """Elegíveis em `data_promocao` para todas as graduações."""
+        return {g: self.elegiveis_em(g, data_promocao, cenario) for g in GRADUACOES_INDEXADAS}
+
+# --- 3. Linha de Comando ---
+
+def _ler_efetivo(caminho: str) -> List[Tuple[int, str, date]]:
+    """(linha, graduação, data da última promoção) de um CSV/TSV no formato de `main.py --lote`."""
+    from main import detectar_delimitador, ler_efetivo, localizar_colunas
+
+    registros = []
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        delimitador = detectar_delimitador(arquivo.readline())
+        arquivo.seek(0)
+        linhas = ler_efetivo(arquivo, delimitador)
+        posicoes = localizar_colunas(next(linhas))
+        for numero, campos in enumerate(linhas, start=1):
+            try:
+                graduacao = normalizar_graduacao(campos[posicoes["graduacao"]])
+                data_base = datetime.strptime(campos[posicoes["data_base"]].strip(), "%d/%m/%Y").date()
+            except (IndexError, ValueError):
+                graduacao = None
+            if graduacao is None:
+                print(f"Linha {numero}: graduação ou data inválida, ignorada.", file=sys.stderr)
+                continue
+            registros.append((numero, graduacao, data_base))
+    return registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quadro de acesso: elegíveis em uma data de promoção.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (mesmo formato de `main.py --lote`).")
+    parser.add_argument("--data", required=True, help="Data de promoção (DD/MM/AAAA).")
+    parser.add_argument("--graduacao", help="Graduação atual (nome ou sigla; padrão: todas).")
+    parser.add_argument("--cenario", choices=list(CENARIOS), default="completo")
+    parser.add_argument("--ate", action="store_true", help="Inclui quem já estava elegível antes da data.")
+    parser.add_argument("--saida", default="-", help="CSV de saída ('-' para stdout).")
+    args = parser.parse_args(argv)
+
+    try:
+        data = datetime.strptime(args.data, "%d/%m/%Y").date()
+        graduacoes = [_graduacao(args.graduacao)] if args.graduacao else GRADUACOES_INDEXADAS
+        if not args.ate:
+            data_promocao_anterior(data)
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    inicio = time.perf_counter()
+    indice = IndiceElegibilidade(_ler_efetivo(args.efetivo))
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    consulta = indice.elegiveis_ate if args.ate else indice.elegiveis_em
+    resultado = {g: consulta(g, data, args.cenario) for g in graduacoes}
+    tempo_consulta = time.perf_counter() - inicio
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(["linha", "graduacao", "data_ultima_promocao", "intersticio_cumprido_em"])
+    for graduacao, linhas in resultado.items():
+        for linha in linhas:
+            _, data_base = indice.registro(linha)
+            escritor.writerow([linha, graduacao, f"{data_base:%d/%m/%Y}",
+                               f"{data_minima(graduacao, data_base, CENARIOS[args.cenario]):%d/%m/%Y}"])
+    if saida is not sys.stdout:
+        saida.close()
+
+    print(f"{len(indice)} militares indexados em {carga:.2f} s | consulta {tempo_consulta * 1000:.2f} ms", file=sys.stderr)
+    for graduacao, linhas in resultado.items():
+        print(f"  {graduacao:<12} {len(linhas)} elegíveis", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
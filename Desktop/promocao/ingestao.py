@@ -0,0 +1,335 @@
+"""
+Ingestão e validação em massa do efetivo, coluna a coluna (pyarrow.compute).
+
+Os arquivos exportados pelo sistema de RH misturam formatos de data
+(DD/MM/AAAA, D/M/AAAA, DD-MM-AAAA e ISO AAAA-MM-DD, com ou sem hora), nomes e
+siglas de graduação (ABREVIATURAS_MAP) escritos de vários jeitos ("3º SGT",
+"3° sargento", "3SGT") e linhas defeituosas. Cada coluna é convertida e
+validada de uma vez, sem laço por linha; as linhas com problema vão para a
+quarentena com o motivo, e o restante segue normalmente. Uso:
+
+    python ingestao.py efetivo.csv --saida efetivo_limpo.csv --quarentena rejeitadas.csv
+
+A saída limpa está no formato de `main.py --lote` (datas em DD/MM/AAAA,
+graduação pelo nome completo). O mesmo leitor é usado por exportacao.py,
+efetivo_compacto.py e ondas_promocao.py.
+"""
+import argparse
+import csv
+import re
+import sys
+import time
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from nucleo import ABREVIATURAS_MAP, ORDEM_GRADUACOES
+
+# --- 1. Motivos de Quarentena ---
+
+# Máscara de bits: uma linha pode ter vários problemas
+GRADUACAO_INVALIDA = 1
+DATA_BASE_INVALIDA = 2
+NASCIMENTO_INVALIDO = 4
+INGRESSO_INVALIDO = 8
+DATA_BASE_FUTURA = 16
+NASCIMENTO_POSTERIOR = 32
+INGRESSO_POSTERIOR = 64
+LINHA_MALFORMADA = 128
+
+MOTIVOS = {
+    GRADUACAO_INVALIDA: "graduação inválida",
+    DATA_BASE_INVALIDA: "data da última promoção ausente ou inválida",
+    NASCIMENTO_INVALIDO: "data de nascimento inválida",
+    INGRESSO_INVALIDO: "data de ingresso inválida",
+    DATA_BASE_FUTURA: "última promoção no futuro",
+    NASCIMENTO_POSTERIOR: "nascimento não anterior à última promoção",
+    INGRESSO_POSTERIOR: "ingresso posterior à última promoção",
+    LINHA_MALFORMADA: "número de colunas diferente do cabeçalho",
+}
+
+# Texto do motivo para cada máscara possível (consulta vetorizada por índice)
+_TEXTOS_MOTIVO = np.array(["; ".join(texto for bit, texto in MOTIVOS.items() if codigo & bit)
+                           for codigo in range(2 * LINHA_MALFORMADA)], dtype=object)
+
+# Anos fora desta faixa são tratados como erro de digitação
+ANO_MINIMO = 1900
+ANO_MAXIMO = 2100
+
+# --- 2. Conversão de Colunas ---
+
+# Formatos aceitos (grupos nomeados dia/mes/ano); o primeiro que casar vale
+_FORMATOS_DATA = (
+    r"^(?P<dia>\d{1,2})[/.-](?P<mes>\d{1,2})[/.-](?P<ano>\d{4})$",                       # DD/MM/AAAA, DD-MM-AAAA, DD.MM.AAAA
+    r"^(?P<ano>\d{4})-(?P<mes>\d{1,2})-(?P<dia>\d{1,2})(?:[T ][\d:.]*Z?)?$",              # AAAA-MM-DD[ hh:mm:ss]
+)
+
+
+def converter_datas(coluna) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Texto em qualquer formato aceito -> (datetime64[D] com NaT, máscara de
+    preenchidas). Preenchida e NaT significa data inválida; vazia é ausente.
+    """
+    texto = pc.utf8_trim_whitespace(coluna)
+    preenchida = pc.fill_null(pc.greater(pc.utf8_length(texto), 0), False).to_numpy(zero_copy_only=False)
+
+    campos = {}
+    for padrao in _FORMATOS_DATA:
+        partes = pc.extract_regex(texto, padrao)
+        for nome in ("dia", "mes", "ano"):
+            valor = pc.cast(pc.struct_field(partes, nome), pa.int32())
+            campos[nome] = pc.coalesce(campos[nome], valor) if nome in campos else valor
+    dia, mes, ano = (pc.fill_null(campos[nome], 0).to_numpy(zero_copy_only=False).astype(np.int64)
+                     for nome in ("dia", "mes", "ano"))
+
+    valida = (ano >= ANO_MINIMO) & (ano <= ANO_MAXIMO) & (mes >= 1) & (mes <= 12) & (dia >= 1) & (dia <= 31)
+    meses = np.where(valida, (ano - 1970) * 12 + mes - 1, 0).astype("datetime64[M]")
+    datas = meses.astype("datetime64[D]") + np.where(valida, dia - 1, 0).astype("timedelta64[D]")
+    valida &= datas.astype("datetime64[M]") == meses  # 31/02 "transborda" para março
+    return np.where(valida, datas, np.datetime64("NaT", "D")), preenchida
+
+
+def _chave_graduacao(texto: str) -> str:
+    return re.sub(r"[\s°ºª.]", "", texto.upper())
+
+
+# Graduação normalizada (nome completo ou sigla, sem espaços e ordinais) -> índice em ORDEM_GRADUACOES
+_CHAVES_GRADUACAO = {
+    **{_chave_graduacao(nome): i for i, nome in enumerate(ORDEM_GRADUACOES)},
+    **{_chave_graduacao(sigla): ORDEM_GRADUACOES.index(nome) for sigla, nome in ABREVIATURAS_MAP.items()},
+}
+_VALORES_GRADUACAO = pa.array(list(_CHAVES_GRADUACAO), pa.string())
+_INDICES_GRADUACAO = np.array(list(_CHAVES_GRADUACAO.values()), dtype=np.uint8)
+
+
+def converter_graduacoes(coluna) -> Tuple[np.ndarray, np.ndarray]:
+    """Nome ou sigla (maiúsculas/minúsculas, espaços, º/°) -> (índices em ORDEM_GRADUACOES, máscara de válidas)."""
+    texto = pc.replace_substring_regex(pc.utf8_upper(coluna), r"[\s°ºª.]", "")
+    posicao = pc.index_in(texto, value_set=_VALORES_GRADUACAO).to_numpy(zero_copy_only=False)
+    valida = ~np.isnan(posicao)
+    return _INDICES_GRADUACAO[np.where(valida, posicao, 0).astype(np.int64)], valida
+
+# --- 3. Leitura em Blocos ---
+
+class BlocoEfetivo(NamedTuple):
+    linhas: np.ndarray          # Nº do registro no arquivo (1 = primeiro após o cabeçalho; ver ler_em_blocos)
+    graduacoes: np.ndarray      # uint8, índice em ORDEM_GRADUACOES
+    datas_base: np.ndarray      # datetime64[D]
+    nascimentos: np.ndarray     # datetime64[D], NaT se ausente
+    ingressos: np.ndarray       # datetime64[D], NaT se ausente
+    quarentena: pa.Table        # linha, motivo e o texto original das colunas lidas
+
+
+def _ler_cabecalho(origem: Union[str, bytes]) -> Tuple[str, List[str], Dict[str, str]]:
+    """(delimitador, cabeçalho, nome da coluna de cada campo); cabeçalho vazio se o arquivo estiver vazio."""
+    from main import detectar_delimitador, localizar_colunas
+
+    if isinstance(origem, bytes):
+        primeira = origem.split(b"\n", 1)[0].decode("utf-8")
+    else:
+        with open(origem, encoding="utf-8", newline="") as arquivo:
+            primeira = arquivo.readline()
+    delimitador = detectar_delimitador(primeira)
+    cabecalho = next(csv.reader([primeira], delimiter=delimitador), [])
+    posicoes = {chave: cabecalho[i] for chave, i in localizar_colunas(cabecalho).items() if i < len(cabecalho)}
+    return delimitador, cabecalho, posicoes
+
+
+def _esquema_quarentena(colunas: List[str]) -> pa.Schema:
+    return pa.schema([("linha", pa.int64()), ("motivo", pa.string())] + [(nome, pa.string()) for nome in colunas])
+
+
+def ler_em_blocos(origem: Union[str, bytes], tamanho_bloco: int = 16 << 20,
+                  hoje: Optional[date] = None) -> Iterator[BlocoEfetivo]:
+    """
+    Lê o CSV/TSV do efetivo (caminho ou conteúdo em bytes) em blocos de
+    ~`tamanho_bloco` bytes e gera, para cada um, as linhas válidas já
+    convertidas e a quarentena das demais. Linhas com número de colunas
+    errado também vão para a quarentena, sem interromper a leitura.
+
+    A numeração ("linha") é a do registro CSV, não a da linha física: linhas
+    em branco não contam e um campo entre aspas com quebra de linha conta uma
+    vez só. Um arquivo vazio não gera nenhum bloco.
+    """
+    delimitador, cabecalho, posicoes = _ler_cabecalho(origem)
+    if not cabecalho:
+        return
+    colunas = list(dict.fromkeys(posicoes.values()))
+    if isinstance(origem, bytes):
+        origem = pa.BufferReader(origem)
+    hoje = np.datetime64(hoje or date.today(), "D")
+
+    puladas: List[int] = []         # Registros descartados pelo leitor (todos, para a numeração)
+    malformadas: List[tuple] = []   # (registro, texto) ainda não levados à quarentena
+
+    def _malformada(linha) -> str:
+        numero = linha.number - 1 if linha.number is not None else 0
+        puladas.append(numero)
+        malformadas.append((numero, linha.text))
+        return "skip"
+
+    leitor = pa_csv.open_csv(
+        origem,
+        read_options=pa_csv.ReadOptions(block_size=tamanho_bloco),
+        parse_options=pa_csv.ParseOptions(delimiter=delimitador, invalid_row_handler=_malformada),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={nome: pa.string() for nome in cabecalho}, include_columns=colunas,
+        ),
+    )
+    proxima_linha = 1
+    for lote in leitor:
+        n = lote.num_rows
+        # Numeração dos registros: os descartados pelo leitor não aparecem no lote
+        seguintes = [linha for linha in puladas if linha >= proxima_linha]
+        janela = np.arange(proxima_linha, proxima_linha + n + len(seguintes), dtype=np.int64)
+        linhas = janela[~np.isin(janela, seguintes)][:n]
+        proxima_linha = int(linhas[-1]) + 1 if n else proxima_linha
+
+        graduacoes, graduacao_valida = converter_graduacoes(lote.column(posicoes["graduacao"]))
+        datas_base, _ = converter_datas(lote.column(posicoes["data_base"]))
+        motivos = np.where(graduacao_valida, 0, GRADUACAO_INVALIDA) | np.where(np.isnat(datas_base), DATA_BASE_INVALIDA, 0)
+        motivos |= np.where(datas_base > hoje, DATA_BASE_FUTURA, 0)
+
+        opcionais = {}
+        for chave, bit, bit_posterior in (("nascimento", NASCIMENTO_INVALIDO, NASCIMENTO_POSTERIOR),
+                                          ("ingresso", INGRESSO_INVALIDO, INGRESSO_POSTERIOR)):
+            if chave not in posicoes:
+                opcionais[chave] = np.full(n, np.datetime64("NaT", "D"))
+                continue
+            datas, preenchida = converter_datas(lote.column(posicoes[chave]))
+            motivos |= np.where(preenchida & np.isnat(datas), bit, 0)
+            posterior = datas >= datas_base if chave == "nascimento" else datas > datas_base
+            motivos |= np.where(posterior, bit_posterior, 0)
+            opcionais[chave] = datas
+
+        validas = motivos == 0
+        rejeitadas = np.flatnonzero(~validas)
+        quarentena = pa.table({
+            "linha": linhas[rejeitadas],
+            "motivo": pa.array(_TEXTOS_MOTIVO[motivos[rejeitadas]].tolist(), pa.string()),
+            **{nome: lote.column(nome).take(rejeitadas) for nome in colunas},
+        }, schema=_esquema_quarentena(colunas))
+        if malformadas:
+            quarentena = pa.concat_tables([quarentena, _quarentena_malformadas(malformadas, cabecalho, colunas, delimitador)])
+            quarentena = quarentena.sort_by("linha")
+            malformadas.clear()
+        yield BlocoEfetivo(linhas[validas], graduacoes[validas], datas_base[validas],
+                           opcionais["nascimento"][validas], opcionais["ingresso"][validas], quarentena)
+
+
+def _quarentena_malformadas(malformadas: List[tuple], cabecalho: List[str], colunas: List[str],
+                            delimitador: str) -> pa.Table:
+    """Linhas descartadas pelo leitor, com os campos que existirem nas posições do cabeçalho."""
+    posicao = {nome: cabecalho.index(nome) for nome in colunas}
+    campos = [next(csv.reader([texto], delimiter=delimitador), []) for _, texto in malformadas]
+    return pa.table({
+        "linha": pa.array([linha for linha, _ in malformadas], pa.int64()),
+        "motivo": pa.array([MOTIVOS[LINHA_MALFORMADA]] * len(malformadas), pa.string()),
+        **{nome: pa.array([c[posicao[nome]] if posicao[nome] < len(c) else None for c in campos], pa.string())
+           for nome in colunas},
+    }, schema=_esquema_quarentena(colunas))
+
+# --- 4. Saída Limpa e Relatório ---
+
+class ResumoIngestao(NamedTuple):
+    validas: int
+    rejeitadas: int
+    motivos: Dict[str, int]     # Problema -> nº de linhas (uma linha pode contar em mais de um)
+
+
+def _texto_datas(datas: np.ndarray) -> pa.Array:
+    """datetime64[D] -> DD/MM/AAAA (nulo para NaT): os 10 bytes de cada data são montados em NumPy e viram o buffer Arrow."""
+    ausente = np.isnat(datas)
+    datas = np.where(ausente, np.datetime64(0, "D"), datas)
+    meses = datas.astype("datetime64[M]")
+    ano = datas.astype("datetime64[Y]").astype(np.int64) + 1970
+    mes = meses.astype(np.int64) % 12 + 1
+    dia = (datas - meses.astype("datetime64[D]")).astype(np.int64) + 1
+    caracteres = np.stack([dia // 10, dia % 10, np.full_like(dia, -1), mes // 10, mes % 10, np.full_like(dia, -1),
+                           ano // 1000, ano // 100 % 10, ano // 10 % 10, ano % 10], axis=1)
+    caracteres = (caracteres + ord("0")).astype(np.uint8)   # -1 + "0" = "/"
+    n = datas.shape[0]
+    return pa.Array.from_buffers(pa.string(), n, [
+        pa.py_buffer(np.packbits(~ausente, bitorder="little")),
+        pa.py_buffer(np.arange(0, 10 * n + 1, 10, dtype=np.int32)),
+        pa.py_buffer(caracteres.tobytes()),
+    ], null_count=int(ausente.sum()))
+
+
+# Colunas da saída limpa (formato de `main.py --lote`)
+_ESQUEMA_SAIDA = pa.schema([
+    ("linha", pa.int64()),
+    ("graduacao", pa.string()),
+    ("data_ultima_promocao", pa.string()),
+    ("data_nascimento", pa.string()),
+    ("data_ingresso", pa.string()),
+])
+
+
+def ingerir(entrada: Union[str, bytes], saida, quarentena=None, tamanho_bloco: int = 16 << 20,
+            hoje: Optional[date] = None) -> ResumoIngestao:
+    """
+    Grava o efetivo limpo em `saida` e as linhas rejeitadas em `quarentena`
+    (caminhos ou arquivos binários). Os dois são criados com o cabeçalho antes
+    da leitura, então um efetivo vazio ou só com cabeçalho gera arquivos sem linhas.
+    """
+    opcoes = pa_csv.WriteOptions(include_header=True, quoting_style="needed")
+    escritor = relatorio = None
+    validas = rejeitadas = 0
+    motivos: Counter = Counter()
+    nomes_graduacao = pa.array(ORDEM_GRADUACOES, pa.string())
+    try:
+        escritor = pa_csv.CSVWriter(saida, _ESQUEMA_SAIDA, write_options=opcoes)
+        if quarentena is not None:
+            _, _, posicoes = _ler_cabecalho(entrada)
+            esquema = _esquema_quarentena(list(dict.fromkeys(posicoes.values())))
+            relatorio = pa_csv.CSVWriter(quarentena, esquema, write_options=opcoes)
+        for bloco in ler_em_blocos(entrada, tamanho_bloco, hoje):
+            tabela = pa.table({
+                "linha": bloco.linhas,
+                "graduacao": nomes_graduacao.take(pa.array(bloco.graduacoes)),
+                "data_ultima_promocao": _texto_datas(bloco.datas_base),
+                "data_nascimento": _texto_datas(bloco.nascimentos),
+                "data_ingresso": _texto_datas(bloco.ingressos),
+            }, schema=_ESQUEMA_SAIDA)
+            escritor.write_table(tabela)
+            validas += tabela.num_rows
+
+            rejeitadas += bloco.quarentena.num_rows
+            for texto, quantidade in Counter(bloco.quarentena.column("motivo").to_pylist()).items():
+                for motivo in texto.split("; "):
+                    motivos[motivo] += quantidade
+            if relatorio is not None and bloco.quarentena.num_rows:
+                relatorio.write_table(bloco.quarentena)
+    finally:
+        for arquivo in (escritor, relatorio):
+            if arquivo is not None:
+                arquivo.close()
+    return ResumoIngestao(validas, rejeitadas, dict(motivos))
+
+# --- 5. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte e valida o efetivo em massa, separando as linhas com problema.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo com cabeçalho (datas em DD/MM/AAAA ou AAAA-MM-DD).")
+    parser.add_argument("--saida", required=True, help="CSV limpo, no formato de `main.py --lote`.")
+    parser.add_argument("--quarentena", help="CSV com as linhas rejeitadas e o motivo.")
+    parser.add_argument("--bloco", type=int, default=16, help="Tamanho do bloco de leitura em MB (padrão: 16).")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resumo = ingerir(args.efetivo, args.saida, args.quarentena, args.bloco << 20)
+    tempo = time.perf_counter() - inicio
+
+    print(f"{resumo.validas} linhas válidas e {resumo.rejeitadas} em quarentena em {tempo:.2f} s", file=sys.stderr)
+    for motivo, quantidade in sorted(resumo.motivos.items(), key=lambda item: -item[1]):
+        print(f"  {quantidade:>8}  {motivo}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Insígnias das graduações, pré-processadas uma vez e mantidas em memória.
+
+Os PNGs originais (300–500 px, com perfil ICC, EXIF e XMP) são carregados no
+primeiro uso, reduzidos a TAMANHO_MAXIMO px no maior lado, sem metadados, e
+recomprimidos (PNG com paleta de 256 cores, que preserva a transparência).
+O resultado fica em memória, indexado pela graduação de ORDEM_GRADUACOES, com
+um ETag do conteúdo para o navegador reaproveitar a cópia em cache. O app usa
+`insignia()` e a API (api.py) serve `/insignias/<sigla>` com cabeçalhos de
+cache (`cache_control`). Relatório de tamanho e tempo:
+
+    python insignias.py [--tamanho 160] [--formato png]
+"""
+import argparse
+import hashlib
+import io
+import os
+import time
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from PIL import Image
+
+from nucleo import ORDEM_GRADUACOES, normalizar_graduacao
+
+# --- 1. Pré-processamento ---
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+LOGO = "Logo"
+
+# Graduação (ou LOGO) -> arquivo original
+ARQUIVOS_INSIGNIAS = {
+    "Soldado": "soldado.png",
+    "Cabo": "cabo.png",
+    "3º Sargento": "3sgt.png",
+    "2º Sargento": "2sgt.png",
+    "1º Sargento": "1sgt.png",
+    "Subtenente": "subtenente.png",
+    LOGO: "policeman.png",
+}
+
+# Maior lado em pixels: o dobro do exibido no app (80 px), para telas de alta densidade
+TAMANHO_MAXIMO = 160
+FORMATOS = {"png": "image/png", "webp": "image/webp"}
+
+# URL sem versão: o navegador guarda a cópia, mas confirma o ETag a cada uso (304 se não mudou)
+CACHE_CONTROL = "no-cache"
+# URL com ?v=<etag>: o conteúdo daquela URL nunca muda, cache de um ano
+CACHE_CONTROL_VERSIONADA = "public, max-age=31536000, immutable"
+
+
+class Insignia(NamedTuple):
+    dados: bytes
+    mime: str
+    largura: int
+    altura: int
+    etag: str
+    bytes_originais: int
+
+
+def otimizar_imagem(caminho: str, tamanho_maximo: int = TAMANHO_MAXIMO, formato: str = "png") -> Insignia:
+    """Reduz, remove metadados e recomprime uma imagem."""
+    with Image.open(caminho) as original:
+        imagem = original.convert("RGBA")
+    imagem.thumbnail((tamanho_maximo, tamanho_maximo), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if formato == "png":
+        imagem.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, "PNG", optimize=True)
+    elif formato == "webp":
+        imagem.save(buffer, "WEBP", quality=90, method=6)
+    else:
+        raise ValueError(f"Formato '{formato}' inválido (use {', '.join(FORMATOS)}).")
+
+    dados = buffer.getvalue()
+    return Insignia(dados, FORMATOS[formato], imagem.width, imagem.height,
+                    hashlib.sha1(dados).hexdigest(), os.path.getsize(caminho))
+
+
+@lru_cache(maxsize=None)
+def carregar_insignias(tamanho_maximo: int = TAMANHO_MAXIMO, formato: str = "png") -> Dict[str, Insignia]:
+    """Todas as insígnias otimizadas (processadas uma vez por processo)."""
+    return {chave: otimizar_imagem(os.path.join(PASTA, arquivo), tamanho_maximo, formato)
+            for chave, arquivo in ARQUIVOS_INSIGNIAS.items()}
+
+
+def insignia(graduacao: str) -> Insignia:
+    """Insígnia da graduação (nome completo, sigla ou "logo"); KeyError se não existir."""
+    chave = LOGO if graduacao.strip().upper() == LOGO.upper() else normalizar_graduacao(graduacao)
+    if chave is None:
+        raise KeyError(graduacao)
+    return carregar_insignias()[chave]
+
+
+def cache_control(graduacao: str, versao: Optional[str]) -> str:
+    """Cache-Control da resposta: longo só se `versao` (?v=) for o ETag atual da imagem."""
+    return CACHE_CONTROL_VERSIONADA if versao == insignia(graduacao).etag else CACHE_CONTROL
+
+# --- 2. Relatório ---
+
+def relatorio(tamanho_maximo: int = TAMANHO_MAXIMO, formato: str = "png", repeticoes: int = 200):
+    """Tamanho e tempo de acesso: arquivo original (leitura + decodificação) x cópia em memória."""
+    print(f"{'INSÍGNIA':<14} | {'ORIGINAL':>18} | {'OTIMIZADA':>16} | {'REDUÇÃO':>7} | {'DISCO µs':>9} | {'MEMÓRIA µs':>10}")
+    print("-" * 90)
+
+    inicio = time.perf_counter()
+    insignias = carregar_insignias(tamanho_maximo, formato)
+    preparo = time.perf_counter() - inicio
+
+    total_original = total_otimizado = 0
+    for chave in ORDEM_GRADUACOES + [LOGO]:
+        caminho = os.path.join(PASTA, ARQUIVOS_INSIGNIAS[chave])
+        item = insignias[chave]
+        with Image.open(caminho) as imagem:
+            dimensoes = f"{imagem.width}x{imagem.height}"
+
+        t0 = time.perf_counter()
+        for _ in range(repeticoes):
+            with open(caminho, "rb") as arquivo:
+                Image.open(io.BytesIO(arquivo.read())).load()
+        disco = (time.perf_counter() - t0) / repeticoes * 1e6
+
+        t0 = time.perf_counter()
+        for _ in range(repeticoes):
+            carregar_insignias(tamanho_maximo, formato)[chave].dados
+        memoria = (time.perf_counter() - t0) / repeticoes * 1e6
+
+        total_original += item.bytes_originais
+        total_otimizado += len(item.dados)
+        print(f"{ARQUIVOS_INSIGNIAS[chave]:<14} | {item.bytes_originais:>7} B {dimensoes:>8} | "
+              f"{len(item.dados):>6} B {item.largura}x{item.altura:<4} | {1 - len(item.dados) / item.bytes_originais:>7.0%} | "
+              f"{disco:>9.1f} | {memoria:>10.2f}")
+
+    print("-" * 90)
+    print(f"{'TOTAL':<14} | {total_original:>7} B {'':>8} | {total_otimizado:>6} B {'':>8} | "
+          f"{1 - total_otimizado / total_original:>7.0%} |")
+    print(f"Pré-processamento (uma vez por processo): {preparo * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Insígnias otimizadas: relatório de tamanho e tempo.")
+    parser.add_argument("--tamanho", type=int, default=TAMANHO_MAXIMO, help=f"Maior lado em px (padrão: {TAMANHO_MAXIMO}).")
+    parser.add_argument("--formato", choices=list(FORMATOS), default="png")
+    args = parser.parse_args(argv)
+    relatorio(args.tamanho, args.formato)
+
+
+if __name__ == "__main__":
+    main()
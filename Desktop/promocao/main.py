@@ -1,35 +1,27 @@
+import argparse
+import csv
+import io
+import itertools
+import os
+import sys
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta 
-from typing import Optional 
+from typing import Iterable, Iterator, List, Optional 
 
 # --- 1. Constantes e Dados Base ---
-
-# Mapeamento de abreviaturas para nomes completos
-ABREVIATURAS_MAP = {
-    "SD": "Soldado",
-    "CB": "Cabo",
-    "3SGT": "3º Sargento",
-    "2SGT": "2º Sargento",
-    "1SGT": "1º Sargento",
-    "ST": "Subtenente",
-}
-
-# Dicionário de Interstícios (Chave: Graduação ATUAL | Valor: [Completo, Reduzido] em meses)
-INTERSTICIOS_MILITARES = {
-    "Soldado": [120, 60],      # Para promover a Cabo
-    "Cabo": [60, 30],         # Para promover a 3º Sargento
-    "3º Sargento": [60, 30],  # Para promover a 2º Sargento
-    "2º Sargento": [60, 30],  # Para promover a 1º Sargento
-    "1º Sargento": [36, 18],  # Para promover a Subtenente
-}
-
-# Datas Fixas de Promoção (Formato: (Mês, Dia))
-DATAS_PROMOCAO_FIXAS = [
-    (4, 22), (8, 21), (12, 26) 
-]
-
-# Ordem de progressão de carreira
-ORDEM_GRADUACOES = ["Soldado", "Cabo", "3º Sargento", "2º Sargento", "1º Sargento", "Subtenente"]
+# Regras e cálculo de datas ficam em nucleo.py (compartilhado com os apps Streamlit)
+
+from nucleo import (
+    ABREVIATURAS_MAP,
+    ASSINATURA_REGRAS,
+    INTERSTICIOS_MILITARES,
+    ORDEM_GRADUACOES,
+    calcular_idade,
+    calcular_proxima_promocao,
+    normalizar_graduacao,
+    somar_meses,
+)
+import metricas
+import cache_persistente
 
 # --- 2. Funções de Suporte ---
 
@@ -47,35 +39,6 @@ def obter_data_valida(mensagem, pode_ser_vazio=False):
         except ValueError:
             print(f"\n❌ ERRO: Por favor, digite a data no formato DD/MM/AAAA e certifique-se de que a data é válida.\n")
 
-def calcular_proxima_promocao(data_base: date, meses_intersticio: int) -> date:
-    """Calcula a próxima data de promoção APÓS o interstício ser completado."""
-    data_minima_elegivel = data_base + relativedelta(months=+meses_intersticio)
-    ano_candidato = data_minima_elegivel.year
-
-    for mes, dia in DATAS_PROMOCAO_FIXAS:
-        try:
-            data_promocao_candidata = date(ano_candidato, mes, dia)
-        except ValueError:
-            continue
-        
-        if data_promocao_candidata >= data_minima_elegivel:
-            return data_promocao_candidata
-
-    ano_candidato += 1
-    mes_abril, dia_abril = DATAS_PROMOCAO_FIXAS[0] 
-    
-    try:
-        proxima_abril = date(ano_candidato, mes_abril, dia_abril)
-    except ValueError:
-        proxima_abril = date(ano_candidato, mes_abril, 20) 
-        
-    return proxima_abril
-
-def calcular_idade(data_nascimento: date, data_referencia: date) -> int:
-    """Calcula a idade em anos na data de referência."""
-    return relativedelta(data_referencia, data_nascimento).years
-
-
 def obter_inputs_comuns():
     """
     Função para obter Graduação (com suporte a abreviaturas), Data Base e Data de Nascimento.
@@ -90,20 +53,8 @@ def obter_inputs_comuns():
 
     while True:
         # Pede a entrada, exibe as opções e converte para maiúsculas/título para padronização
-        graduacao_input = input(f"\nQual a graduação atual? ({', '.join(opcoes_input)}): ").strip().upper()
-        
-        graduacao_final = None
-
-        # 1. Verifica se é uma abreviatura
-        if graduacao_input in ABREVIATURAS_MAP:
-            graduacao_final = ABREVIATURAS_MAP[graduacao_input]
-        # 2. Verifica se é o nome completo (Padroniza para título, ex: 'Cabo')
-        elif graduacao_input.title() in graduacoes_validas:
-            graduacao_final = graduacao_input.title()
-        # 3. Verifica o Subtenente (caso especial)
-        elif graduacao_input == "ST" or graduacao_input.title() == "Subtenente":
-             graduacao_final = "Subtenente"
-        
+        graduacao_input = input(f"\nQual a graduação atual? ({', '.join(opcoes_input)}): ")
+        graduacao_final = normalizar_graduacao(graduacao_input)
         
         if graduacao_final:
             break
@@ -120,7 +71,7 @@ def obter_inputs_comuns():
     
     return graduacao_final, data_ultima_promocao, data_nascimento
 
-# --- 3. Funções de Menu (Opções 1, 2, 3 e 4) ---
+# --- 3. Funções de Menu (Opções 1 a 5) ---
 
 def calcular_proxima_imediata():
     """Opção 1: Calcula apenas a próxima promoção com escolha de interstício."""
@@ -155,7 +106,7 @@ def calcular_proxima_imediata():
         print("❌ Erro: Data da última promoção é obrigatória.")
         return
         
-    data_minima_elegivel = data_ultima_promocao + relativedelta(months=+intersticio_em_meses)
+    data_minima_elegivel = somar_meses(data_ultima_promocao, intersticio_em_meses)
     data_proxima_promocao = calcular_proxima_promocao(data_ultima_promocao, intersticio_em_meses)
     
     idade_na_promocao = calcular_idade(data_nascimento, data_proxima_promocao) if data_nascimento else None
@@ -267,6 +218,47 @@ def exibir_intersticios():
         
     print("="*70)
 
+
+def exibir_combinacoes():
+    """Opção 5: Lista todas as combinações de interstício (Reduzido/Completo) e a fronteira de Pareto."""
+    graduacao_atual, data_ultima_promocao, data_nascimento = obter_inputs_comuns()
+
+    if graduacao_atual == "Subtenente":
+        print("\n✅ Já alcançou o posto final da carreira de Praças.")
+        return
+
+    if data_ultima_promocao is None:
+        print("❌ Erro: Data da última promoção é obrigatória.")
+        return
+
+    from cenarios_mistos import fronteira_pareto, listar_combinacoes
+
+    combinacoes = listar_combinacoes(graduacao_atual, data_ultima_promocao, data_nascimento)
+    fronteira = set(fronteira_pareto(combinacoes))
+    passos = ORDEM_GRADUACOES[ORDEM_GRADUACOES.index(graduacao_atual) + 1:]
+
+    print("\n" + "="*70)
+    print(f"🔀 COMBINAÇÕES DE INTERSTÍCIO ({len(combinacoes)}): R = Reduzido | C = Completo")
+    print(f"Data Base: {data_ultima_promocao.strftime('%d/%m/%Y')} | Passos: {' ➝ '.join(passos)}")
+    print("="*70)
+
+    header = f"{'COMBINAÇÃO':<12} | {'REDUÇÕES':<8} | {'SUBTENENTE':<12}"
+    if data_nascimento:
+        header += f" | {'IDADE':<5}"
+    print(header + " | PARETO")
+    print("-" * (50 if not data_nascimento else 58))
+
+    for combinacao in combinacoes:
+        letras = " ".join("R" if indice else "C" for indice in combinacao.intersticios)
+        linha = f"{letras:<12} | {combinacao.reducoes:<8} | {combinacao.data_final.strftime('%d/%m/%Y'):<12}"
+        if data_nascimento:
+            linha += f" | {combinacao.idade_final:<5}"
+        print(linha + (" | ★" if combinacao in fronteira else " |"))
+
+    print("="*70)
+    print("** ★ Fronteira de Pareto: cada redução a mais antecipa a promoção a Subtenente. **")
+    print("="*70)
+
 # --- 4. Menu Principal ---
 
 def menu_principal():
@@ -280,10 +272,11 @@ def menu_principal():
         print("2) Calcular plano de carreira (Melhor Cenário - Reduções)")
         print("3) Calcular plano de carreira (Pior Cenário - Sem Reduções)")
         print("4) Exibir interstícios")
+        print("5) Listar combinações de interstício (Reduzido/Completo)")
         print("0) Sair")
         print("-" * 40)
         
-        escolha = input("Selecione uma opção (0-4): ").strip()
+        escolha = input("Selecione uma opção (0-5): ").strip()
         
         if escolha == '1':
             calcular_proxima_imediata()
@@ -293,15 +286,238 @@ def menu_principal():
             calcular_plano_carreira(melhor_cenario=False)
         elif escolha == '4':
             exibir_intersticios()
+        elif escolha == '5':
+            exibir_combinacoes()
         elif escolha == '0':
             print("\nObrigado por utilizar o sistema. Até logo! 👋\n")
             break
         else:
-            print("\n❌ Opção inválida. Por favor, digite um número de 0 a 4.")
+            print("\n❌ Opção inválida. Por favor, digite um número de 0 a 5.")
             
         if escolha != '0':
             input("\nPressione ENTER para voltar ao menu...")
         
 
+# --- 5. Modo em Lote (Arquivos de Efetivo) ---
+
+# Sigla de cada graduação, usada nos nomes das colunas de saída
+SIGLAS_GRADUACOES = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}
+
+# Cenários aceitos no modo em lote (Nome -> índice do interstício)
+CENARIOS_LOTE = {"reduzido": 1, "completo": 0}
+
+# Linhas por bloco: unidade de trabalho dos processos (execucao_paralela) e de
+# entrada do cache persistente (uma consulta por bloco, não por militar)
+TAMANHO_BLOCO_LOTE = 5000
+
+# Nomes de coluna reconhecidos no cabeçalho do arquivo de efetivo
+COLUNAS_ENTRADA = {
+    "graduacao": ("graduacao", "graduação", "grad", "posto"),
+    "data_base": ("data_ultima_promocao", "ultima_promocao", "data_base", "data da última promoção"),
+    "nascimento": ("data_nascimento", "nascimento", "data de nascimento"),
+    "ingresso": ("data_ingresso", "ingresso", "data de ingresso", "data_inclusao", "data de inclusão"),
+}
+
+
+def detectar_delimitador(linha: str) -> str:
+    """Escolhe o delimitador (TAB, ';' ou ',') pela primeira linha do arquivo."""
+    for delimitador in ("\t", ";"):
+        if delimitador in linha:
+            return delimitador
+    return ","
+
+
+def ler_efetivo(arquivo, delimitador: str):
+    """Gera as linhas do arquivo de efetivo (CSV/TSV) uma a uma, sem carregá-lo na memória."""
+    yield from csv.reader(arquivo, delimiter=delimitador)
+
+
+def localizar_colunas(cabecalho: list) -> dict:
+    """Posição das colunas de entrada pelo cabeçalho (padrão: 1ª, 2ª e 3ª colunas)."""
+    nomes = [c.strip().lower() for c in cabecalho]
+    posicoes = {"graduacao": 0, "data_base": 1, "nascimento": 2}
+    for chave, aliases in COLUNAS_ENTRADA.items():
+        for alias in aliases:
+            if alias in nomes:
+                posicoes[chave] = nomes.index(alias)
+                break
+    return posicoes
+
+
+def cabecalho_projecao(cenarios: list) -> list:
+    """Nomes das colunas acrescentadas a cada linha pelo modo em lote."""
+    colunas = []
+    for cenario in cenarios:
+        for graduacao in ORDEM_GRADUACOES[1:]:
+            sigla = SIGLAS_GRADUACOES[graduacao]
+            colunas += [f"promocao_{sigla}_{cenario}", f"idade_{sigla}_{cenario}"]
+    return colunas + ["erro"]
+
+
+def _textos_registro(campos: list, posicoes: dict) -> tuple:
+    """(graduação, data base, nascimento) da linha, em texto (vazio se a coluna faltar)."""
+    return tuple(campos[posicoes[chave]].strip() if posicoes[chave] < len(campos) else ""
+                 for chave in ("graduacao", "data_base", "nascimento"))
+
+
+@metricas.medido()
+def projetar_bloco_registros(bloco: List[list], posicoes: dict, cenarios: list) -> List[list]:
+    """Projeta um bloco de linhas (entrada + colunas de saída), com uma consulta ao cache persistente por bloco."""
+    textos = tuple(_textos_registro(campos, posicoes) for campos in bloco)
+    return [campos + saida for campos, saida in zip(bloco, projetar_textos(textos, tuple(cenarios)))]
+
+
+@cache_persistente.persistente(assinatura=lambda: ASSINATURA_REGRAS)
+def projetar_textos(textos: tuple, cenarios: tuple) -> List[list]:
+    """
+    Colunas de saída de um bloco de (graduação, data base, nascimento). O bloco
+    é uma entrada do cache persistente: reprocessar o mesmo arquivo (com o
+    mesmo tamanho de bloco) reaproveita o resultado sem custo por militar.
+    As regras são as de nucleo.py, daí a assinatura ASSINATURA_REGRAS.
+    """
+    return [projetar_campos(*linha, cenarios) for linha in textos]
+
+
+def projetar_campos(texto_graduacao: str, texto_data_base: str, texto_nascimento: str, cenarios: tuple) -> list:
+    """Projeção a partir dos textos da linha."""
+    vazio = [""] * (len(cenarios) * (len(ORDEM_GRADUACOES) - 1) * 2)
+
+    graduacao = normalizar_graduacao(texto_graduacao)
+    if graduacao is None:
+        return vazio + [f"Graduação inválida: '{texto_graduacao}'"]
+    if graduacao == "Subtenente":
+        return vazio + [""]
+
+    try:
+        data_base = datetime.strptime(texto_data_base, "%d/%m/%Y").date()
+        data_nascimento = datetime.strptime(texto_nascimento, "%d/%m/%Y").date() if texto_nascimento else None
+    except ValueError:
+        return vazio + ["Data inválida (use DD/MM/AAAA)"]
+
+    saida = []
+    indice_inicial = ORDEM_GRADUACOES.index(graduacao)
+    for cenario in cenarios:
+        indice_intersticio = CENARIOS_LOTE[cenario]
+        data_cursor = data_base
+        for i in range(len(ORDEM_GRADUACOES) - 1):
+            if i < indice_inicial:
+                saida += ["", ""]
+                continue
+            intersticio = INTERSTICIOS_MILITARES.get(ORDEM_GRADUACOES[i], [0, 0])[indice_intersticio]
+            data_cursor = calcular_proxima_promocao(data_cursor, intersticio)
+            idade = calcular_idade(data_nascimento, data_cursor) if data_nascimento else ""
+            saida += [data_cursor.strftime("%d/%m/%Y"), str(idade)]
+    return saida + [""]
+
+
+def processar_efetivo(linhas, cenarios: list, tem_cabecalho: bool = True):
+    """Pipeline em gerador: recebe linhas do efetivo e gera as linhas projetadas (entrada + projeção)."""
+    linhas = iter(linhas)
+    posicoes = localizar_colunas([])
+    if tem_cabecalho:
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        posicoes = localizar_colunas(cabecalho)
+        yield cabecalho + cabecalho_projecao(cenarios)
+
+    for bloco in dividir_em_blocos(linhas, TAMANHO_BLOCO_LOTE):
+        yield from projetar_bloco_registros(bloco, posicoes, cenarios)
+
+
+def dividir_em_blocos(linhas: Iterable[list], tamanho_bloco: int) -> Iterator[List[list]]:
+    """Agrupa as linhas (não vazias) em listas de até `tamanho_bloco` elementos."""
+    linhas = (campos for campos in linhas if campos)
+    while True:
+        bloco = list(itertools.islice(linhas, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+def executar_lote(entrada, saida, cenarios: list, delimitador: Optional[str] = None, tem_cabecalho: bool = True,
+                  workers: int = 1, tamanho_bloco: Optional[int] = None) -> int:
+    """
+    Lê o efetivo de `entrada` e escreve as projeções em `saida`, linha a linha. Retorna o nº de linhas escritas.
+    Com `workers` > 1 a projeção é distribuída entre processos (ver execucao_paralela), com a mesma saída.
+    """
+    primeira = entrada.readline()
+    delimitador = delimitador or detectar_delimitador(primeira)
+    linhas = ler_efetivo(itertools.chain([primeira], entrada), delimitador)
+
+    if workers > 1:
+        from execucao_paralela import processar_efetivo_paralelo
+        projetadas = processar_efetivo_paralelo(linhas, cenarios, tem_cabecalho, workers,
+                                                tamanho_bloco or TAMANHO_BLOCO_LOTE)
+    else:
+        projetadas = processar_efetivo(linhas, cenarios, tem_cabecalho)
+
+    escritor = csv.writer(saida, delimiter=delimitador, lineterminator="\n")
+    total = 0
+    with metricas.cronometro("lote"):
+        for linha in projetadas:
+            escritor.writerow(linha)
+            total += 1
+    metricas.contar("lote_linhas", total)
+    cache_persistente.descarregar()
+    return total
+
+
+def _abrir_texto(caminho: str, modo: str):
+    """Abre um arquivo (ou stdin/stdout para '-') em UTF-8, no modo recomendado pelo módulo csv."""
+    if caminho == "-":
+        fluxo = sys.stdin if modo == "r" else sys.stdout
+        return io.TextIOWrapper(fluxo.buffer, encoding="utf-8", newline="", write_through=False)
+    return open(caminho, modo, encoding="utf-8", newline="")
+
+
+def main(argv=None):
+    """Ponto de entrada: menu interativo por padrão, ou modo em lote com --lote."""
+    parser = argparse.ArgumentParser(description="Sistema de Projeção de Carreira Militar")
+    parser.add_argument("--lote", metavar="ARQUIVO",
+                        help="Arquivo CSV/TSV do efetivo (graduação, data da última promoção, nascimento opcional). Use '-' para stdin.")
+    parser.add_argument("--saida", metavar="ARQUIVO", default="-", help="Arquivo de saída ('-' para stdout, padrão).")
+    parser.add_argument("--cenario", choices=["reduzido", "completo", "ambos"], default="ambos",
+                        help="Cenário de interstício projetado (padrão: ambos).")
+    parser.add_argument("--delimitador", help="Delimitador do arquivo (padrão: detectado na primeira linha).")
+    parser.add_argument("--sem-cabecalho", action="store_true", help="O arquivo não possui linha de cabeçalho.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nº de processos para o modo em lote (padrão: 1; 0 usa todos os núcleos).")
+    parser.add_argument("--bloco", type=int, default=None, metavar="LINHAS",
+                        help=f"Linhas por bloco enviado a cada processo (padrão: {TAMANHO_BLOCO_LOTE}).")
+    parser.add_argument("--metricas", metavar="ARQUIVO",
+                        help="Grava tempos e contadores do lote em ARQUIVO (formato Prometheus; com --workers > 1, só os do processo principal).")
+    parser.add_argument("--cache", metavar="ARQUIVO",
+                        help="Cache persistente (SQLite) compartilhado com outros lotes e com o app (ver cache_persistente.py).")
+    args = parser.parse_args(argv)
+
+    if args.cache:
+        cache_persistente.configurar(args.cache)
+    if args.lote is None:
+        menu_principal()
+        return
+
+    cenarios = ["reduzido", "completo"] if args.cenario == "ambos" else [args.cenario]
+    entrada = _abrir_texto(args.lote, "r")
+    saida = _abrir_texto(args.saida, "w")
+    try:
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+        if args.metricas:
+            metricas.ativar()
+        executar_lote(entrada, saida, cenarios, args.delimitador, not args.sem_cabecalho, workers, args.bloco)
+        saida.flush()
+        if args.metricas:
+            metricas.gravar(args.metricas)
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: `| head`): descarta o restante sem rastreio de erro
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        for fluxo, caminho in ((entrada, args.lote), (saida, args.saida)):
+            if caminho == "-":
+                fluxo.detach()  # Não fecha stdin/stdout junto com o wrapper
+            else:
+                fluxo.close()
+
 if __name__ == "__main__":
-    menu_principal()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Mede o tempo de importação de cada ponto de entrada (início a frio).
+
+Cada medição roda em um processo Python novo, para que nada venha do cache de
+módulos. Informa a mediana de várias rodadas e quais dependências pesadas
+foram carregadas já na importação. Uso:
+
+    python medir_inicializacao.py [--rodadas 10] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+PONTOS_DE_ENTRADA = ["nucleo", "main", "app_final", "app_promocao"]
+MODULOS_PESADOS = ["pandas", "numpy", "dateutil", "pyarrow"]
+
+_SCRIPT_MEDICAO = """
+import json, sys, time, logging, warnings
+logging.disable(logging.CRITICAL)
+warnings.simplefilter("ignore")
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"segundos": duracao, "carregados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir_modulo(modulo: str, rodadas: int) -> dict:
+    """Importa `modulo` em `rodadas` processos novos e resume os tempos."""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    tempos = []
+    carregados = []
+    for _ in range(rodadas):
+        processo = subprocess.run(
+            [sys.executable, "-c", _SCRIPT_MEDICAO.format(modulo=modulo, pesados=MODULOS_PESADOS)],
+            cwd=diretorio, capture_output=True, text=True, check=True,
+        )
+        resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        tempos.append(resultado["segundos"] * 1000)
+        carregados = resultado["carregados"]
+
+    return {
+        "modulo": modulo,
+        "mediana_ms": round(statistics.median(tempos), 2),
+        "min_ms": round(min(tempos), 2),
+        "max_ms": round(max(tempos), 2),
+        "modulos_pesados_carregados": carregados,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação dos pontos de entrada.")
+    parser.add_argument("--rodadas", type=int, default=10, help="Processos por ponto de entrada (padrão: 10).")
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava o resultado em JSON para comparação entre versões.")
+    args = parser.parse_args(argv)
+
+    resultados = [medir_modulo(modulo, args.rodadas) for modulo in PONTOS_DE_ENTRADA]
+
+    print(f"{'MÓDULO':<15} | {'MEDIANA (ms)':>12} | {'MÍN':>8} | {'MÁX':>8} | PESADOS CARREGADOS")
+    print("-" * 75)
+    for r in resultados:
+        pesados = ", ".join(r["modulos_pesados_carregados"]) or "-"
+        print(f"{r['modulo']:<15} | {r['mediana_ms']:>12.2f} | {r['min_ms']:>8.2f} | {r['max_ms']:>8.2f} | {pesados}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "rodadas": args.rodadas,
+                "resultados": resultados,
+            }, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
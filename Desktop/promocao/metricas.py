@@ -0,0 +1,239 @@
+"""
+Instrumentação opcional: cronômetros, contadores e taxa de acerto de cache,
+exportados no formato de texto do Prometheus.
+
+Desligada por padrão: cada ponto instrumentado custa só a checagem de uma
+flag. Liga com PROMOCAO_METRICAS=1 (ou `ativar()`). As métricas podem ser
+lidas em um endpoint HTTP local (`servir`, ou /metricas na api.py) ou
+gravadas em arquivo (`gravar`, formato do textfile collector do
+node_exporter). Variáveis de ambiente usadas pelo app e pelo lote:
+
+    PROMOCAO_METRICAS=1                 liga a coleta
+    PROMOCAO_METRICAS_PORTA=9464        app_final serve /metrics nessa porta
+    PROMOCAO_METRICAS_ARQUIVO=m.prom    app_final grava o arquivo ao fim de cada execução
+
+`perfil()` captura um cProfile do trecho (usado pelo app com ?perfil=1).
+Usa apenas a biblioteca padrão.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+PREFIXO = "promocao"
+
+# Limites dos baldes do histograma de duração, em segundos
+BALDES = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ativo = os.environ.get("PROMOCAO_METRICAS", "") not in ("", "0")
+_trava = threading.Lock()
+_contadores: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_duracoes: Dict[str, List[float]] = {}    # etapa -> [contagem por balde..., +Inf, soma]
+
+# --- 1. Coleta ---
+
+def ativar(ligado: bool = True) -> None:
+    global _ativo
+    _ativo = ligado
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def limpar() -> None:
+    with _trava:
+        _contadores.clear()
+        _duracoes.clear()
+
+
+def contar(metrica: str, quantidade: float = 1, **rotulos: str) -> None:
+    """Soma `quantidade` ao contador `metrica` (com os rótulos dados)."""
+    if not _ativo:
+        return
+    chave = (metrica, tuple(sorted(rotulos.items())))
+    with _trava:
+        _contadores[chave] = _contadores.get(chave, 0) + quantidade
+
+
+def observar(etapa: str, segundos: float) -> None:
+    """Registra uma duração no histograma da etapa."""
+    if not _ativo:
+        return
+    with _trava:
+        serie = _duracoes.get(etapa)
+        if serie is None:
+            serie = _duracoes[etapa] = [0] * (len(BALDES) + 2) + [0.0]
+        for i, limite in enumerate(BALDES):
+            if segundos <= limite:
+                serie[i] += 1
+                break
+        else:
+            serie[len(BALDES)] += 1
+        serie[-2] += 1
+        serie[-1] += segundos
+
+
+@contextmanager
+def cronometro(etapa: str):
+    """Mede o bloco `with` (nada é medido com a coleta desligada)."""
+    if not _ativo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(etapa, time.perf_counter() - inicio)
+
+
+def medido(etapa: Optional[str] = None) -> Callable:
+    """Decorador: mede cada chamada da função na etapa `etapa` (padrão: nome da função)."""
+    def decorar(funcao):
+        nome = etapa or funcao.__name__
+
+        @functools.wraps(funcao)
+        def medir(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                observar(nome, time.perf_counter() - inicio)
+        return medir
+    return decorar
+
+
+def com_cache(nome: str, cache: Callable) -> Callable:
+    """
+    Aplica o decorador de cache `cache` (ex.: st.cache_data(...)) contando as
+    chamadas e as execuções reais da função, que só ocorrem em falha de cache.
+    A taxa de acerto é 1 - execuções / chamadas.
+    """
+    def decorar(funcao):
+        medida = medido(nome)(funcao)
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            contar("cache_execucoes", funcao=nome)
+            return medida(*args, **kwargs)
+        cacheada = cache(executar)
+
+        @functools.wraps(funcao)
+        def chamar(*args, **kwargs):
+            contar("cache_chamadas", funcao=nome)
+            return cacheada(*args, **kwargs)
+        chamar.clear = getattr(cacheada, "clear", None)
+        return chamar
+    return decorar
+
+# --- 2. Exportação ---
+
+def _rotulos(pares) -> str:
+    escapar = lambda valor: str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    texto = ",".join(f'{chave}="{escapar(valor)}"' for chave, valor in pares)
+    return "{" + texto + "}" if texto else ""
+
+
+def texto_prometheus() -> str:
+    """Todas as métricas no formato de exposição de texto do Prometheus."""
+    with _trava:
+        contadores = dict(_contadores)
+        duracoes = {etapa: list(serie) for etapa, serie in _duracoes.items()}
+
+    linhas = []
+    nomes = sorted({nome for nome, _ in contadores})
+    for nome in nomes:
+        linhas.append(f"# TYPE {PREFIXO}_{nome}_total counter")
+        for (outro, rotulos), valor in sorted(contadores.items()):
+            if outro == nome:
+                linhas.append(f"{PREFIXO}_{nome}_total{_rotulos(rotulos)} {valor:g}")
+
+    # Taxa de acerto derivada dos contadores de com_cache
+    chamadas = {dict(r)["funcao"]: v for (n, r), v in contadores.items() if n == "cache_chamadas"}
+    if chamadas:
+        execucoes = {dict(r)["funcao"]: v for (n, r), v in contadores.items() if n == "cache_execucoes"}
+        linhas.append(f"# TYPE {PREFIXO}_cache_taxa_acerto gauge")
+        for funcao, total in sorted(chamadas.items()):
+            taxa = 1 - execucoes.get(funcao, 0) / total if total else 0
+            linhas.append(f"{PREFIXO}_cache_taxa_acerto{_rotulos([('funcao', funcao)])} {max(taxa, 0):.6g}")
+
+    if duracoes:
+        nome = f"{PREFIXO}_etapa_segundos"
+        linhas.append(f"# TYPE {nome} histogram")
+        for etapa, serie in sorted(duracoes.items()):
+            acumulado = 0
+            for limite, quantidade in zip(BALDES + (float("inf"),), serie[:len(BALDES) + 1]):
+                acumulado += quantidade
+                le = "+Inf" if limite == float("inf") else f"{limite:g}"
+                linhas.append(f"{nome}_bucket{_rotulos([('etapa', etapa), ('le', le)])} {acumulado}")
+            linhas.append(f"{nome}_sum{_rotulos([('etapa', etapa)])} {serie[-1]:.9g}")
+            linhas.append(f"{nome}_count{_rotulos([('etapa', etapa)])} {serie[-2]}")
+    return "\n".join(linhas) + "\n"
+
+
+def gravar(caminho: str) -> None:
+    """Grava as métricas em `caminho` (troca atômica, sem leitura de arquivo pela metade)."""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto_prometheus())
+    os.replace(temporario, caminho)
+
+
+def servir(porta: int, endereco: str = "127.0.0.1"):
+    """Servidor HTTP local (thread daemon) com GET /metrics. Retorna o servidor."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/metricas"):
+                self.send_error(404)
+                return
+            corpo = texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((endereco, porta), _Manipulador)
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
+
+# --- 3. Perfil (cProfile) ---
+
+class Perfil:
+    def __init__(self):
+        import cProfile
+        self.perfil = cProfile.Profile()
+
+    def texto(self, ordem: str = "cumulative", limite: int = 30) -> str:
+        """Relatório do pstats com as `limite` funções mais caras."""
+        import io
+        import pstats
+        saida = io.StringIO()
+        pstats.Stats(self.perfil, stream=saida).strip_dirs().sort_stats(ordem).print_stats(limite)
+        return saida.getvalue()
+
+    def dados(self) -> bytes:
+        """Conteúdo de um arquivo .prof (abre com pstats, snakeviz etc.)."""
+        import marshal
+        self.perfil.create_stats()
+        return marshal.dumps(self.perfil.stats)
+
+
+@contextmanager
+def perfil():
+    """Captura um cProfile do bloco `with`; o objeto produzido gera o relatório e o .prof."""
+    captura = Perfil()
+    captura.perfil.enable()
+    try:
+        yield captura
+    finally:
+        captura.perfil.disable()
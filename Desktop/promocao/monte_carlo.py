@@ -0,0 +1,102 @@
+"""
+Simulação de Monte Carlo de carreiras com interstícios mistos.
+
+Os cenários do app são os dois extremos (sempre reduzido / sempre completo).
+Aqui cada passo da carreira tem uma probabilidade de ser cumprido com
+interstício reduzido; são sorteadas N carreiras de uma vez (matriz de
+sorteios N x passos) e projetadas pelo motor vetorizado. O resultado é a
+distribuição das datas e idades de cada promoção: percentis e histograma.
+"""
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from nucleo import ORDEM_GRADUACOES
+from projecao_vetorizada import IDADE_INDEFINIDA, N_PASSOS, projetar_promocoes_lote
+
+AMOSTRAS_PADRAO = 100_000
+PERCENTIS_PADRAO = (5, 25, 50, 75, 95)
+
+
+class ResultadoMonteCarlo(NamedTuple):
+    """Carreiras sorteadas: uma linha por amostra, uma coluna por promoção restante."""
+    passos: List[str]                 # Graduação alcançada em cada coluna
+    reducoes: np.ndarray              # (amostras, passos) bool: passo cumprido com redução
+    datas: np.ndarray                 # (amostras, passos) datetime64[D]
+    idades: Optional[np.ndarray]      # (amostras, passos) int16, ou None sem nascimento
+
+
+def simular_carreiras(graduacao: str, data_base: date, probabilidade_reducao: Union[float, Sequence[float]],
+                      amostras: int = AMOSTRAS_PADRAO, semente: Optional[int] = None,
+                      data_nascimento: Optional[date] = None, regras=None) -> ResultadoMonteCarlo:
+    """
+    Sorteia `amostras` carreiras a partir de `graduacao` / `data_base`.
+
+    `probabilidade_reducao` é a chance (0 a 1) de cada passo usar o interstício
+    reduzido: um valor único ou um por passo (Soldado→Cabo ... 1º Sgt→Subtenente).
+    A mesma `semente` reproduz o mesmo resultado. `regras` (ConjuntoRegras)
+    como em `projetar_promocoes_lote`.
+    """
+    inicio = ORDEM_GRADUACOES.index(graduacao)
+    probabilidades = np.broadcast_to(np.asarray(probabilidade_reducao, dtype=np.float64), (N_PASSOS,))
+    if ((probabilidades < 0) | (probabilidades > 1)).any():
+        raise ValueError("probabilidade_reducao deve estar entre 0 e 1.")
+
+    rng = np.random.default_rng(semente)
+    reducoes = rng.random((amostras, N_PASSOS - inicio)) < probabilidades[inicio:]
+
+    indices = np.zeros((amostras, N_PASSOS), dtype=np.int8)
+    indices[:, inicio:] = reducoes
+    resultado = projetar_promocoes_lote(
+        np.full(amostras, np.datetime64(data_base, "D")), inicio, indices,
+        np.datetime64(data_nascimento, "D") if data_nascimento else None, regras=regras,
+    )
+
+    return ResultadoMonteCarlo(
+        passos=ORDEM_GRADUACOES[inicio + 1:],
+        reducoes=reducoes,
+        datas=resultado["datas"][:, inicio:],
+        idades=resultado["idades"][:, inicio:] if data_nascimento else None,
+    )
+
+
+def _percentis(valores: np.ndarray, percentis: Sequence[float]) -> np.ndarray:
+    """Percentis por estatística de ordem (sempre um valor observado, ex.: uma data de promoção real)."""
+    ordenados = np.sort(valores)
+    posicoes = np.floor(np.asarray(percentis) / 100 * (len(ordenados) - 1)).astype(np.int64)
+    return ordenados[posicoes]
+
+
+def resumir(resultado: ResultadoMonteCarlo, percentis: Sequence[float] = PERCENTIS_PADRAO) -> List[Dict[str, object]]:
+    """Percentis da data (e da idade) de cada promoção, um dicionário por passo."""
+    resumo = []
+    for j, para in enumerate(resultado.passos):
+        linha: Dict[str, object] = {"Para": para}
+        datas = _percentis(resultado.datas[:, j], percentis).astype(object)
+        linha.update({f"Data P{p:g}": d for p, d in zip(percentis, datas)})
+        if resultado.idades is not None:
+            idades = _percentis(resultado.idades[:, j], percentis)
+            linha.update({f"Idade P{p:g}": int(i) for p, i in zip(percentis, idades)})
+        linha["Com Redução"] = float(resultado.reducoes[:, j].mean())
+        resumo.append(linha)
+    return resumo
+
+
+def histograma_datas(resultado: ResultadoMonteCarlo, passo: int = -1) -> Dict[date, float]:
+    """
+    Frequência relativa de cada data possível da promoção `passo` (padrão: a
+    última, Subtenente). As datas são sempre datas fixas de promoção, então o
+    histograma é exato, sem faixas.
+    """
+    valores, contagens = np.unique(resultado.datas[:, passo], return_counts=True)
+    return {d: float(c) / len(resultado.datas) for d, c in zip(valores.astype(object), contagens)}
+
+
+def histograma_idades(resultado: ResultadoMonteCarlo, passo: int = -1) -> Dict[int, float]:
+    """Frequência relativa de cada idade na promoção `passo`; vazio sem data de nascimento."""
+    if resultado.idades is None:
+        return {}
+    idades = resultado.idades[:, passo]
+    valores, contagens = np.unique(idades[idades != IDADE_INDEFINIDA], return_counts=True)
+    return {int(v): float(c) / len(idades) for v, c in zip(valores, contagens)}
@@ -0,0 +1,121 @@
+"""
+Núcleo de regras e cálculo de datas compartilhado por `main.py`, `app_final.py` e `app_promocao.py`.
+
+Importa apenas a biblioteca padrão, para manter rápido o início do console e do
+app. Dependências pesadas ficam com quem realmente precisa delas.
+"""
+from datetime import date
+from typing import Optional, Sequence, Tuple
+
+from regras import obter_regras
+
+# --- 1. Constantes e Dados Base ---
+# Derivadas do conjunto padrão de regras.json (ver regras.py), lido uma vez na importação.
+# Quem precisa acompanhar mudanças no arquivo sem reiniciar usa `obter_regras()` diretamente.
+
+_REGRAS_PADRAO = obter_regras()
+
+# Mapeamento de abreviaturas para nomes completos
+ABREVIATURAS_MAP = dict(_REGRAS_PADRAO.abreviaturas)
+
+# Dicionário de Interstícios (Chave: Graduação ATUAL | Valor: [Completo, Reduzido] em meses)
+INTERSTICIOS_MILITARES = {graduacao: list(meses) for graduacao, meses in _REGRAS_PADRAO.intersticios.items()}
+
+# Datas Fixas de Promoção (Formato: (Mês, Dia))
+DATAS_PROMOCAO_FIXAS = list(_REGRAS_PADRAO.datas_promocao)
+
+# Ordem de progressão de carreira
+ORDEM_GRADUACOES = list(_REGRAS_PADRAO.ordem_graduacoes)
+
+# Identifica as regras acima (chave de caches persistentes)
+ASSINATURA_REGRAS = _REGRAS_PADRAO.assinatura
+
+# --- 2. Aritmética de Datas em Inteiros ---
+# Substitui `relativedelta` no caminho crítico: trabalha com (ano, mês, dia) inteiros,
+# com o mesmo ajuste ao fim do mês, e só cria o objeto `date` do resultado.
+# A equivalência com `relativedelta` é conferida por verificar_datas.py.
+
+_DIAS_POR_MES = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def dias_no_mes(ano: int, mes: int) -> int:
+    """Quantidade de dias do mês (considera anos bissextos)."""
+    if mes == 2 and ano % 4 == 0 and (ano % 100 != 0 or ano % 400 == 0):
+        return 29
+    return _DIAS_POR_MES[mes - 1]
+
+
+def somar_meses_ymd(ano: int, mes: int, dia: int, meses: int):
+    """Soma meses a (ano, mês, dia), limitando o dia ao fim do mês como `relativedelta`."""
+    ano, mes = divmod(ano * 12 + mes - 1 + meses, 12)
+    mes += 1
+    ultimo_dia = dias_no_mes(ano, mes)
+    return ano, mes, dia if dia <= ultimo_dia else ultimo_dia
+
+
+def somar_meses(data_base: date, meses: int) -> date:
+    """Soma meses a uma data, ajustando ao fim do mês quando necessário."""
+    return date(*somar_meses_ymd(data_base.year, data_base.month, data_base.day, meses))
+
+# --- 3. Funções de Cálculo ---
+
+def calcular_proxima_promocao(data_base: date, meses_intersticio: int,
+                              datas_promocao: Optional[Sequence[Tuple[int, int]]] = None) -> date:
+    """
+    Calcula a próxima data de promoção APÓS o interstício ser completado.
+    `datas_promocao` permite usar o calendário de outro conjunto de regras (padrão: DATAS_PROMOCAO_FIXAS).
+    """
+    datas_promocao = DATAS_PROMOCAO_FIXAS if datas_promocao is None else datas_promocao
+    ano_candidato, mes_minimo, dia_minimo = somar_meses_ymd(
+        data_base.year, data_base.month, data_base.day, meses_intersticio
+    )
+
+    for mes, dia in datas_promocao:
+        # Datas inexistentes no ano (ex.: 29/02) são ignoradas
+        if not (1 <= mes <= 12 and 1 <= dia <= dias_no_mes(ano_candidato, mes)):
+            continue
+
+        if (mes, dia) >= (mes_minimo, dia_minimo):
+            return date(ano_candidato, mes, dia)
+
+    ano_candidato += 1
+    mes_abril, dia_abril = datas_promocao[0]
+
+    try:
+        proxima_abril = date(ano_candidato, mes_abril, dia_abril)
+    except ValueError:
+        proxima_abril = date(ano_candidato, mes_abril, 20)
+
+    return proxima_abril
+
+
+def calcular_idade(data_nascimento: date, data_referencia: date) -> int:
+    """Calcula a idade em anos na data de referência (mesmo resultado de `relativedelta(...).years`)."""
+    if data_referencia >= data_nascimento:
+        # Aniversário de 29/02 conta em 28/02 nos anos não bissextos
+        dia_aniversario = min(data_nascimento.day, dias_no_mes(data_referencia.year, data_nascimento.month))
+        antes_do_aniversario = (data_referencia.month, data_referencia.day) < (data_nascimento.month, dia_aniversario)
+        return data_referencia.year - data_nascimento.year - antes_do_aniversario
+
+    # Referência anterior ao nascimento: mesmo ajuste de meses que `relativedelta` faz
+    meses = (data_referencia.year - data_nascimento.year) * 12 + data_referencia.month - data_nascimento.month
+    ajustada = somar_meses_ymd(data_nascimento.year, data_nascimento.month, data_nascimento.day, meses)
+    if (data_referencia.year, data_referencia.month, data_referencia.day) > ajustada:
+        meses += 1
+    return -(-meses // 12)
+
+
+def normalizar_graduacao(texto: str) -> Optional[str]:
+    """Converte nome completo ou abreviatura (ABREVIATURAS_MAP) para o FORMATO COMPLETO. Retorna None se inválida."""
+    graduacao_input = texto.strip().upper()
+
+    # 1. Verifica se é uma abreviatura
+    if graduacao_input in ABREVIATURAS_MAP:
+        return ABREVIATURAS_MAP[graduacao_input]
+    # 2. Verifica se é o nome completo (Padroniza para título, ex: 'Cabo')
+    if graduacao_input.title() in INTERSTICIOS_MILITARES:
+        return graduacao_input.title()
+    # 3. Verifica o Subtenente (caso especial)
+    if graduacao_input.title() == "Subtenente":
+        return "Subtenente"
+    return None
@@ -0,0 +1,123 @@
+"""
+Previsão de ondas de promoção: quantas promoções de cada graduação caem em
+cada data do calendário (DATAS_PROMOCAO_FIXAS) nos próximos anos, por cenário.
+
+A agregação é feita inteira em NumPy sobre a saída de `projetar_promocoes_lote`:
+cada promoção projetada vira um código (passo, posição da data no calendário)
+e as contagens saem de um único `np.bincount`, sem laço por militar. O
+resultado tem tamanho cenários × passos × datas (algumas centenas de
+números), independente do tamanho do efetivo. Uso:
+
+    python ondas_promocao.py efetivo.csv [--anos 10] [--cenario completo]
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Union
+
+import numpy as np
+
+from nucleo import ABREVIATURAS_MAP, DATAS_PROMOCAO_FIXAS, ORDEM_GRADUACOES, dias_no_mes, somar_meses
+from projecao_vetorizada import N_PASSOS, projetar_promocoes_lote
+
+# Cenário -> índice do interstício (0 = Completo, 1 = Reduzido)
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+ANOS_PADRAO = 10
+
+
+class Ondas(NamedTuple):
+    datas: np.ndarray                   # (k,) datetime64[D]: datas do calendário no horizonte
+    contagens: Dict[str, np.ndarray]    # Cenário -> (N_PASSOS, k) int64; linha j = promoções a ORDEM_GRADUACOES[j + 1]
+    militares: int                      # Militares válidos lidos
+    invalidas: int                      # Linhas em quarentena (ver ingestao.py)
+
+# --- 1. Calendário do Horizonte ---
+
+def calendario(inicio: date, anos: int = ANOS_PADRAO, datas_promocao=None) -> np.ndarray:
+    """Datas de promoção em [inicio, inicio + anos), em ordem, como datetime64[D] (padrão: DATAS_PROMOCAO_FIXAS)."""
+    fim = somar_meses(inicio, 12 * anos)
+    datas = [date(ano, mes, dia)
+             for ano in range(inicio.year, fim.year + 1)
+             for mes, dia in (DATAS_PROMOCAO_FIXAS if datas_promocao is None else datas_promocao)
+             if dia <= dias_no_mes(ano, mes)]
+    return np.array([d for d in datas if inicio <= d < fim], dtype="datetime64[D]")
+
+# --- 2. Agregação Vetorizada ---
+
+def contar_promocoes(datas_promocao: np.ndarray, datas: np.ndarray) -> np.ndarray:
+    """
+    Contagem (N_PASSOS, k) das promoções projetadas (matriz (n, N_PASSOS) de
+    `projetar_promocoes_lote`) em cada data de `datas`; promoções fora do
+    horizonte ou em data fora do calendário não entram.
+    """
+    k = datas.shape[0]
+    if k == 0:
+        return np.zeros((N_PASSOS, 0), dtype=np.int64)
+    posicao = np.searchsorted(datas, datas_promocao)
+    no_calendario = (posicao < k) & ~np.isnat(datas_promocao)
+    no_calendario[no_calendario] = datas[posicao[no_calendario]] == datas_promocao[no_calendario]
+    codigos = (np.arange(N_PASSOS) * k)[None, :] + posicao
+    return np.bincount(codigos[no_calendario], minlength=N_PASSOS * k).reshape(N_PASSOS, k)
+
+
+def prever_ondas(efetivo: Union[str, bytes], inicio: Optional[date] = None, anos: int = ANOS_PADRAO,
+                 regras=None) -> Ondas:
+    """
+    Lê o efetivo (caminho ou conteúdo do CSV/TSV, formato de `main.py --lote`)
+    em blocos e acumula as contagens por cenário, graduação e data. `regras`
+    (ConjuntoRegras) troca interstícios e calendário, como em `projetar_promocoes_lote`.
+    """
+    from exportacao import ler_efetivo_em_blocos
+
+    datas = calendario(inicio or date.today(), anos, regras.datas_promocao if regras is not None else None)
+    contagens = {cenario: np.zeros((N_PASSOS, datas.shape[0]), dtype=np.int64) for cenario in CENARIOS}
+    militares = invalidas = 0
+    for _, graduacoes, datas_base, _, _, invalidas_bloco in ler_efetivo_em_blocos(efetivo):
+        militares += graduacoes.shape[0]
+        invalidas += invalidas_bloco
+        for cenario, indice in CENARIOS.items():
+            resultado = projetar_promocoes_lote(datas_base, graduacoes, indice, regras=regras)
+            contagens[cenario] += contar_promocoes(resultado["datas"], datas)
+    return Ondas(datas, contagens, militares, invalidas)
+
+
+def tabela_ondas(ondas: Ondas) -> Dict[str, list]:
+    """Formato longo (colunas cenario, data, para, promocoes) só com as contagens não nulas."""
+    colunas = {"cenario": [], "data": [], "para": [], "promocoes": []}
+    datas = ondas.datas.astype(object)
+    for cenario, contagem in ondas.contagens.items():
+        passos, posicoes = np.nonzero(contagem)
+        colunas["cenario"] += [cenario] * passos.shape[0]
+        colunas["data"] += list(datas[posicoes])
+        colunas["para"] += [ORDEM_GRADUACOES[p + 1] for p in passos]
+        colunas["promocoes"] += contagem[passos, posicoes].tolist()
+    return colunas
+
+# --- 3. Linha de Comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Promoções previstas por data do calendário, graduação e cenário.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (mesmo formato de `main.py --lote`).")
+    parser.add_argument("--anos", type=int, default=ANOS_PADRAO, help=f"Horizonte em anos (padrão: {ANOS_PADRAO}).")
+    parser.add_argument("--cenario", choices=list(CENARIOS), default="completo")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    ondas = prever_ondas(args.efetivo, anos=args.anos)
+    tempo = time.perf_counter() - inicio
+
+    siglas = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}
+    contagem = ondas.contagens[args.cenario]
+    print("data;" + ";".join(siglas[g] for g in ORDEM_GRADUACOES[1:]) + ";total")
+    for posicao, data in enumerate(ondas.datas.astype(object)):
+        valores = contagem[:, posicao]
+        print(f"{data:%d/%m/%Y};" + ";".join(str(v) for v in valores) + f";{valores.sum()}")
+
+    print(f"{ondas.militares} militares ({ondas.invalidas} linhas inválidas) | {ondas.datas.shape[0]} datas | "
+          f"{tempo:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Motor vetorizado de projeção de carreira para efetivos inteiros.
+
+Reproduz exatamente `calcular_proxima_promocao`, `calcular_idade` e a cadeia de
+`projetar_promocoes`, mas operando sobre arrays NumPy (datetime64[D]) de todo o
+efetivo de uma só vez, sem laço em Python por militar.
+"""
+from typing import Dict
+
+import numpy as np
+
+import metricas
+from nucleo import DATAS_PROMOCAO_FIXAS, INTERSTICIOS_MILITARES, ORDEM_GRADUACOES
+
+# --- 1. Constantes ---
+
+# Número de passos possíveis na carreira (Soldado→Cabo ... 1º Sargento→Subtenente)
+N_PASSOS = len(ORDEM_GRADUACOES) - 1
+
+# Sentinela para idades não calculadas (sem data de nascimento ou passo inexistente)
+IDADE_INDEFINIDA = np.iinfo(np.int16).min
+
+# Tabela (passo, índice do interstício) -> meses, no formato de INTERSTICIOS_MILITARES
+_MESES_POR_PASSO = np.array(
+    [INTERSTICIOS_MILITARES.get(g, [0, 0]) for g in ORDEM_GRADUACOES[:-1]], dtype=np.int64
+)
+
+# --- 2. Aritmética de Datas Vetorizada ---
+
+_DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+def _decompor(datas: np.ndarray):
+    """Separa um array datetime64[D] em (ano, mês, dia) inteiros (algoritmo civil de dias)."""
+    z = datas.astype(np.int64) + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    dias = doy - (153 * mp + 2) // 5 + 1
+    meses = np.where(mp < 10, mp + 3, mp - 9)
+    anos = yoe + era * 400 + (meses <= 2)
+    return anos, meses, dias
+
+
+def _dias_no_mes(anos, meses) -> np.ndarray:
+    """Quantidade de dias de cada (ano, mês)."""
+    anos = np.asarray(anos, dtype=np.int64)
+    meses = np.asarray(meses, dtype=np.int64)
+    bissexto = (anos % 4 == 0) & ((anos % 100 != 0) | (anos % 400 == 0))
+    return _DIAS_MES[meses - 1] + ((meses == 2) & bissexto)
+
+
+def _montar_datas(anos, meses, dias) -> np.ndarray:
+    """Constrói datetime64[D] a partir de (ano, mês, dia) já válidos."""
+    anos = np.asarray(anos, dtype=np.int64)
+    meses = np.asarray(meses, dtype=np.int64)
+    anos = anos - (meses <= 2)
+    era = np.floor_divide(anos, 400)
+    yoe = anos - era * 400
+    doy = (153 * np.where(meses > 2, meses - 3, meses + 9) + 2) // 5 + np.asarray(dias, dtype=np.int64) - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return (era * 146097 + doe - 719468).astype("datetime64[D]")
+
+
+def somar_meses_vetorizado(datas: np.ndarray, meses) -> np.ndarray:
+    """Equivalente a `data + relativedelta(months=meses)`, com ajuste ao fim do mês."""
+    datas = np.asarray(datas, dtype="datetime64[D]")
+    anos, mes, dia = _decompor(datas)
+    meses_abs = (anos - 1970) * 12 + (mes - 1) + np.asarray(meses, dtype=np.int64)
+    novo_ano = meses_abs // 12 + 1970
+    novo_mes = meses_abs % 12 + 1
+    novo_dia = np.minimum(dia, _dias_no_mes(novo_ano, novo_mes))
+    resultado = _montar_datas(novo_ano, novo_mes, novo_dia)
+    return np.where(np.isnat(datas), np.datetime64("NaT", "D"), resultado)
+
+
+def proxima_promocao_vetorizada(datas_base: np.ndarray, meses_intersticio, datas_promocao=None) -> np.ndarray:
+    """Versão vetorizada de `calcular_proxima_promocao` (`datas_promocao` como lá; padrão: DATAS_PROMOCAO_FIXAS)."""
+    datas_promocao = DATAS_PROMOCAO_FIXAS if datas_promocao is None else datas_promocao
+    data_minima = somar_meses_vetorizado(datas_base, meses_intersticio)
+    ano_cand, _, _ = _decompor(data_minima)
+
+    resultado = np.full(data_minima.shape, np.datetime64("NaT", "D"))
+    pendente = ~np.isnat(data_minima)
+
+    for mes, dia in datas_promocao:
+        # Datas inexistentes no ano (ex.: 29/02) são ignoradas, como no `except ValueError`
+        valida = dia <= _dias_no_mes(ano_cand, mes)
+        cand = _montar_datas(ano_cand, mes, np.where(valida, dia, 1))
+        escolhe = pendente & valida & (cand >= data_minima)
+        resultado = np.where(escolhe, cand, resultado)
+        pendente &= ~escolhe
+
+    mes_abril, dia_abril = datas_promocao[0]
+    ano_seguinte = ano_cand + 1
+    dia_fallback = np.where(dia_abril <= _dias_no_mes(ano_seguinte, mes_abril), dia_abril, 20)
+    fallback = _montar_datas(ano_seguinte, mes_abril, dia_fallback)
+    return np.where(pendente, fallback, resultado)
+
+
+def idade_vetorizada(datas_nascimento: np.ndarray, datas_referencia: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de `calcular_idade` (anos completos de `relativedelta`)."""
+    nasc = np.asarray(datas_nascimento, dtype="datetime64[D]")
+    ref = np.asarray(datas_referencia, dtype="datetime64[D]")
+
+    a_nasc, m_nasc, d_nasc = _decompor(nasc)
+    a_ref, m_ref, d_ref = _decompor(ref)
+
+    # Aniversário no ano da referência, com 29/02 ajustado para 28/02 como em `relativedelta`
+    d_aniversario = np.minimum(d_nasc, _dias_no_mes(a_ref, m_nasc))
+    antes_aniversario = (m_ref * 32 + d_ref) < (m_nasc * 32 + d_aniversario)
+    anos = a_ref - a_nasc - antes_aniversario
+
+    nasc, ref, anos = np.broadcast_arrays(nasc, ref, anos)
+    negativa = ref < nasc
+    if negativa.any():
+        anos = anos.copy()
+        anos[negativa] = _idade_negativa(nasc[negativa], ref[negativa])
+
+    invalida = np.isnat(nasc) | np.isnat(ref)
+    return np.where(invalida, IDADE_INDEFINIDA, anos).astype(np.int16)
+
+
+def _idade_negativa(nasc: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """Caso raro de referência anterior ao nascimento, seguindo o laço de `relativedelta`."""
+    a_ref, m_ref, _ = _decompor(ref)
+    a_nasc, m_nasc, _ = _decompor(nasc)
+    meses = (a_ref - a_nasc) * 12 + (m_ref - m_nasc)
+    meses = np.where(ref > somar_meses_vetorizado(nasc, meses), meses + 1, meses)
+    return -((-meses) // 12)
+
+# --- 3. Projeção do Efetivo ---
+
+def indices_graduacao(graduacoes) -> np.ndarray:
+    """Converte nomes de graduação (ou índices) em índices de ORDEM_GRADUACOES."""
+    graduacoes = np.asarray(graduacoes)
+    if graduacoes.dtype.kind in "iu":
+        indices = graduacoes.astype(np.int64)
+    else:
+        posicao = {g: i for i, g in enumerate(ORDEM_GRADUACOES)}
+        try:
+            indices = np.array([posicao[g] for g in graduacoes.ravel()], dtype=np.int64).reshape(graduacoes.shape)
+        except KeyError as erro:
+            raise ValueError(f"Graduação '{erro.args[0]}' não encontrada.") from None
+
+    if indices.size and (indices.min() < 0 or indices.max() >= len(ORDEM_GRADUACOES)):
+        raise ValueError("Índice de graduação fora de ORDEM_GRADUACOES.")
+    return indices
+
+
+@metricas.medido()
+def projetar_promocoes_lote(datas_base, graduacoes, indices_intersticio, datas_nascimento=None,
+                            regras=None) -> Dict[str, np.ndarray]:
+    """
+    Projeta a carreira completa até Subtenente para todo o efetivo.
+
+    `indices_intersticio` segue a convenção de `projetar_promocoes` (0 = Completo,
+    1 = Reduzido) e pode ter forma (n,) ou (n, N_PASSOS) para escolher o
+    interstício de cada passo. A coluna j dos resultados é a promoção de
+    ORDEM_GRADUACOES[j] para ORDEM_GRADUACOES[j + 1]; passos já cumpridos
+    ficam como NaT / IDADE_INDEFINIDA.
+
+    `regras` (ConjuntoRegras de regras.py) troca interstícios e calendário
+    pelos de outro conjunto com as mesmas graduações (padrão: os de nucleo.py).
+    """
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]").ravel()
+    n = datas_base.shape[0]
+    graduacoes = np.broadcast_to(indices_graduacao(graduacoes), (n,))
+
+    indices = np.asarray(indices_intersticio, dtype=np.int64)
+    if indices.ndim < 2:
+        indices = np.broadcast_to(indices.reshape(-1, 1) if indices.ndim else indices, (n, N_PASSOS))
+    if indices.shape != (n, N_PASSOS) or not np.isin(indices, (0, 1)).all():
+        raise ValueError("indices_intersticio deve conter 0 (Completo) ou 1 (Reduzido) por militar/passo.")
+
+    meses_por_passo, datas_promocao = _MESES_POR_PASSO, None
+    if regras is not None:
+        if list(regras.ordem_graduacoes) != ORDEM_GRADUACOES:
+            raise ValueError(f"Conjunto '{regras.chave}' tem graduações diferentes de ORDEM_GRADUACOES.")
+        meses_por_passo, datas_promocao = np.array(regras.meses_por_passo, dtype=np.int64), regras.datas_promocao
+
+    datas = np.full((n, N_PASSOS), np.datetime64("NaT", "D"))
+    meses = np.zeros((n, N_PASSOS), dtype=np.int16)
+    cursor = datas_base.copy()
+
+    for passo in range(N_PASSOS):
+        ativo = graduacoes <= passo
+        meses_passo = meses_por_passo[passo, indices[:, passo]]
+        nova = proxima_promocao_vetorizada(cursor, meses_passo, datas_promocao)
+        datas[:, passo] = np.where(ativo, nova, np.datetime64("NaT", "D"))
+        meses[:, passo] = np.where(ativo, meses_passo, 0)
+        cursor = np.where(ativo, nova, cursor)
+
+    resultado = {
+        "graduacoes": np.asarray(graduacoes, dtype=np.uint8),
+        "datas": datas,
+        "meses": meses,
+        "data_final": cursor,
+    }
+
+    return anexar_idades(resultado, datas_nascimento)
+
+
+def anexar_idades(resultado: Dict[str, np.ndarray], datas_nascimento=None) -> Dict[str, np.ndarray]:
+    """Inclui em `resultado` as idades em cada passo e na data final."""
+    n = resultado["data_final"].shape[0]
+    if datas_nascimento is not None:
+        nasc = np.broadcast_to(np.asarray(datas_nascimento, dtype="datetime64[D]").ravel(), (n,))
+        resultado["idades"] = idade_vetorizada(nasc[:, None], resultado["datas"])
+        resultado["idade_final"] = idade_vetorizada(nasc, resultado["data_final"])
+    else:
+        resultado["idades"] = np.full((n, N_PASSOS), IDADE_INDEFINIDA, dtype=np.int16)
+        resultado["idade_final"] = np.full(n, IDADE_INDEFINIDA, dtype=np.int16)
+    return resultado
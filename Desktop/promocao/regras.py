@@ -0,0 +1,168 @@
+"""
+Conjuntos de regras de promoção carregados de regras.json.
+
+Cada conjunto (carreira + versão da lei) traz as graduações em ordem, com
+sigla e interstícios, e o calendário de datas de promoção. Na carga, cada
+conjunto é validado e compilado em estruturas de consulta rápida (índice de
+graduação por nome/sigla, meses por passo, calendário ordenado).
+
+O arquivo só é relido quando o mtime muda: `obter_regras()` custa um `os.stat`
+e devolve o mesmo objeto compilado para todas as sessões do app e chamadas em
+lote do processo. Se a nova versão não puder ser lida (arquivo salvo pela
+metade, JSON ou conjunto inválido), continua valendo a última versão válida e
+o problema fica em `falha_regras()`. Usa apenas a biblioteca padrão (nucleo.py depende daqui).
+O caminho pode ser trocado pela variável de ambiente PROMOCAO_REGRAS.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+CAMINHO_PADRAO = os.environ.get(
+    "PROMOCAO_REGRAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "regras.json")
+)
+
+# --- 1. Conjunto Compilado ---
+
+class ConjuntoRegras(NamedTuple):
+    chave: str
+    descricao: str
+    ordem_graduacoes: Tuple[str, ...]                 # Da graduação inicial à final
+    abreviaturas: Dict[str, str]                      # Sigla -> nome completo
+    intersticios: Dict[str, List[int]]                # Graduação atual -> [Completo, Reduzido] em meses
+    datas_promocao: Tuple[Tuple[int, int], ...]       # (mês, dia), em ordem de calendário
+    indice_graduacao: Dict[str, int]                  # NOME/SIGLA em maiúsculas -> posição em ordem_graduacoes
+    meses_por_passo: Tuple[Tuple[int, int], ...]      # Passo j (graduação j -> j + 1) -> (completo, reduzido)
+    assinatura: str                                   # Hash do conteúdo (chave de cache / tabelas persistidas)
+
+    def indice(self, texto: str) -> Optional[int]:
+        """Posição da graduação (nome completo ou sigla, sem diferenciar maiúsculas); None se inválida."""
+        return self.indice_graduacao.get(texto.strip().upper())
+
+
+class ErroRegras(ValueError):
+    """Arquivo de regras inválido."""
+
+
+def compilar_conjunto(chave: str, dados: dict) -> ConjuntoRegras:
+    """Valida um conjunto do arquivo e monta as estruturas de consulta."""
+    try:
+        graduacoes = dados["graduacoes"]
+        ordem = tuple(g["nome"] for g in graduacoes)
+        abreviaturas = {g["sigla"]: g["nome"] for g in graduacoes}
+        intersticios = {
+            g["nome"]: [int(g["intersticio"]["completo"]), int(g["intersticio"]["reduzido"])]
+            for g in graduacoes[:-1]
+        }
+        datas = []
+        for texto in dados["datas_promocao"]:
+            dia, mes = (int(parte) for parte in texto.split("/"))
+            datas.append((mes, dia))
+    except (AttributeError, KeyError, TypeError, ValueError) as erro:
+        raise ErroRegras(f"Conjunto '{chave}' inválido: {erro!r}") from None
+
+    if len(ordem) < 2 or len(set(ordem)) != len(ordem) or len(abreviaturas) != len(ordem):
+        raise ErroRegras(f"Conjunto '{chave}': graduações e siglas devem ser únicas (mínimo 2).")
+    if not datas or any(not (1 <= mes <= 12 and 1 <= dia <= 31) for mes, dia in datas):
+        raise ErroRegras(f"Conjunto '{chave}': datas de promoção devem estar em DD/MM.")
+    if any(m < 0 for par in intersticios.values() for m in par):
+        raise ErroRegras(f"Conjunto '{chave}': interstícios não podem ser negativos.")
+
+    indice = {nome.upper(): i for i, nome in enumerate(ordem)}
+    indice.update({sigla.upper(): ordem.index(nome) for sigla, nome in abreviaturas.items()})
+    conteudo = json.dumps([ordem, abreviaturas, intersticios, sorted(datas)], ensure_ascii=False, sort_keys=True)
+
+    return ConjuntoRegras(
+        chave=chave,
+        descricao=dados.get("descricao", chave),
+        ordem_graduacoes=ordem,
+        abreviaturas=abreviaturas,
+        intersticios=intersticios,
+        datas_promocao=tuple(sorted(datas)),
+        indice_graduacao=indice,
+        meses_por_passo=tuple(tuple(intersticios[g]) for g in ordem[:-1]),
+        assinatura=hashlib.sha1(conteudo.encode("utf-8")).hexdigest()[:16],
+    )
+
+# --- 2. Carga com Recarga por mtime ---
+
+class _Carregado(NamedTuple):
+    mtime_ns: int
+    padrao: str
+    conjuntos: Dict[str, ConjuntoRegras]
+    falha: Optional[str] = None      # Erro da versão atual do arquivo (conjuntos = última versão válida)
+
+
+_CARREGADOS: Dict[str, _Carregado] = {}
+_TRAVA = threading.Lock()
+
+
+def _ler_arquivo(caminho: str) -> Tuple[str, Dict[str, ConjuntoRegras]]:
+    """Lê e compila o arquivo inteiro; qualquer problema de conteúdo vira ErroRegras."""
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+        conjuntos = {chave: compilar_conjunto(chave, conjunto) for chave, conjunto in dados["conjuntos"].items()}
+        padrao = dados.get("padrao", next(iter(conjuntos)))
+    except ErroRegras:
+        raise
+    except (AttributeError, KeyError, TypeError, StopIteration, ValueError) as erro:
+        # ValueError inclui JSONDecodeError e UnicodeDecodeError (arquivo salvo pela metade)
+        raise ErroRegras(f"Arquivo de regras {caminho} inválido: {erro!r}") from None
+    if padrao not in conjuntos:
+        raise ErroRegras(f"Conjunto padrão '{padrao}' não existe em {caminho}.")
+    return padrao, conjuntos
+
+
+def carregar_regras(caminho: str = CAMINHO_PADRAO) -> Tuple[str, Dict[str, ConjuntoRegras]]:
+    """
+    (chave do conjunto padrão, {chave: conjunto}); relê e recompila só se o
+    arquivo mudou. Se a versão nova for inválida ou sumir, devolve a última
+    válida (ErroRegras / OSError só quando nunca houve uma).
+    """
+    carregado = _CARREGADOS.get(caminho)
+    try:
+        mtime_ns = os.stat(caminho).st_mtime_ns
+    except OSError as erro:
+        if carregado is None:
+            raise
+        # mtime -1: o arquivo é relido assim que voltar, mesmo com o mtime antigo
+        _CARREGADOS[caminho] = carregado._replace(mtime_ns=-1, falha=f"Arquivo de regras {caminho} inacessível: {erro}")
+        return carregado.padrao, carregado.conjuntos
+    if carregado is not None and carregado.mtime_ns == mtime_ns:
+        return carregado.padrao, carregado.conjuntos
+
+    with _TRAVA:
+        carregado = _CARREGADOS.get(caminho)
+        if carregado is None or carregado.mtime_ns != mtime_ns:
+            try:
+                carregado = _Carregado(mtime_ns, *_ler_arquivo(caminho))
+            except (OSError, ErroRegras) as erro:
+                if carregado is None:
+                    raise
+                # Guarda o mtime da versão inválida para não reler a cada chamada
+                carregado = carregado._replace(mtime_ns=mtime_ns, falha=str(erro))
+            _CARREGADOS[caminho] = carregado
+    return carregado.padrao, carregado.conjuntos
+
+
+def falha_regras(caminho: str = CAMINHO_PADRAO) -> Optional[str]:
+    """Erro da versão atual do arquivo quando a última versão válida continua em uso; None se está tudo certo."""
+    carregar_regras(caminho)
+    return _CARREGADOS[caminho].falha
+
+
+def obter_regras(chave: Optional[str] = None, caminho: str = CAMINHO_PADRAO) -> ConjuntoRegras:
+    """Conjunto `chave` (padrão do arquivo se None), sempre da versão atual do arquivo."""
+    padrao, conjuntos = carregar_regras(caminho)
+    try:
+        return conjuntos[chave or padrao]
+    except KeyError:
+        raise ErroRegras(f"Conjunto de regras '{chave}' não encontrado (disponíveis: {', '.join(conjuntos)}).") from None
+
+
+def listar_conjuntos(caminho: str = CAMINHO_PADRAO) -> List[Tuple[str, str]]:
+    """[(chave, descrição)] de todos os conjuntos, o padrão primeiro."""
+    padrao, conjuntos = carregar_regras(caminho)
+    return [(c.chave, c.descricao) for c in sorted(conjuntos.values(), key=lambda c: c.chave != padrao)]
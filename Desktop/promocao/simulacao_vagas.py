@@ -0,0 +1,218 @@
+"""
+Simulação de promoções com quadro de vagas limitado, por antiguidade.
+
+Diferente de `calcular_proxima_promocao`, que promove todos na primeira data
+fixa após o interstício, aqui cada graduação tem um número máximo de vagas.
+A simulação percorre as datas de DATAS_PROMOCAO_FIXAS e, em cada uma, promove
+os mais antigos entre os elegíveis até preencher as vagas abertas, da
+graduação mais alta para a mais baixa (vagas abertas por uma promoção são
+preenchidas na mesma data).
+
+As filas por graduação são heaps: uma de pendentes ordenada pela data em que o
+interstício se completa e outra de elegíveis ordenada por antiguidade. Uso:
+
+    python simulacao_vagas.py efetivo.csv --vagas CB=3000 3SGT=1500 2SGT=900 1SGT=600 ST=300
+"""
+import argparse
+import csv
+import heapq
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from nucleo import (
+    ABREVIATURAS_MAP,
+    DATAS_PROMOCAO_FIXAS,
+    INTERSTICIOS_MILITARES,
+    ORDEM_GRADUACOES,
+    dias_no_mes,
+    normalizar_graduacao,
+    somar_meses,
+)
+
+
+# --- 1. Simulação ---
+
+class ResultadoSimulacao(NamedTuple):
+    """Carreira simulada de cada militar e promoções realizadas em cada data."""
+    carreiras: Dict[object, List[Tuple[str, date]]]       # id -> [(graduação alcançada, data), ...]
+    promocoes_por_data: Dict[date, Dict[str, int]]         # data -> {graduação alcançada: quantidade}
+    graduacao_final: Dict[object, str]                     # id -> graduação ao fim da simulação (ou no desligamento)
+
+
+def datas_promocao(inicio: date, fim: date) -> List[date]:
+    """Datas fixas de promoção entre `inicio` e `fim`, inclusive, em ordem."""
+    datas = []
+    for ano in range(inicio.year, fim.year + 1):
+        for mes, dia in sorted(DATAS_PROMOCAO_FIXAS):
+            if dia <= dias_no_mes(ano, mes) and inicio <= date(ano, mes, dia) <= fim:
+                datas.append(date(ano, mes, dia))
+    return datas
+
+
+def simular_vagas(efetivo: Iterable[dict], vagas: Dict[str, int], inicio: date, fim: date,
+                  indice_intersticio: int = 0) -> ResultadoSimulacao:
+    """
+    Simula as promoções do efetivo entre `inicio` e `fim`.
+
+    Cada registro de `efetivo` tem "id", "graduacao", "data_ultima_promocao" e,
+    opcionalmente, "antiguidade" (desempate: menor é mais antigo) e "data_saida"
+    (desligamento, que libera a vaga). `vagas` limita o total de militares em
+    cada graduação; graduações ausentes não têm limite.
+    """
+    ids, graduacao, data_base, ativo = [], [], [], []
+    pendentes = [[] for _ in ORDEM_GRADUACOES]   # (ordinal de elegibilidade, antiguidade, índice)
+    elegiveis = [[] for _ in ORDEM_GRADUACOES]   # (antiguidade, índice)
+    saidas = []                                   # (ordinal de saída, índice)
+    ocupados = [0] * len(ORDEM_GRADUACOES)
+    carreiras: Dict[object, List[Tuple[str, date]]] = {}
+
+    def _antiguidade(indice: int, desempate) -> tuple:
+        return (data_base[indice].toordinal(), desempate, indice)
+
+    def _enfileirar(indice: int, desempate) -> None:
+        g = graduacao[indice]
+        if g >= len(ORDEM_GRADUACOES) - 1:
+            return
+        meses = INTERSTICIOS_MILITARES.get(ORDEM_GRADUACOES[g], [0, 0])[indice_intersticio]
+        elegivel = somar_meses(data_base[indice], meses).toordinal()
+        heapq.heappush(pendentes[g], (elegivel, _antiguidade(indice, desempate)))
+
+    desempates = []
+    for registro in efetivo:
+        indice = len(ids)
+        g = ORDEM_GRADUACOES.index(registro["graduacao"])
+        ids.append(registro["id"])
+        graduacao.append(g)
+        data_base.append(registro["data_ultima_promocao"])
+        ativo.append(True)
+        desempates.append(registro.get("antiguidade", 0))
+        ocupados[g] += 1
+        carreiras[registro["id"]] = []
+        _enfileirar(indice, desempates[indice])
+        if registro.get("data_saida"):
+            heapq.heappush(saidas, (registro["data_saida"].toordinal(), indice))
+
+    limites = [vagas.get(g) for g in ORDEM_GRADUACOES]
+    promocoes_por_data: Dict[date, Dict[str, int]] = {}
+
+    for data_promocao in datas_promocao(inicio, fim):
+        ordinal = data_promocao.toordinal()
+
+        # 1. Desligamentos até esta data liberam vagas
+        while saidas and saidas[0][0] <= ordinal:
+            _, indice = heapq.heappop(saidas)
+            if ativo[indice]:
+                ativo[indice] = False
+                ocupados[graduacao[indice]] -= 1
+
+        # 2. Da graduação mais alta para a mais baixa, preenche as vagas abertas
+        promovidos_na_data: Dict[str, int] = {}
+        for destino in range(len(ORDEM_GRADUACOES) - 1, 0, -1):
+            origem = destino - 1
+            while pendentes[origem] and pendentes[origem][0][0] <= ordinal:
+                _, chave = heapq.heappop(pendentes[origem])
+                heapq.heappush(elegiveis[origem], chave)
+
+            limite = limites[destino]
+            abertas = (limite - ocupados[destino]) if limite is not None else len(elegiveis[origem])
+            while abertas > 0 and elegiveis[origem]:
+                *_, indice = heapq.heappop(elegiveis[origem])
+                if not ativo[indice] or graduacao[indice] != origem:
+                    continue  # Entrada obsoleta (desligado ou já promovido)
+                graduacao[indice] = destino
+                data_base[indice] = data_promocao
+                ocupados[origem] -= 1
+                ocupados[destino] += 1
+                abertas -= 1
+                carreiras[ids[indice]].append((ORDEM_GRADUACOES[destino], data_promocao))
+                promovidos_na_data[ORDEM_GRADUACOES[destino]] = promovidos_na_data.get(ORDEM_GRADUACOES[destino], 0) + 1
+                _enfileirar(indice, desempates[indice])
+
+        if promovidos_na_data:
+            promocoes_por_data[data_promocao] = promovidos_na_data
+
+    graduacao_final = {ids[i]: ORDEM_GRADUACOES[g] for i, g in enumerate(graduacao)}
+    return ResultadoSimulacao(carreiras, promocoes_por_data, graduacao_final)
+
+# --- 2. Linha de Comando ---
+
+def _ler_vagas(especificacoes: List[str]) -> Dict[str, int]:
+    """Converte ["CB=3000", "3º Sargento=1500", ...] em {graduação: vagas}."""
+    vagas = {}
+    for especificacao in especificacoes:
+        nome, _, quantidade = especificacao.partition("=")
+        graduacao = normalizar_graduacao(nome)
+        if graduacao is None or not quantidade.isdigit():
+            raise ValueError(f"Vaga inválida: '{especificacao}' (use SIGLA=QUANTIDADE).")
+        vagas[graduacao] = int(quantidade)
+    return vagas
+
+
+def _ler_efetivo_csv(caminho: str, saidas: bool) -> List[dict]:
+    from datetime import datetime
+    from main import detectar_delimitador, ler_efetivo, localizar_colunas
+
+    def _data(texto: str) -> Optional[date]:
+        return datetime.strptime(texto.strip(), "%d/%m/%Y").date() if texto.strip() else None
+
+    registros = []
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        delimitador = detectar_delimitador(arquivo.readline())
+        arquivo.seek(0)
+        linhas = ler_efetivo(arquivo, delimitador)
+        cabecalho = next(linhas)
+        posicoes = localizar_colunas(cabecalho)
+        coluna_saida = cabecalho.index("data_saida") if saidas and "data_saida" in cabecalho else None
+        for numero, campos in enumerate(linhas, start=1):
+            if not campos:
+                continue
+            try:
+                graduacao = normalizar_graduacao(campos[posicoes["graduacao"]])
+                data_base = _data(campos[posicoes["data_base"]])
+                data_saida = _data(campos[coluna_saida]) if coluna_saida is not None else None
+            except (IndexError, ValueError):
+                graduacao = data_base = None
+            if graduacao is None or data_base is None:
+                print(f"Linha {numero}: graduação ou data inválida, ignorada.", file=sys.stderr)
+                continue
+            registros.append({
+                "id": numero,
+                "graduacao": graduacao,
+                "data_ultima_promocao": data_base,
+                "antiguidade": numero,
+                "data_saida": data_saida,
+            })
+    return registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula promoções com quadro de vagas limitado.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (mesmo formato de `main.py --lote`; coluna opcional data_saida).")
+    parser.add_argument("--vagas", nargs="+", default=[], metavar="SIGLA=QTD", help="Vagas por graduação.")
+    parser.add_argument("--inicio", default=None, help="Data inicial DD/MM/AAAA (padrão: hoje).")
+    parser.add_argument("--anos", type=int, default=30, help="Horizonte da simulação em anos (padrão: 30).")
+    parser.add_argument("--cenario", choices=["reduzido", "completo"], default="completo")
+    parser.add_argument("--saida", default="-", help="CSV com a carreira simulada ('-' para stdout).")
+    args = parser.parse_args(argv)
+
+    from datetime import datetime
+    inicio = datetime.strptime(args.inicio, "%d/%m/%Y").date() if args.inicio else date.today()
+    fim = date(inicio.year + args.anos, inicio.month, min(inicio.day, 28))
+    resultado = simular_vagas(_ler_efetivo_csv(args.efetivo, True), _ler_vagas(args.vagas), inicio, fim,
+                              1 if args.cenario == "reduzido" else 0)
+
+    siglas = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(["linha", "graduacao_final"] + [f"promocao_{siglas[g]}" for g in ORDEM_GRADUACOES[1:]])
+    for identificador, carreira in resultado.carreiras.items():
+        datas = dict(carreira)
+        escritor.writerow([identificador, resultado.graduacao_final[identificador]]
+                          + [datas[g].strftime("%d/%m/%Y") if g in datas else "" for g in ORDEM_GRADUACOES[1:]])
+    if saida is not sys.stdout:
+        saida.close()
+
+
+if __name__ == "__main__":
+    main()
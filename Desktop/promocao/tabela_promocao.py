@@ -0,0 +1,236 @@
+"""
+Tabela pré-calculada de próximas promoções, indexada por ordinal de dia.
+
+A próxima data de promoção depende apenas de (data base, meses de interstício),
+e ambos vêm de um domínio pequeno. A tabela guarda, para cada dia entre
+DATA_INICIAL e DATA_FINAL e cada interstício distinto, o índice da data fixa de
+promoção resultante, além da cadeia completa até Subtenente (nos dois cenários)
+a partir de cada data fixa. Consultas viram leituras O(1) de array.
+
+Experimento medido só pelo benchmark.py: main.py, o modo em lote, o app e a
+API continuam no cálculo encadeado (nucleo.py / projecao_vetorizada.py). A
+tabela exige NumPy e a construção ou carga do .npz, que custam mais que as
+poucas projeções de uma execução do console ou do app, e é montada com as
+regras de nucleo.py do momento da importação, sem acompanhar a releitura de
+regras.json.
+"""
+import json
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from nucleo import DATAS_PROMOCAO_FIXAS, INTERSTICIOS_MILITARES, ORDEM_GRADUACOES
+from projecao_vetorizada import (
+    N_PASSOS,
+    anexar_idades,
+    indices_graduacao,
+    projetar_promocoes_lote,
+    proxima_promocao_vetorizada,
+)
+
+# --- 1. Constantes ---
+
+DATA_INICIAL = date(1960, 1, 1)
+DATA_FINAL = date(2100, 12, 31)
+
+# Caminho padrão do arquivo da tabela (pode ser trocado pela variável de ambiente)
+CAMINHO_PADRAO = os.environ.get(
+    "PROMOCAO_TABELA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tabela_promocao.npz")
+)
+
+# Marca de "sem promoção" nas cadeias (passo já cumprido ou fora do calendário)
+SEM_INDICE = np.iinfo(np.uint16).max
+
+# Diferença entre `date.toordinal()` e dias desde 1970-01-01 (datetime64[D])
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+# Interstícios distintos (colunas da tabela) e o mapa (graduação, cenário) -> coluna
+MESES_DISTINTOS = sorted({m for par in INTERSTICIOS_MILITARES.values() for m in par})
+_COLUNA_POR_MESES = {m: i for i, m in enumerate(MESES_DISTINTOS)}
+
+# [cenário, passo] -> meses e coluna da tabela correspondentes
+_MESES_TABELA = np.array(
+    [[INTERSTICIOS_MILITARES.get(g, [0, 0])[c] for g in ORDEM_GRADUACOES[:-1]] for c in (0, 1)], dtype=np.int16
+)
+_COLUNAS_TABELA = np.vectorize(_COLUNA_POR_MESES.get)(_MESES_TABELA)
+
+
+class TabelaPromocao(NamedTuple):
+    """Arrays da tabela. Datas são dias desde 1970-01-01 (int32)."""
+    calendario: np.ndarray  # datas fixas de promoção, ordenadas
+    proxima: np.ndarray     # [coluna de interstício, dia - DATA_INICIAL] -> índice no calendário
+    cadeia: np.ndarray      # [cenário, graduação, índice no calendário, passo] -> índice no calendário
+    assinatura: str
+
+# --- 2. Construção e Persistência ---
+
+def _assinatura() -> str:
+    """Identifica as regras usadas na construção, para invalidar tabelas antigas."""
+    return json.dumps({
+        "intersticios": INTERSTICIOS_MILITARES,
+        "datas": DATAS_PROMOCAO_FIXAS,
+        "ordem": ORDEM_GRADUACOES,
+        "faixa": [DATA_INICIAL.isoformat(), DATA_FINAL.isoformat()],
+    }, sort_keys=True, ensure_ascii=False)
+
+
+def construir_tabela() -> TabelaPromocao:
+    """Calcula a tabela completa usando o motor vetorizado."""
+    dias = np.arange(
+        np.datetime64(DATA_INICIAL, "D"), np.datetime64(DATA_FINAL, "D") + 1, dtype="datetime64[D]"
+    )
+
+    # Calendário: todas as datas fixas alcançáveis a partir da faixa (carreira inteira + folga)
+    anos_carreira = sum(max(par) for par in INTERSTICIOS_MILITARES.values()) // 12 + 2
+    ultimo_dia = np.datetime64(date(DATA_FINAL.year + anos_carreira, 12, 31), "D")
+    datas_calendario = np.unique(proxima_promocao_vetorizada(
+        np.arange(np.datetime64(DATA_INICIAL, "D"), ultimo_dia, dtype="datetime64[D]"), 0
+    ))
+    calendario = datas_calendario.astype(np.int64)
+
+    def _indices(datas: np.ndarray) -> np.ndarray:
+        valores = datas.astype(np.int64)
+        pos = np.searchsorted(calendario, valores)
+        pos_seguro = np.minimum(pos, len(calendario) - 1)
+        encontrado = ~np.isnat(datas) & (calendario[pos_seguro] == valores)
+        return np.where(encontrado, pos_seguro, SEM_INDICE).astype(np.uint16)
+
+    proxima = np.empty((len(MESES_DISTINTOS), len(dias)), dtype=np.uint16)
+    for coluna, meses in enumerate(MESES_DISTINTOS):
+        proxima[coluna] = _indices(proxima_promocao_vetorizada(dias, meses))
+
+    n_grad = len(ORDEM_GRADUACOES)
+    cadeia = np.full((2, n_grad, len(calendario), N_PASSOS), SEM_INDICE, dtype=np.uint16)
+    for cenario in (0, 1):
+        for indice_grad in range(n_grad - 1):
+            resultado = projetar_promocoes_lote(datas_calendario, indice_grad, cenario)
+            cadeia[cenario, indice_grad] = _indices(resultado["datas"])
+
+    return TabelaPromocao(calendario.astype(np.int32), proxima, cadeia, _assinatura())
+
+
+def salvar_tabela(tabela: TabelaPromocao, caminho: str = CAMINHO_PADRAO) -> None:
+    """Grava a tabela em disco (formato .npz do NumPy)."""
+    with open(caminho, "wb") as arquivo:
+        np.savez(arquivo, calendario=tabela.calendario, proxima=tabela.proxima,
+                 cadeia=tabela.cadeia, assinatura=np.array(tabela.assinatura))
+
+
+def carregar_tabela(caminho: Optional[str] = CAMINHO_PADRAO) -> TabelaPromocao:
+    """
+    Carrega a tabela do disco, reconstruindo-a se não existir ou se as regras mudaram.
+    Com `caminho=None` apenas constrói em memória.
+    """
+    if caminho and os.path.exists(caminho):
+        try:
+            with np.load(caminho) as dados:
+                if str(dados["assinatura"]) == _assinatura():
+                    return TabelaPromocao(dados["calendario"], dados["proxima"], dados["cadeia"], _assinatura())
+        except (OSError, ValueError, KeyError):
+            pass
+
+    tabela = construir_tabela()
+    if caminho:
+        try:
+            salvar_tabela(tabela, caminho)
+        except OSError:
+            pass  # Diretório somente leitura: segue com a tabela em memória
+    return tabela
+
+
+@lru_cache(maxsize=1)
+def obter_tabela() -> TabelaPromocao:
+    """Tabela única por processo (construída ou carregada na primeira chamada)."""
+    return carregar_tabela()
+
+# --- 3. Consultas ---
+
+def _dentro_da_faixa(data_base: date) -> bool:
+    return DATA_INICIAL <= data_base <= DATA_FINAL
+
+
+def _indice_proxima(data_base: date, meses_intersticio: int, tabela: TabelaPromocao) -> int:
+    """Índice no calendário da próxima promoção a partir de `data_base`."""
+    if not _dentro_da_faixa(data_base) or meses_intersticio not in _COLUNA_POR_MESES:
+        raise ValueError("Data base ou interstício fora do domínio da tabela.")
+    return int(tabela.proxima[_COLUNA_POR_MESES[meses_intersticio], data_base.toordinal() - DATA_INICIAL.toordinal()])
+
+
+def _data_do_indice(indice: int, tabela: TabelaPromocao) -> date:
+    return date.fromordinal(int(tabela.calendario[indice]) + _ORDINAL_EPOCA)
+
+
+def proxima_promocao_tabela(data_base: date, meses_intersticio: int, tabela: Optional[TabelaPromocao] = None) -> date:
+    """Equivalente a `calcular_proxima_promocao`, por consulta direta à tabela."""
+    tabela = obter_tabela() if tabela is None else tabela
+    return _data_do_indice(_indice_proxima(data_base, meses_intersticio, tabela), tabela)
+
+
+def projetar_promocoes_tabela(graduacao_inicial: str, data_base_promocao: date, indice_intersticio: int,
+                              tabela: Optional[TabelaPromocao] = None) -> List[date]:
+    """
+    Datas de todas as promoções de `graduacao_inicial` até Subtenente, na mesma
+    ordem do laço de `projetar_promocoes` (uma leitura para o primeiro passo e
+    uma para o restante da cadeia).
+    """
+    indice_atual = ORDEM_GRADUACOES.index(graduacao_inicial)
+    if indice_atual >= N_PASSOS:
+        return []
+    tabela = obter_tabela() if tabela is None else tabela
+    meses = INTERSTICIOS_MILITARES.get(graduacao_inicial, [0, 0])[indice_intersticio]
+
+    primeira = _indice_proxima(data_base_promocao, meses, tabela)
+    restante = tabela.cadeia[indice_intersticio, indice_atual + 1, primeira, indice_atual + 1:]
+    return [_data_do_indice(i, tabela) for i in (primeira, *restante)]
+
+
+def projetar_lote_tabela(datas_base, graduacoes, indices_intersticio, datas_nascimento=None,
+                         tabela: Optional[TabelaPromocao] = None) -> Dict[str, np.ndarray]:
+    """
+    Mesma interface e resultado de `projetar_promocoes_lote` (cenário único por
+    militar), resolvida por leituras da tabela. Linhas fora da faixa da tabela
+    são calculadas pelo motor vetorizado.
+    """
+    tabela = obter_tabela() if tabela is None else tabela
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]").ravel()
+    n = datas_base.shape[0]
+    cenarios = np.broadcast_to(np.asarray(indices_intersticio, dtype=np.int64), (n,))
+    if not np.isin(cenarios, (0, 1)).all():
+        raise ValueError("indices_intersticio deve conter 0 (Completo) ou 1 (Reduzido) por militar.")
+    graduacoes = np.broadcast_to(indices_graduacao(graduacoes), (n,))
+
+    dias = datas_base.astype(np.int64) - (DATA_INICIAL.toordinal() - _ORDINAL_EPOCA)
+    na_faixa = ~np.isnat(datas_base) & (dias >= 0) & (dias < tabela.proxima.shape[1])
+
+    datas = np.full((n, N_PASSOS), np.datetime64("NaT", "D"))
+    meses = np.zeros((n, N_PASSOS), dtype=np.int16)
+    ativo = na_faixa & (graduacoes < N_PASSOS)
+
+    linhas = np.nonzero(ativo)[0]
+    grad_ativo = graduacoes[linhas]
+    cen_ativo = cenarios[linhas]
+    colunas = _COLUNAS_TABELA[cen_ativo, grad_ativo]
+    primeira = tabela.proxima[colunas, dias[linhas]].astype(np.int64)
+    indices = tabela.cadeia[cen_ativo, np.minimum(grad_ativo + 1, N_PASSOS), primeira].astype(np.int64)
+    indices[np.arange(len(linhas)), grad_ativo] = primeira
+
+    preenchido = indices != SEM_INDICE
+    valores = tabela.calendario[np.where(preenchido, indices, 0)].astype("datetime64[D]")
+    datas[linhas] = np.where(preenchido, valores, np.datetime64("NaT", "D"))
+    meses[linhas] = np.where(preenchido, _MESES_TABELA[cen_ativo], 0)
+
+    data_final = datas_base.copy()
+    data_final[linhas] = datas[linhas, N_PASSOS - 1]
+
+    fora = np.nonzero(~na_faixa)[0]
+    if len(fora):
+        parcial = projetar_promocoes_lote(datas_base[fora], graduacoes[fora], cenarios[fora])
+        datas[fora] = parcial["datas"]
+        meses[fora] = parcial["meses"]
+        data_final[fora] = parcial["data_final"]
+
+    resultado = {"graduacoes": graduacoes.astype(np.uint8), "datas": datas, "meses": meses, "data_final": data_final}
+    return anexar_idades(resultado, datas_nascimento)
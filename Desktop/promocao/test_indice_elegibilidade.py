@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+
+from indice_elegibilidade import IndiceElegibilidade
+
+LIMITE = date(2040, 1, 1)
+
+
+def test_identificador_repetido_na_carga():
+    with pytest.raises(ValueError, match="repetido"):
+        IndiceElegibilidade([(1, "CB", date(2020, 1, 1)), (1, "CB", date(2021, 1, 1))])
+
+
+def test_remover_e_atualizar_refletem_nas_consultas():
+    indice = IndiceElegibilidade([(1, "CB", date(2020, 1, 1)), (2, "CB", date(2021, 1, 1))])
+    assert indice.elegiveis_ate("CB", LIMITE) == [1, 2]
+
+    indice.remover(1)
+    assert indice.elegiveis_ate("CB", LIMITE) == [2]
+    assert 1 not in indice
+
+    indice.atualizar(2, "3SGT", date(2022, 1, 1))
+    assert indice.elegiveis_ate("CB", LIMITE) == []
+    assert indice.elegiveis_ate("3º Sargento", LIMITE) == [2]
+
+    indice.atualizar(1, "CB", date(2019, 1, 1))
+    assert indice.elegiveis_ate("CB", LIMITE) == [1]
+    assert len(indice) == 2
@@ -0,0 +1,229 @@
+"""
+Triagem de limites de idade e de tempo de serviço sobre o efetivo.
+
+Para cada militar, nos dois cenários (interstício completo e reduzido),
+calcula a idade e o tempo de serviço em cada promoção projetada, com o motor
+vetorizado (mesmos anos completos de `relativedelta(...).years`). Quem atinge
+um limite até a data de uma promoção é sinalizado e a projeção é interrompida
+a partir desse passo. Uso:
+
+    python triagem_idade.py efetivo.csv [--idade-limite 60] [--tempo-limite 35] [--somente-alertas] [--saida triagem.csv]
+
+O tempo de serviço só é avaliado quando o arquivo traz a data de ingresso
+(coluna `data_ingresso`).
+"""
+import argparse
+import csv
+import sys
+import time
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from nucleo import ABREVIATURAS_MAP, ORDEM_GRADUACOES
+from projecao_vetorizada import (IDADE_INDEFINIDA, N_PASSOS, idade_vetorizada, projetar_promocoes_lote,
+                                 somar_meses_vetorizado)
+
+# --- 1. Limites ---
+
+# Valores de referência; ajuste com --idade-limite / --tempo-limite conforme a legislação vigente
+IDADE_LIMITE_PADRAO = 60
+TEMPO_SERVICO_LIMITE_PADRAO = 35
+
+# Motivo do corte (máscara de bits): o limite atingido no primeiro passo interrompido
+SEM_LIMITE = 0
+LIMITE_IDADE = 1
+LIMITE_TEMPO_SERVICO = 2
+MOTIVOS = {SEM_LIMITE: "", LIMITE_IDADE: "idade", LIMITE_TEMPO_SERVICO: "tempo de serviço",
+           LIMITE_IDADE | LIMITE_TEMPO_SERVICO: "idade e tempo de serviço"}
+
+# Cenário -> índice do interstício (0 = Completo, 1 = Reduzido)
+CENARIOS = {"completo": 0, "reduzido": 1}
+
+
+class Limites(NamedTuple):
+    idade: Optional[int] = IDADE_LIMITE_PADRAO                  # Anos de idade (None desativa)
+    tempo_servico: Optional[int] = TEMPO_SERVICO_LIMITE_PADRAO  # Anos de serviço (None desativa)
+
+# --- 2. Triagem Vetorizada ---
+
+def _datas(valores, n: int) -> np.ndarray:
+    if valores is None:
+        return np.full(n, np.datetime64("NaT", "D"))
+    return np.broadcast_to(np.asarray(valores, dtype="datetime64[D]").ravel(), (n,))
+
+
+def data_limite(datas_nascimento, datas_ingresso=None, limites: Limites = Limites()) -> np.ndarray:
+    """Primeira data em que algum limite é atingido (aniversário ou data de ingresso + N anos); NaT se não houver."""
+    nasc = np.asarray(datas_nascimento, dtype="datetime64[D]")
+    limite = np.full(nasc.shape, np.datetime64("NaT", "D"))
+    candidatas = []
+    if limites.idade is not None:
+        candidatas.append(somar_meses_vetorizado(nasc, 12 * limites.idade))
+    if limites.tempo_servico is not None and datas_ingresso is not None:
+        candidatas.append(somar_meses_vetorizado(_datas(datas_ingresso, nasc.shape[0]), 12 * limites.tempo_servico))
+    for candidata in candidatas:
+        # NaT não participa do mínimo
+        limite = np.where(np.isnat(limite) | (~np.isnat(candidata) & (candidata < limite)), candidata, limite)
+    return limite
+
+
+def aplicar_limites(resultado: Dict[str, np.ndarray], datas_base, datas_nascimento=None, datas_ingresso=None,
+                    limites: Limites = Limites()) -> Dict[str, np.ndarray]:
+    """
+    Interrompe a projeção (saída de `projetar_promocoes_lote`) no primeiro passo
+    em que a idade ou o tempo de serviço na data da promoção atinge o limite.
+
+    Acrescenta "tempos_servico", "passo_corte" (N_PASSOS se não houver corte),
+    "motivo" (máscara LIMITE_*), "alerta_proxima" (a próxima promoção já é
+    interrompida) e "graduacao_final"; "datas", "meses", "idades", "data_final"
+    e "idade_final" passam a refletir a carreira interrompida.
+    """
+    datas = resultado["datas"]
+    n = datas.shape[0]
+    projetado = ~np.isnat(datas)
+    nasc = _datas(datas_nascimento, n)
+    ingresso = _datas(datas_ingresso, n)
+
+    idades = resultado["idades"] if datas_nascimento is not None else np.full(datas.shape, IDADE_INDEFINIDA, dtype=np.int16)
+    tempos = idade_vetorizada(ingresso[:, None], datas)
+
+    por_idade = np.zeros(datas.shape, dtype=bool)
+    por_tempo = np.zeros(datas.shape, dtype=bool)
+    if limites.idade is not None:
+        por_idade = projetado & (idades != IDADE_INDEFINIDA) & (idades >= limites.idade)
+    if limites.tempo_servico is not None:
+        por_tempo = projetado & (tempos != IDADE_INDEFINIDA) & (tempos >= limites.tempo_servico)
+
+    # Uma vez atingido o limite, nenhum passo seguinte é projetado
+    cortado = np.logical_or.accumulate(por_idade | por_tempo, axis=1)
+    tem_corte = cortado[:, -1]
+    passo_corte = np.where(tem_corte, cortado.argmax(axis=1), N_PASSOS).astype(np.int8)
+
+    linhas = np.arange(n)
+    primeiro = np.minimum(passo_corte, N_PASSOS - 1)
+    motivo = np.where(tem_corte, por_idade[linhas, primeiro] * LIMITE_IDADE
+                      + por_tempo[linhas, primeiro] * LIMITE_TEMPO_SERVICO, SEM_LIMITE).astype(np.uint8)
+
+    datas = np.where(cortado, np.datetime64("NaT", "D"), datas)
+    validos = ~np.isnat(datas)
+    ultimo = N_PASSOS - 1 - validos[:, ::-1].argmax(axis=1)
+    data_final = np.where(validos.any(axis=1), datas[linhas, ultimo], _datas(datas_base, n))
+    graduacoes = resultado["graduacoes"]
+
+    resultado.update({
+        "datas": datas,
+        "meses": np.where(cortado, 0, resultado["meses"]).astype(np.int16),
+        "idades": np.where(cortado, IDADE_INDEFINIDA, idades).astype(np.int16),
+        "tempos_servico": np.where(cortado, IDADE_INDEFINIDA, tempos).astype(np.int16),
+        "data_final": data_final,
+        "idade_final": idade_vetorizada(nasc, data_final),
+        "passo_corte": passo_corte,
+        "motivo": motivo,
+        "alerta_proxima": tem_corte & (passo_corte == graduacoes),
+        "graduacao_final": (graduacoes + validos.sum(axis=1)).astype(np.uint8),
+    })
+    return resultado
+
+
+def triar_efetivo(datas_base, graduacoes, datas_nascimento, datas_ingresso=None,
+                  limites: Limites = Limites()) -> Dict[str, Dict[str, np.ndarray]]:
+    """Projeção interrompida nos limites, por cenário ({"completo": ..., "reduzido": ...})."""
+    datas_base = np.asarray(datas_base, dtype="datetime64[D]").ravel()
+    nasc = _datas(datas_nascimento, datas_base.shape[0])
+    resultados = {}
+    for cenario, indice in CENARIOS.items():
+        resultado = projetar_promocoes_lote(datas_base, graduacoes, indice, nasc)
+        resultados[cenario] = aplicar_limites(resultado, datas_base, nasc, datas_ingresso, limites)
+    return resultados
+
+# --- 3. Linha de Comando ---
+
+def _br(data) -> str:
+    return data.strftime("%d/%m/%Y") if data else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Triagem de limites de idade e tempo de serviço antes das promoções projetadas.")
+    parser.add_argument("efetivo", help="CSV/TSV do efetivo (formato de `main.py --lote`, com `data_ingresso` opcional).")
+    parser.add_argument("--idade-limite", type=int, default=IDADE_LIMITE_PADRAO,
+                        help=f"Idade limite em anos (padrão: {IDADE_LIMITE_PADRAO}; 0 desativa).")
+    parser.add_argument("--tempo-limite", type=int, default=TEMPO_SERVICO_LIMITE_PADRAO,
+                        help=f"Tempo de serviço limite em anos (padrão: {TEMPO_SERVICO_LIMITE_PADRAO}; 0 desativa).")
+    parser.add_argument("--somente-alertas", action="store_true",
+                        help="Lista apenas quem atinge um limite antes da próxima promoção em algum cenário.")
+    parser.add_argument("--saida", default="-", help="CSV de saída ('-' para stdout).")
+    args = parser.parse_args(argv)
+    limites = Limites(args.idade_limite or None, args.tempo_limite or None)
+
+    from datetime import datetime
+    from main import detectar_delimitador, ler_efetivo, localizar_colunas
+    from nucleo import normalizar_graduacao
+
+    def _data(texto: str):
+        return datetime.strptime(texto.strip(), "%d/%m/%Y").date() if texto.strip() else None
+
+    inicio = time.perf_counter()
+    linhas, graduacoes, datas_base, nascimentos, ingressos = [], [], [], [], []
+    with open(args.efetivo, encoding="utf-8", newline="") as arquivo:
+        delimitador = detectar_delimitador(arquivo.readline())
+        arquivo.seek(0)
+        registros = ler_efetivo(arquivo, delimitador)
+        posicoes = localizar_colunas(next(registros))
+        coluna_ingresso = posicoes.get("ingresso")
+        for numero, campos in enumerate(registros, start=1):
+            try:
+                graduacao = normalizar_graduacao(campos[posicoes["graduacao"]])
+                data_base = _data(campos[posicoes["data_base"]])
+                nascimento = _data(campos[posicoes["nascimento"]])
+                ingresso = _data(campos[coluna_ingresso]) if coluna_ingresso is not None else None
+            except (IndexError, ValueError):
+                graduacao = None
+            if graduacao is None or data_base is None or nascimento is None:
+                print(f"Linha {numero}: graduação, data base ou nascimento inválido, ignorada.", file=sys.stderr)
+                continue
+            linhas.append(numero)
+            graduacoes.append(ORDEM_GRADUACOES.index(graduacao))
+            datas_base.append(data_base)
+            nascimentos.append(nascimento)
+            ingressos.append(ingresso)
+    leitura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    nascimentos = np.array(nascimentos, dtype="datetime64[D]")
+    ingressos = np.array(ingressos, dtype="datetime64[D]") if coluna_ingresso is not None else None
+    resultados = triar_efetivo(np.array(datas_base, dtype="datetime64[D]"), np.array(graduacoes, dtype=np.uint8),
+                               nascimentos, ingressos, limites)
+    limite = data_limite(nascimentos, ingressos, limites)
+    triagem = time.perf_counter() - inicio
+
+    siglas = {nome: sigla for sigla, nome in ABREVIATURAS_MAP.items()}
+    alerta = resultados["completo"]["alerta_proxima"] | resultados["reduzido"]["alerta_proxima"]
+    selecionados = np.flatnonzero(alerta) if args.somente_alertas else np.arange(len(linhas))
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8", newline="")
+    escritor = csv.writer(saida, lineterminator="\n")
+    escritor.writerow(["linha", "graduacao", "data_limite"]
+                      + [f"{campo}_{cenario}" for cenario in CENARIOS
+                         for campo in ("proxima_promocao", "graduacao_final", "motivo", "alerta")])
+    limites_texto = limite.astype(object)
+    for i in selecionados:
+        linha = [linhas[i], siglas[ORDEM_GRADUACOES[graduacoes[i]]], _br(limites_texto[i])]
+        for cenario in CENARIOS:
+            r = resultados[cenario]
+            proxima = r["datas"][i, graduacoes[i]].astype(object) if graduacoes[i] < N_PASSOS else None
+            linha += [_br(proxima), siglas[ORDEM_GRADUACOES[r["graduacao_final"][i]]],
+                      MOTIVOS[int(r["motivo"][i])], "sim" if r["alerta_proxima"][i] else ""]
+        escritor.writerow(linha)
+    if saida is not sys.stdout:
+        saida.close()
+
+    print(f"{len(linhas)} militares | leitura {leitura:.2f} s | triagem {triagem:.3f} s", file=sys.stderr)
+    for cenario in CENARIOS:
+        r = resultados[cenario]
+        print(f"  {cenario:<9} limite antes da próxima promoção: {int(r['alerta_proxima'].sum())} | "
+              f"carreira interrompida: {int((r['passo_corte'] < N_PASSOS).sum())}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Verificação exaustiva do núcleo de datas em inteiros contra `relativedelta`.
+
+Compara `somar_meses`, `calcular_proxima_promocao` e `calcular_idade` de
+nucleo.py com as implementações originais (baseadas em `relativedelta`) para
+todos os dias de uma faixa ampla, incluindo todos os casos de 29/02. Quando o
+NumPy está disponível, confere também o motor vetorizado (projecao_vetorizada).
+Uso:
+
+    python verificar_datas.py [--inicio 1900] [--fim 2100]
+
+Termina com código 1 se encontrar qualquer divergência.
+"""
+import argparse
+import itertools
+import sys
+import time
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+import nucleo
+from nucleo import DATAS_PROMOCAO_FIXAS, INTERSTICIOS_MILITARES
+
+# Deslocamentos em meses conferidos em `somar_meses` (interstícios + casos de virada de ano)
+MESES_TESTADOS = sorted({m for par in INTERSTICIOS_MILITARES.values() for m in par}
+                        | {0, 1, 2, 11, 12, 13, 23, 24, 48, -1, -12, -13})
+
+# Idades conferidas: para cada nascimento, referências em torno destes aniversários
+ANOS_TESTADOS = (0, 1, 3, 4, 17, 18, 29, 30, 45, 60)
+
+# --- 1. Implementações de Referência (originais, com relativedelta) ---
+
+def referencia_proxima_promocao(data_base: date, meses_intersticio: int) -> date:
+    data_minima_elegivel = data_base + relativedelta(months=+meses_intersticio)
+    ano_candidato = data_minima_elegivel.year
+
+    for mes, dia in DATAS_PROMOCAO_FIXAS:
+        try:
+            data_promocao_candidata = date(ano_candidato, mes, dia)
+        except ValueError:
+            continue
+
+        if data_promocao_candidata >= data_minima_elegivel:
+            return data_promocao_candidata
+
+    ano_candidato += 1
+    mes_abril, dia_abril = DATAS_PROMOCAO_FIXAS[0]
+
+    try:
+        proxima_abril = date(ano_candidato, mes_abril, dia_abril)
+    except ValueError:
+        proxima_abril = date(ano_candidato, mes_abril, 20)
+
+    return proxima_abril
+
+
+def referencia_idade(data_nascimento: date, data_referencia: date) -> int:
+    return relativedelta(data_referencia, data_nascimento).years
+
+# --- 2. Verificações ---
+
+def todos_os_dias(inicio: date, fim: date):
+    """Gera todos os dias de `inicio` a `fim`, inclusive."""
+    for ordinal in range(inicio.toordinal(), fim.toordinal() + 1):
+        yield date.fromordinal(ordinal)
+
+
+def _registrar(divergencias: list, descricao: str):
+    if len(divergencias) < 20:
+        print(f"   ❌ {descricao}")
+    divergencias.append(descricao)
+
+
+def verificar_somar_meses(dias: list, divergencias: list) -> int:
+    total = 0
+    for dia in dias:
+        for meses in MESES_TESTADOS:
+            esperado = dia + relativedelta(months=meses)
+            obtido = nucleo.somar_meses(dia, meses)
+            total += 1
+            if obtido != esperado:
+                _registrar(divergencias, f"somar_meses({dia}, {meses}) = {obtido}, esperado {esperado}")
+    return total
+
+
+def verificar_proxima_promocao(dias: list, divergencias: list) -> int:
+    total = 0
+    intersticios = sorted({m for par in INTERSTICIOS_MILITARES.values() for m in par})
+    for dia in dias:
+        for meses in intersticios:
+            esperado = referencia_proxima_promocao(dia, meses)
+            obtido = nucleo.calcular_proxima_promocao(dia, meses)
+            total += 1
+            if obtido != esperado:
+                _registrar(divergencias, f"calcular_proxima_promocao({dia}, {meses}) = {obtido}, esperado {esperado}")
+    return total
+
+
+def _referencias_idade(nascimento: date):
+    """Datas de referência ao redor de vários aniversários (inclui antes do nascimento)."""
+    for anos in ANOS_TESTADOS:
+        for sinal in (1, -1) if anos else (1,):
+            ano = nascimento.year + sinal * anos
+            if not 1 <= ano <= 9999:
+                continue
+            aniversario = date(ano, nascimento.month, min(nascimento.day, nucleo.dias_no_mes(ano, nascimento.month)))
+            for delta in (-2, -1, 0, 1, 2):
+                try:
+                    yield aniversario + timedelta(days=delta)
+                except OverflowError:
+                    continue
+
+
+def pares_idade(dias: list):
+    """Gera (nascimento, referência) para cada dia da faixa como nascimento."""
+    for nascimento in dias:
+        for referencia in _referencias_idade(nascimento):
+            yield nascimento, referencia
+
+
+def verificar_idade(dias: list, divergencias: list) -> int:
+    total = 0
+    for nascimento, referencia in pares_idade(dias):
+        esperado = referencia_idade(nascimento, referencia)
+        obtido = nucleo.calcular_idade(nascimento, referencia)
+        total += 1
+        if obtido != esperado:
+            _registrar(divergencias, f"calcular_idade({nascimento}, {referencia}) = {obtido}, esperado {esperado}")
+    return total
+
+
+def verificar_vetorizado(dias: list, divergencias: list) -> int:
+    """Confere o motor vetorizado contra o núcleo escalar, já validado acima."""
+    import numpy as np
+    from projecao_vetorizada import idade_vetorizada, proxima_promocao_vetorizada, somar_meses_vetorizado
+
+    datas = np.array(dias, dtype="datetime64[D]")
+    total = 0
+    for meses in MESES_TESTADOS:
+        obtido = somar_meses_vetorizado(datas, meses).astype(object)
+        for dia, valor in zip(dias, obtido):
+            total += 1
+            if valor != nucleo.somar_meses(dia, meses):
+                _registrar(divergencias, f"somar_meses_vetorizado({dia}, {meses}) = {valor}")
+        obtido = proxima_promocao_vetorizada(datas, max(meses, 0)).astype(object)
+        for dia, valor in zip(dias, obtido):
+            total += 1
+            if valor != nucleo.calcular_proxima_promocao(dia, max(meses, 0)):
+                _registrar(divergencias, f"proxima_promocao_vetorizada({dia}, {max(meses, 0)}) = {valor}")
+
+    pares = pares_idade(dias)
+    while True:
+        bloco = list(itertools.islice(pares, 200_000))
+        if not bloco:
+            break
+        nascimentos, referencias = zip(*bloco)
+        obtido = idade_vetorizada(np.array(nascimentos, dtype="datetime64[D]"), np.array(referencias, dtype="datetime64[D]"))
+        for nascimento, referencia, valor in zip(nascimentos, referencias, obtido):
+            total += 1
+            if int(valor) != nucleo.calcular_idade(nascimento, referencia):
+                _registrar(divergencias, f"idade_vetorizada({nascimento}, {referencia}) = {valor}")
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica o núcleo de datas em inteiros contra relativedelta.")
+    parser.add_argument("--inicio", type=int, default=1900, help="Ano inicial da faixa (padrão: 1900).")
+    parser.add_argument("--fim", type=int, default=2100, help="Ano final da faixa (padrão: 2100).")
+    args = parser.parse_args(argv)
+
+    dias = list(todos_os_dias(date(args.inicio, 1, 1), date(args.fim, 12, 31)))
+    bissextos = sum(1 for d in dias if d.month == 2 and d.day == 29)
+    print(f"Faixa: {dias[0]:%d/%m/%Y} a {dias[-1]:%d/%m/%Y} ({len(dias)} dias, {bissextos} de 29/02)")
+
+    verificacoes = [
+        ("somar_meses", verificar_somar_meses),
+        ("calcular_proxima_promocao", verificar_proxima_promocao),
+        ("calcular_idade", verificar_idade),
+    ]
+    try:
+        import numpy  # noqa: F401
+        verificacoes.append(("motor vetorizado", verificar_vetorizado))
+    except ImportError:
+        print("NumPy indisponível: motor vetorizado não verificado.")
+
+    divergencias = []
+    for nome, verificacao in verificacoes:
+        inicio = time.perf_counter()
+        antes = len(divergencias)
+        total = verificacao(dias, divergencias)
+        situacao = "OK" if len(divergencias) == antes else f"{len(divergencias) - antes} DIVERGÊNCIAS"
+        print(f"{nome:<28} {total:>10} casos  {time.perf_counter() - inicio:6.1f}s  {situacao}")
+
+    return 1 if divergencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())